@@ -10,6 +10,14 @@ from .models import User, Student, RoleChoices, GuardianUser, AdminUser, Superus
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('nickname', 'user', 'school_year')
     search_fields = ('nickname', 'user__email')
+    list_select_related = ('user',)
+    # Campo de ID no lugar de um <select> com todos os usuários
+    raw_id_fields = ('user',)
+    query_budgets = {'changelist': 10, 'change': 10}
+
+    def get_queryset(self, request):
+        # Student.__str__ lê user.email (vale também para o autocomplete)
+        return super().get_queryset(request).select_related('user')
 
 # -----------------
 # ADMINS DOS USUÁRIOS (POR PAPEL)
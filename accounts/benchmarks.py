@@ -0,0 +1,48 @@
+# Cenários de benchmark do app accounts (ver core/benchmarks.py)
+
+from functools import partial
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+
+from core.benchmarks import scenario
+
+
+@scenario("admin.student_changelist")
+def student_changelist(ctx):
+    ctx.get("/admin/accounts/student/")
+
+
+# Custo da sessão por requisição em cada engine de SESSION_ENGINES
+# (core/settings.py), não importa qual esteja configurado: compare
+# "session.read.db" com "session.read.cached_db" para ver o que a troca poupa.
+
+
+def _session_store(engine):
+    return import_module(settings.SESSION_ENGINES[engine]).SessionStore
+
+
+def session_login(ctx, engine):
+    # O que django.contrib.auth.login() grava na sessão
+    guardian = ctx.pick(ctx.guardians)
+    session = _session_store(engine)()
+    session[SESSION_KEY] = str(guardian.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = guardian.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+def session_read(ctx, engine):
+    # Requisição autenticada: o middleware carrega a sessão pela chave do cookie
+    if engine not in ctx.sessions:
+        ctx.sessions[engine] = session_login(ctx, engine)
+    _session_store(engine)(ctx.sessions[engine])[SESSION_KEY]
+
+
+for _engine in settings.SESSION_ENGINES:
+    scenario(f"session.read.{_engine}")(partial(session_read, engine=_engine))
+    scenario(f"session.login.{_engine}", kind="write")(
+        partial(session_login, engine=_engine)
+    )
@@ -0,0 +1,103 @@
+# Em /core/admin.py
+#
+# Peças reutilizáveis do admin para tabelas muito grandes (dezenas de milhões
+# de linhas). Não registra nenhum modelo.
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+
+from .pagination import (
+    EstimatedCountPaginator,
+    InvalidCursor,
+    decode_cursor,
+    keyset_page,
+)
+
+# Parâmetros da URL com o cursor da página (ver core/pagination.py)
+AFTER_VAR = "after"
+BEFORE_VAR = "before"
+
+
+class KeysetChangeList(ChangeList):
+    # Na ordenação padrão, pagina por chave (?after=/?before=) em vez de
+    # ?p=N. Se o usuário ordenar por uma coluna, volta à paginação por OFFSET.
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        lookup_params.pop(BEFORE_VAR, None)
+        return lookup_params
+
+    @property
+    def uses_keyset(self):
+        return (
+            ORDER_VAR not in self.params
+            and not self.show_all
+            and not self.list_editable
+        )
+
+    def cursor_values(self, var):
+        token = self.params.get(var)
+        if not token:
+            return None
+        fields = [
+            self.opts.get_field(name.lstrip("-"))
+            for name in self.model_admin.keyset_ordering
+        ]
+        try:
+            return decode_cursor(token, fields)
+        except InvalidCursor:
+            raise IncorrectLookupParameters
+
+    def get_results(self, request):
+        if not self.uses_keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page
+        )
+        rows, previous_cursor, next_cursor = keyset_page(
+            self.queryset,
+            self.model_admin.keyset_ordering,
+            self.list_per_page,
+            after=self.cursor_values(AFTER_VAR),
+            before=self.cursor_values(BEFORE_VAR),
+        )
+        self.result_count = paginator.count
+        self.count_is_estimated = getattr(paginator, "is_estimated", False)
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = bool(previous_cursor or next_cursor)
+        self.paginator = paginator
+        self.previous_url = previous_cursor and self.get_query_string(
+            {BEFORE_VAR: previous_cursor}, remove=[AFTER_VAR, BEFORE_VAR]
+        )
+        self.next_url = next_cursor and self.get_query_string(
+            {AFTER_VAR: next_cursor}, remove=[AFTER_VAR, BEFORE_VAR]
+        )
+        self.first_url = (AFTER_VAR in self.params or BEFORE_VAR in self.params) and (
+            self.get_query_string(remove=[AFTER_VAR, BEFORE_VAR])
+        )
+
+
+class KeysetPaginationMixin:
+    # Para ModelAdmins de tabelas enormes. Declare a chave de paginação, que
+    # deve ser única e coberta por um índice, ex.:
+    #   keyset_ordering = ("-completed_at", "-id")
+    keyset_ordering = ("-id",)
+    # Contagem estimada (pg_class/EXPLAIN) e nenhum COUNT(*) extra: nem o
+    # total sem filtros, nem as contagens por opção dos filtros (facets)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    change_list_template = "admin/keyset_change_list.html"
+
+    def get_ordering(self, request):
+        return self.ordering or self.keyset_ordering
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
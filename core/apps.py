@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+
+    def ready(self):
+        # Registra as verificações e, antes da primeira conexão com o banco,
+        # o receiver que instala a instrumentação de queries em cada conexão
+        from . import checks, instrumentation  # noqa: F401
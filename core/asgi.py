@@ -7,6 +7,15 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
+# Caminho de produção: rode com qualquer servidor ASGI, por exemplo
+# "uvicorn core.asgi:application --workers 4". Todos os middlewares de
+# settings.MIDDLEWARE aceitam o modo assíncrono (verificação core.W001), e a
+# API do aluno em /api/student/ (learning/api.py) usa o ORM assíncrono.
+# Os middlewares do Django (sessão, CSRF, autenticação...) são assíncronos só
+# via MiddlewareMixin: cada process_request/process_response ainda roda numa
+# thread (sync_to_async). Só os de core/middleware.py ficam no event loop.
+# "manage.py benchmark_servers" compara este caminho com core/wsgi.py.
+
 import os
 
 from django.core.asgi import get_asgi_application
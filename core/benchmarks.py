@@ -0,0 +1,359 @@
+# Em /core/benchmarks.py
+#
+# Suíte de benchmark da plataforma. Cada app registra seus cenários em um
+# módulo <app>/benchmarks.py (descoberto automaticamente, como o admin) com o
+# decorator @scenario. O comando "benchmark" roda os cenários contra o banco
+# atual (de preferência populado com "seed_data"), mede latência e número de
+# queries de cada iteração e desfaz tudo no fim (uma transação com rollback).
+#
+# No fim do arquivo fica o teste de carga do comando "benchmark_servers", que
+# dispara requisições concorrentes direto nas aplicações de core/wsgi.py e
+# core/asgi.py (sem servidor HTTP na frente) e compara vazão e p99.
+
+import asyncio
+import io
+import logging
+import random
+import statistics
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils.module_loading import autodiscover_modules
+
+SCENARIOS = {}
+
+
+@dataclass
+class Scenario:
+    name: str
+    kind: str  # "read" ou "write"
+    function: object
+
+
+def scenario(name, kind="read"):
+    def decorator(function):
+        SCENARIOS[name] = Scenario(name, kind, function)
+        return function
+
+    return decorator
+
+
+def discover():
+    autodiscover_modules("benchmarks")
+    return SCENARIOS
+
+
+class BenchmarkContext:
+    # Amostras de dados usadas pelos cenários (sorteadas a cada iteração)
+
+    def __init__(self, seed=None, sample_size=50):
+        from accounts.models import RoleChoices, Student, User
+        from learning.models import Course, Enrollment
+
+        self.rng = random.Random(seed)
+        enrollments = list(
+            Enrollment.objects.order_by("?").values_list(
+                "student_id", "student__user_id", "course_id"
+            )[:sample_size]
+        )
+        if not enrollments:
+            raise ValueError("Banco sem matrículas: rode 'seed_data' antes.")
+        self.students = list(Student.objects.filter(pk__in={e[0] for e in enrollments}))
+        self.guardians = list(User.objects.filter(pk__in={e[1] for e in enrollments}))
+        self.courses = list(Course.objects.filter(pk__in={e[2] for e in enrollments}))
+        # Chave de uma sessão por engine (cenários session.* de accounts/benchmarks.py)
+        self.sessions = {}
+
+        # Superusuário temporário para os cenários do admin (some no rollback)
+        admin = User.objects.create_superuser(
+            email="benchmark@hipersaber.local",
+            full_name="Benchmark",
+            password=None,
+            role=RoleChoices.SUPERUSER,
+        )
+        self.client = Client()
+        self.client.force_login(admin)
+
+    def pick(self, items):
+        return self.rng.choice(items)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        if response.status_code != 200:
+            raise AssertionError(f"GET {url} devolveu {response.status_code}")
+        if getattr(response, "streaming", False):
+            b"".join(response.streaming_content)
+        return response
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def summarize(timings, queries):
+    timings = sorted(timings)
+    return {
+        "iterations": len(timings),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "p50_ms": round(_percentile(timings, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(timings, 0.95) * 1000, 3),
+        "p99_ms": round(_percentile(timings, 0.99) * 1000, 3),
+        "queries": statistics.median(queries),
+        "max_queries": max(queries),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, iterations=50, warmup=5, seed=None, on_result=None):
+    # Devolve {nome: resumo}. Nada do que os cenários gravam é persistido.
+    # A linha de log por requisição (core/middleware.py) só atrapalharia aqui
+    instrumentation_logger = logging.getLogger("core.instrumentation")
+    previous_level = instrumentation_logger.level
+    instrumentation_logger.setLevel(logging.ERROR)
+    try:
+        with override_settings(ALLOWED_HOSTS=["testserver"]), transaction.atomic():
+            results = _measure(names, iterations, warmup, seed, on_result)
+            transaction.set_rollback(True)
+    finally:
+        instrumentation_logger.setLevel(previous_level)
+    return results
+
+
+def _measure(names, iterations, warmup, seed, on_result):
+    results = {}
+    context = BenchmarkContext(seed=seed)
+    for name in names:
+        current = SCENARIOS[name]
+        for _ in range(warmup):
+            current.function(context)
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                current.function(context)
+                timings.append(time.perf_counter() - started)
+            queries.append(len(captured))
+        results[name] = {"kind": current.kind, **summarize(timings, queries)}
+        if on_result:
+            on_result(name, results[name])
+    return results
+
+
+# --- Carga concorrente: WSGI x ASGI ---
+
+# Modo -> (aplicação, prefixo das rotas). "asgi-sync" mede as views síncronas
+# servidas pelo ASGI, o custo de não migrar uma view.
+LOAD_MODES = {
+    "wsgi": ("core.wsgi", "learning"),
+    "asgi": ("core.asgi", "student-api"),
+    "asgi-sync": ("core.asgi", "learning"),
+}
+LOAD_HOST = "testserver"
+
+
+def _wsgi_request(application, path, cookie):
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": "",
+        "SERVER_NAME": LOAD_HOST,
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": LOAD_HOST,
+        "HTTP_COOKIE": cookie,
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": io.StringIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    status = []
+
+    def start_response(line, headers, exc_info=None):
+        status.append(line)
+
+    body = application(environ, start_response)
+    try:
+        for _ in body:
+            pass
+    finally:
+        body.close()
+    return int(status[0][:3])
+
+
+async def _asgi_request(application, path, cookie):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", LOAD_HOST.encode()), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (LOAD_HOST, 80),
+    }
+    finished = asyncio.Event()
+    status = []
+    received = False
+
+    async def receive():
+        # O Django volta a chamar receive() para detectar desconexão: só
+        # desconecta depois que a resposta inteira foi enviada
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif not message.get("more_body"):
+            finished.set()
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def _timed_wsgi(application, paths, cookie, total, concurrency):
+    def request(index):
+        started = time.perf_counter()
+        status = _wsgi_request(application, paths[index % len(paths)], cookie)
+        return time.perf_counter() - started, status
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        return list(pool.map(request, range(total)))
+
+
+def _timed_asgi(application, paths, cookie, total, concurrency):
+    async def main():
+        indexes = iter(range(total))
+        results = []
+
+        async def worker():
+            # Um único event loop: "indexes" é compartilhado sem trava
+            for index in indexes:
+                started = time.perf_counter()
+                status = await _asgi_request(
+                    application, paths[index % len(paths)], cookie
+                )
+                results.append((time.perf_counter() - started, status))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return results
+
+    return asyncio.run(main())
+
+
+def load_targets(sample_size=20):
+    # public_ids de cursos e alunos com matrícula, usados como alvo das rotas
+    from learning.models import Enrollment
+
+    rows = list(
+        Enrollment.objects.order_by("?").values_list(
+            "course__public_id", "student__public_id"
+        )[:sample_size]
+    )
+    if not rows:
+        raise ValueError("Banco sem matrículas: rode 'seed_data' antes.")
+    return sorted({row[0] for row in rows}), sorted({row[1] for row in rows})
+
+
+def load_paths(namespace, courses, students):
+    # Alterna a árvore do curso (anônima) e o progresso do aluno (com login)
+    paths = []
+    for index in range(max(len(courses), len(students))):
+        paths.append(
+            reverse(f"{namespace}:course-outline", args=[courses[index % len(courses)]])
+        )
+        paths.append(
+            reverse(
+                f"{namespace}:student-progress", args=[students[index % len(students)]]
+            )
+        )
+    return paths
+
+
+def run_load(modes, total=500, concurrency=20, warmup=20, on_result=None):
+    # Devolve {modo: {requests, errors, seconds, rps, p50_ms, p95_ms, p99_ms}}.
+    # Ao contrário de run(), as requisições rodam em várias conexões e não
+    # cabem numa transação: os cenários são só de leitura, e o superusuário
+    # temporário (para o login) é apagado no fim.
+    from accounts.models import RoleChoices, User
+
+    courses, students = load_targets()
+    # Importadas antes de calar o log: get_*_application() chama
+    # django.setup(), que reconfigura o logging
+    applications = {
+        mode: import_module(LOAD_MODES[mode][0]).application for mode in modes
+    }
+    user = User.objects.create_superuser(
+        email="benchmark-load@hipersaber.local",
+        full_name="Benchmark",
+        password=None,
+        role=RoleChoices.SUPERUSER,
+    )
+    client = Client()
+    client.force_login(user)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.session.session_key}"
+
+    instrumentation_logger = logging.getLogger("core.instrumentation")
+    previous_level = instrumentation_logger.level
+    instrumentation_logger.setLevel(logging.ERROR)
+    results = {}
+    try:
+        with override_settings(ALLOWED_HOSTS=[LOAD_HOST]):
+            for mode in modes:
+                module, namespace = LOAD_MODES[mode]
+                paths = load_paths(namespace, courses, students)
+                timed = _timed_asgi if module == "core.asgi" else _timed_wsgi
+                timed(applications[mode], paths, cookie, warmup, concurrency)
+                started = time.perf_counter()
+                samples = timed(applications[mode], paths, cookie, total, concurrency)
+                seconds = time.perf_counter() - started
+                timings = sorted(elapsed for elapsed, _ in samples)
+                results[mode] = {
+                    "requests": total,
+                    "concurrency": concurrency,
+                    "errors": sum(status != 200 for _, status in samples),
+                    "seconds": round(seconds, 3),
+                    "rps": round(total / seconds, 1),
+                    "p50_ms": round(_percentile(timings, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(timings, 0.95) * 1000, 3),
+                    "p99_ms": round(_percentile(timings, 0.99) * 1000, 3),
+                }
+                if on_result:
+                    on_result(mode, results[mode])
+    finally:
+        instrumentation_logger.setLevel(previous_level)
+        client.logout()
+        user.delete()
+    return results
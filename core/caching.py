@@ -0,0 +1,170 @@
+# Em /core/caching.py
+#
+# Camada de cache compartilhada (backend em CACHES, core/settings.py: Redis
+# em produção, memória local ou arquivos em desenvolvimento e testes).
+#
+#   - Tags: cada entrada guarda as versões das tags de que depende
+#     (ex.: "learning:outline:<curso>"). invalidate_tags() incrementa a versão
+#     da tag depois do commit, e todas as entradas com ela ficam velhas, sem
+#     precisar conhecer as chaves. As versões partem do relógio, para nunca
+#     reaproveitar uma versão antiga se o contador for expulso do cache.
+#   - Single-flight: quando uma entrada fica velha (expirou ou foi
+#     invalidada), só quem consegue o lock (cache.add) recalcula. Os outros
+#     continuam servindo a versão velha por até STALE_TIMEOUT, em vez de todos
+#     irem ao PostgreSQL ao mesmo tempo. Sem versão velha para servir (chave
+#     nova ou expulsa), esperam o recálculo por até WAIT_TIMEOUT.
+#
+# Com a memória local, tudo isso vale só dentro de cada processo.
+
+import asyncio
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+STALE_TIMEOUT = 60 * 60  # Quanto tempo depois de velha a entrada ainda serve
+LOCK_TIMEOUT = 30  # Teto do recálculo (o lock some sozinho se o worker morrer)
+WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.05
+
+
+def is_shared(alias="default"):
+    # False se o cache é só deste processo (memória local ou dummy)
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def _tag_key(tag):
+    return f"cache-tag:{tag}"
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def tag_versions(tags):
+    # Versões atuais das tags, na ordem recebida (1 ida ao cache, +2 para
+    # inicializar as que faltarem)
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # add() não sobrescreve se outro processo inicializou antes
+        for key in missing:
+            cache.add(key, _new_version(), timeout=None)
+        versions.update(cache.get_many(missing))
+    return tuple(versions.get(key) for key in keys)
+
+
+async def atag_versions(tags):
+    keys = [_tag_key(tag) for tag in tags]
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, _new_version(), timeout=None)
+        versions.update(await cache.aget_many(missing))
+    return tuple(versions.get(key) for key in keys)
+
+
+def _bump(tag):
+    try:
+        cache.incr(_tag_key(tag))
+    except ValueError:
+        # Contador expulso do cache: recomeça de um valor novo
+        cache.set(_tag_key(tag), _new_version(), timeout=None)
+
+
+def invalidate_tags(*tags):
+    # Só invalida depois do commit, para que ninguém recoloque no cache a
+    # versão antiga enquanto a transação ainda está aberta
+    for tag in tags:
+        transaction.on_commit(lambda tag=tag: _bump(tag))
+
+
+async def ainvalidate_tags(*tags):
+    # Views assíncronas rodam em autocommit: não há commit a esperar
+    for tag in tags:
+        try:
+            await cache.aincr(_tag_key(tag))
+        except ValueError:
+            await cache.aset(_tag_key(tag), _new_version(), timeout=None)
+
+
+def _entry(value, versions, timeout):
+    return {"value": value, "versions": versions, "fresh_until": time.time() + timeout}
+
+
+def _is_fresh(entry, versions):
+    return (
+        entry is not None
+        and entry["versions"] == versions
+        and entry["fresh_until"] > time.time()
+    )
+
+
+def get_or_compute(key, compute, timeout, tags=()):
+    # Valor da chave, recalculado por compute() quando velho. Exceções de
+    # compute() passam adiante (e liberam o lock).
+    versions = tag_versions(tags)
+    entry = cache.get(key)
+    if _is_fresh(entry, versions):
+        return entry["value"]
+
+    lock = _lock_key(key)
+    if cache.add(lock, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, _entry(value, versions, timeout), timeout + STALE_TIMEOUT)
+        finally:
+            cache.delete(lock)
+        return value
+    if entry is not None:
+        return entry["value"]  # Outro worker está recalculando
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry["versions"] == versions:
+            return entry["value"]
+    # O outro worker demorou demais (ou morreu): calcula sem esperar mais
+    value = compute()
+    cache.set(key, _entry(value, versions, timeout), timeout + STALE_TIMEOUT)
+    return value
+
+
+async def aget_or_compute(key, compute, timeout, tags=()):
+    # Como get_or_compute, com compute() assíncrono
+    versions = await atag_versions(tags)
+    entry = await cache.aget(key)
+    if _is_fresh(entry, versions):
+        return entry["value"]
+
+    lock = _lock_key(key)
+    if await cache.aadd(lock, 1, LOCK_TIMEOUT):
+        try:
+            value = await compute()
+            await cache.aset(
+                key, _entry(value, versions, timeout), timeout + STALE_TIMEOUT
+            )
+        finally:
+            await cache.adelete(lock)
+        return value
+    if entry is not None:
+        return entry["value"]
+
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(WAIT_INTERVAL)
+        entry = await cache.aget(key)
+        if entry is not None and entry["versions"] == versions:
+            return entry["value"]
+    value = await compute()
+    await cache.aset(key, _entry(value, versions, timeout), timeout + STALE_TIMEOUT)
+    return value
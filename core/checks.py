@@ -0,0 +1,58 @@
+# Em /core/checks.py
+#
+# Verificações do "manage.py check" sobre o caminho de produção ASGI
+# (core/asgi.py). Um middleware que só funciona em modo síncrono obriga o
+# Django a envolver o resto da cadeia em sync_to_async/async_to_sync, e cada
+# requisição passa a trocar de thread uma vez por middleware adaptado.
+# Passar na verificação não basta para evitar as trocas: os middlewares do
+# próprio Django são assíncronos via MiddlewareMixin, que ainda roda cada
+# process_request/process_response numa thread (sync_to_async). Só os
+# middlewares com __acall__ próprio (core/middleware.py) ficam no event loop.
+#
+# No deploy ("check --deploy"), avisa também se o cache é só do processo: os
+# buffers de learning/study.py, o single-flight de core/caching.py e as
+# sessões "cached_db" contam com um cache compartilhado entre os workers.
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.utils.module_loading import import_string
+
+from .caching import is_shared
+
+
+@register("async")
+def check_async_middleware(app_configs, **kwargs):
+    errors = []
+    for path in settings.MIDDLEWARE:
+        middleware = import_string(path)
+        if not getattr(middleware, "async_capable", False):
+            errors.append(
+                Warning(
+                    f"O middleware {path} não é assíncrono.",
+                    hint=(
+                        "Implemente __acall__ e declare async_capable = True "
+                        "(ver core/middleware.py), senão o ASGI troca de "
+                        "thread a cada requisição."
+                    ),
+                    obj=path,
+                    id="core.W001",
+                )
+            )
+    return errors
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if not is_shared():
+        return [
+            Warning(
+                "O cache padrão é só deste processo.",
+                hint=(
+                    "Use CACHE_BACKEND=redis: os heartbeats de estudo, os "
+                    "recálculos do cache e as sessões precisam ser vistos por "
+                    "todos os workers (sem ele, SESSION_BACKEND=cached_db vira db)."
+                ),
+                id="core.W002",
+            )
+        ]
+    return []
@@ -0,0 +1,84 @@
+# Em /core/dbpool.py
+#
+# Estado das conexões com o banco, para o /metrics/queries/ e o comando
+# "benchmark_servers". Os modos são configurados no .env (ver DATABASES em
+# core/settings.py):
+#   - pool do psycopg 3 (DATABASE_POOL=True): conexões abertas uma vez e
+#     emprestadas a cada requisição. As estatísticas do pool mostram quantas
+#     estão em uso, quantas requisições esperam na fila e quanto tempo
+#     esperaram, o sinal para aumentar DATABASE_POOL_MAX_SIZE;
+#   - conexões persistentes (CONN_MAX_AGE): uma por thread, reaproveitada
+#     entre requisições. O custo a observar é o "connects" por view nas
+#     métricas do core/instrumentation.py (idealmente perto de zero).
+
+import statistics
+import time
+
+from django.db import connections
+
+
+def pool_enabled(alias="default"):
+    return bool(connections.settings[alias].get("OPTIONS", {}).get("pool"))
+
+
+def pool_stats(alias="default"):
+    # Estatísticas do pool (desde o início do processo), ou None sem pool
+    if not pool_enabled(alias):
+        return None
+    pool = connections[alias].pool
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "min_size": pool.min_size,
+        "max_size": pool.max_size,
+        "size": size,
+        "in_use": size - available,
+        "available": available,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        # Empréstimos que precisaram esperar uma conexão livre
+        "queued": stats.get("requests_queued", 0),
+        "wait_ms_total": wait_ms,
+        "wait_ms_avg": round(wait_ms / requests, 3) if requests else 0.0,
+        "timeouts": stats.get("requests_errors", 0),
+        "connections_opened": stats.get("connections_num", 0),
+        "connect_ms_total": stats.get("connections_ms", 0),
+        "connections_lost": stats.get("connections_lost", 0),
+    }
+
+
+def database_stats():
+    result = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        result[alias] = {
+            "pooled": pool_enabled(alias),
+            "conn_max_age": settings_dict.get("CONN_MAX_AGE"),
+            "health_checks": settings_dict.get("CONN_HEALTH_CHECKS"),
+            "pool": pool_stats(alias),
+        }
+    return result
+
+
+def measure_connect(iterations=30, alias="default"):
+    # Latência de um SELECT 1 logo depois de obter uma conexão (handshake
+    # completo ou empréstimo do pool) comparada com a mesma query numa
+    # conexão já aberta. Não use dentro de uma transação.
+    connection = connections[alias]
+    fresh, reused = [], []
+    for _ in range(iterations):
+        connection.close()
+        for timings in (fresh, reused):
+            started = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            timings.append(time.perf_counter() - started)
+    return {
+        "iterations": iterations,
+        "connect_ms_p50": round(statistics.median(fresh) * 1000, 3),
+        "reuse_ms_p50": round(statistics.median(reused) * 1000, 3),
+        "connect_ms_max": round(max(fresh) * 1000, 3),
+    }
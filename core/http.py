@@ -0,0 +1,79 @@
+# Em /core/http.py
+#
+# Respostas HTTP reutilizáveis pelos apps.
+
+import re
+
+from django.http import HttpResponse, StreamingHttpResponse
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    # Interpreta um header "Range: bytes=início-fim" (um único intervalo).
+    # Devolve (início, fim) inclusivos, None se o header for ignorável ou
+    # levanta ValueError se o intervalo não puder ser atendido.
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # "bytes=-500": os últimos 500 bytes
+        length = int(last)
+        if not length:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _read(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(STREAM_BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def ranged_file_response(request, file, size, content_type, etag=None, max_age=None):
+    # Serve um arquivo aberto (ex.: default_storage.open()) com suporte a
+    # Range (206/416), como os players de áudio e vídeo esperam. Com etag,
+    # responde 304 a If-None-Match. O arquivo é fechado ao fim da resposta.
+    headers = {"Accept-Ranges": "bytes"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            file.close()
+            return HttpResponse(status=304, headers=headers)
+    if max_age is not None:
+        headers["Cache-Control"] = f"public, max-age={max_age}, immutable"
+
+    try:
+        byte_range = parse_range(request.headers.get("Range"), size)
+    except ValueError:
+        file.close()
+        headers["Content-Range"] = f"bytes */{size}"
+        return HttpResponse(status=416, headers=headers)
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    length = end - start + 1
+    headers["Content-Length"] = str(length)
+    return StreamingHttpResponse(
+        _read(file, start, length),
+        status=status,
+        content_type=content_type,
+        headers=headers,
+    )
@@ -0,0 +1,199 @@
+# Em /core/instrumentation.py
+#
+# Instrumentação de queries por requisição: contagem, tempo de banco,
+# fingerprints de queries repetidas (o sintoma clássico de N+1) e orçamento
+# de queries por view. Usado pelo QueryInstrumentationMiddleware
+# (core/middleware.py) e pelos testes.
+
+import hashlib
+import re
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_SPACES = re.compile(r"\s+")
+_active_recorders = ContextVar("query_recorders", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries, max_duplicates=None):
+    # Decorator de view: declara o orçamento de queries da view
+    def decorator(view):
+        view.query_budget = (max_queries, max_duplicates)
+        return view
+
+    return decorator
+
+
+def budget_for(match):
+    # Orçamento (max_queries, max_duplicates) da view resolvida, ou (None, None).
+    # Views usam @query_budget; um ModelAdmin declara "query_budgets" por
+    # página, ex.: query_budgets = {"changelist": 10, "change": (15, 2)}
+    budget = getattr(match.func, "query_budget", None)
+    model_admin = getattr(match.func, "model_admin", None)
+    if budget is None and model_admin is not None and match.url_name:
+        page = match.url_name.rsplit("_", 1)[-1]
+        budget = getattr(model_admin, "query_budgets", {}).get(page)
+    if budget is None:
+        return None, None
+    return budget if isinstance(budget, tuple) else (budget, None)
+
+
+def fingerprint(sql):
+    # As queries do ORM já chegam parametrizadas (%s), então basta normalizar
+    # espaços e listas IN de tamanho variável
+    normalized = _IN_LIST.sub("IN (...)", _SPACES.sub(" ", sql.strip()))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:10], normalized
+
+
+def _dispatch(execute, sql, params, many, context):
+    # Wrapper fixo de cada conexão: repassa a query aos QueryRecorders ativos
+    # no contexto atual. Por ser um ContextVar, o recorder aberto numa view
+    # assíncrona também vê as queries que o ORM executa na thread do
+    # sync_to_async (aget, aiterator...), sem trocar de thread para se instalar.
+    for recorder in reversed(_active_recorders.get()):
+        execute = partial(recorder, execute)
+    return execute(sql, params, many, context)
+
+
+def _install(connection):
+    # No início da lista, para não atrapalhar o pop() dos execute_wrapper()
+    # abertos por outro código enquanto a conexão era criada
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _dispatch)
+
+
+def _connected(sender, connection, **kwargs):
+    # Conexão nova: um handshake com o PostgreSQL ou, com pool, uma conexão
+    # emprestada do pool (ver core/dbpool.py)
+    _install(connection)
+    for recorder in _active_recorders.get():
+        recorder.connects += 1
+
+
+connection_created.connect(_connected, dispatch_uid="core.instrumentation")
+
+
+class QueryRecorder:
+    # Context manager que registra todas as queries de todos os bancos feitas
+    # no contexto atual (mesma thread, ou a mesma requisição no ASGI)
+
+    def __init__(self):
+        self.count = 0
+        self.connects = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+        self._token = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.count += 1
+            key, normalized = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.samples.setdefault(key, normalized)
+
+    def __enter__(self):
+        # Conexões abertas antes deste módulo ser importado não passaram pelo
+        # signal connection_created
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        self._token = _active_recorders.set((*_active_recorders.get(), self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_recorders.reset(self._token)
+
+    @property
+    def duplicates(self):
+        # Execuções "a mais" de uma mesma query (N+1 gera N-1 duplicatas)
+        return sum(n - 1 for n in self.fingerprints.values() if n > 1)
+
+    def top_duplicates(self, limit=3):
+        return [
+            (key, n, self.samples[key])
+            for key, n in self.fingerprints.most_common(limit)
+            if n > 1
+        ]
+
+
+class QueryMetrics:
+    # Agregado em memória, por processo, das requisições de cada view
+
+    def __init__(self, sample_size=1000):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._sample_size = sample_size
+
+    def record(
+        self, view_name, queries, duplicates, db_ms, wall_ms, over_budget, connects=0
+    ):
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = {
+                    "requests": 0,
+                    "queries_total": 0,
+                    "queries_max": 0,
+                    "duplicates_total": 0,
+                    "db_ms_total": 0.0,
+                    "wall_ms_total": 0.0,
+                    "over_budget": 0,
+                    "connects_total": 0,
+                    "wall_samples": deque(maxlen=self._sample_size),
+                }
+            stats["requests"] += 1
+            stats["queries_total"] += queries
+            stats["queries_max"] = max(stats["queries_max"], queries)
+            stats["duplicates_total"] += duplicates
+            stats["db_ms_total"] += db_ms
+            stats["wall_ms_total"] += wall_ms
+            stats["over_budget"] += int(over_budget)
+            stats["connects_total"] += connects
+            stats["wall_samples"].append(wall_ms)
+
+    def snapshot(self):
+        with self._lock:
+            views = {
+                name: {**stats, "wall_samples": sorted(stats["wall_samples"])}
+                for name, stats in self._views.items()
+            }
+        result = {}
+        for name, stats in views.items():
+            samples = stats.pop("wall_samples")
+            requests = stats["requests"]
+            result[name] = {
+                **stats,
+                "queries_avg": round(stats["queries_total"] / requests, 2),
+                "db_ms_avg": round(stats["db_ms_total"] / requests, 3),
+                "wall_ms_avg": round(stats["wall_ms_total"] / requests, 3),
+                "wall_ms_p50": round(statistics.median(samples), 3),
+                "wall_ms_p95": round(samples[int(0.95 * (len(samples) - 1))], 3),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+metrics = QueryMetrics()
+
+
+def enforce_budgets():
+    return getattr(settings, "QUERY_BUDGET_ENFORCE", False)
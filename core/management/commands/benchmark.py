@@ -0,0 +1,92 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede latência (p50/p95/p99) e número de queries dos caminhos de leitura "
+        "e escrita da plataforma. Os resultados podem ser salvos em JSON e "
+        "comparados entre commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            default=[],
+            help="Roda só os cenários com esse prefixo (pode ser repetido).",
+        )
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", "-o", help="Salva os resultados em JSON.")
+        parser.add_argument(
+            "--compare", metavar="ARQUIVO", help="JSON de uma execução anterior."
+        )
+        parser.add_argument("--list", action="store_true", help="Lista os cenários.")
+
+    def handle(self, *args, **options):
+        scenarios = benchmarks.discover()
+        names = sorted(
+            name
+            for name in scenarios
+            if not options["scenario"]
+            or any(name.startswith(prefix) for prefix in options["scenario"])
+        )
+        if options["list"]:
+            for name in names:
+                self.stdout.write(f"{name} ({scenarios[name].kind})")
+            return
+        if not names:
+            raise CommandError("Nenhum cenário encontrado.")
+        if options["iterations"] < 1:
+            raise CommandError("--iterations deve ser maior que zero.")
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                baseline = json.load(file).get("scenarios", {})
+
+        self.stdout.write(
+            f"{'cenário':<36} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}"
+        )
+
+        def report(name, result):
+            line = (
+                f"{name:<36} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms "
+                f"{result['p99_ms']:>7.2f}ms {result['queries']:>8}"
+            )
+            previous = baseline.get(name)
+            if previous:
+                delta = (result["p50_ms"] / previous["p50_ms"] - 1) * 100 if previous["p50_ms"] else 0
+                line += f"  p50 {delta:+.0f}%, queries {result['queries'] - previous['queries']:+}"
+            self.stdout.write(line)
+
+        try:
+            results = benchmarks.run(
+                names,
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                seed=options["seed"],
+                on_result=report,
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "revision": benchmarks.git_revision(),
+                        "date": timezone.now().isoformat(),
+                        "iterations": options["iterations"],
+                        "scenarios": results,
+                    },
+                    file,
+                    indent=2,
+                )
+            self.stdout.write(self.style.SUCCESS(f"Resultados salvos em {options['output']}."))
@@ -0,0 +1,99 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import benchmarks, dbpool
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara vazão (req/s) e p99 do caminho WSGI (views síncronas) com o "
+        "ASGI (API assíncrona do aluno) sob requisições concorrentes. Só faz "
+        "leituras; rode contra um banco populado com 'seed_data'. Para medir o "
+        "efeito do pool ou do CONN_MAX_AGE, rode com cada configuração do .env "
+        "e compare as saídas com --output/--compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=sorted(benchmarks.LOAD_MODES),
+            help="Modos a medir (padrão: wsgi e asgi). Pode ser repetido.",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--output", "-o", help="Salva os resultados em JSON.")
+        parser.add_argument(
+            "--compare", metavar="ARQUIVO", help="JSON de uma execução anterior."
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests e --concurrency devem ser maiores que zero.")
+        modes = options["mode"] or ["wsgi", "asgi"]
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                baseline = json.load(file).get("modes", {})
+
+        database = dbpool.database_stats()["default"]
+        if database["pooled"]:
+            pool = database["pool"]
+            self.stdout.write(
+                f"conexões: pool de {pool['min_size']} a {pool['max_size']}"
+            )
+        else:
+            self.stdout.write(f"conexões: CONN_MAX_AGE={database['conn_max_age']}")
+        connect = dbpool.measure_connect()
+        self.stdout.write(
+            f"SELECT 1 com conexão nova: {connect['connect_ms_p50']:.2f}ms, "
+            f"numa conexão aberta: {connect['reuse_ms_p50']:.2f}ms (p50)"
+        )
+
+        self.stdout.write(
+            f"{'modo':<10} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'erros':>6}"
+        )
+
+        def report(mode, result):
+            line = (
+                f"{mode:<10} {result['rps']:>8.1f} {result['p50_ms']:>7.2f}ms "
+                f"{result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms "
+                f"{result['errors']:>6}"
+            )
+            previous = baseline.get(mode)
+            if previous:
+                line += (
+                    f"  req/s {(result['rps'] / previous['rps'] - 1) * 100:+.0f}%, "
+                    f"p99 {(result['p99_ms'] / previous['p99_ms'] - 1) * 100:+.0f}%"
+                )
+            self.stdout.write(line)
+
+        try:
+            results = benchmarks.run_load(
+                modes,
+                total=options["requests"],
+                concurrency=options["concurrency"],
+                warmup=options["warmup"],
+                on_result=report,
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "revision": benchmarks.git_revision(),
+                        "date": timezone.now().isoformat(),
+                        "database": {**database, "connect": connect},
+                        "modes": results,
+                    },
+                    file,
+                    indent=2,
+                )
+            self.stdout.write(
+                self.style.SUCCESS(f"Resultados salvos em {options['output']}.")
+            )
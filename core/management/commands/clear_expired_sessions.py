@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sessions import clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga as sessões vencidas da django_session em lotes curtos, sem "
+        "travar a tabela. Agende uma vez por dia (substitui o clearsessions)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Sessões por DELETE (padrão: SESSION_CLEANUP_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            metavar="SEGUNDOS",
+            help="Pausa entre os lotes, para aliviar réplicas e o autovacuum.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] is not None and options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser maior que zero.")
+        deleted = clear_expired_sessions(options["batch_size"], options["pause"])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} sessão(ões) apagada(s)."))
@@ -0,0 +1,107 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Student
+from learning.models import Course, Enrollment, Lesson, LessonProgress
+from support.models import OPEN_TICKET_STATUSES, SupportTicket, TicketStatusChoices
+
+
+def canonical_queries(student, course):
+    # Consultas "quentes" da plataforma e o índice que cada uma deve usar
+    return [
+        (
+            "Progresso do aluno em um curso",
+            LessonProgress.objects.filter(
+                student=student, lesson__module__course=course
+            ).values("lesson_id", "completed_at"),
+            "progress_student_lesson_uniq",
+        ),
+        (
+            "Última atividade do aluno",
+            LessonProgress.objects.filter(student=student)
+            .order_by("-completed_at")
+            .values("lesson_id", "completed_at")[:10],
+            "progress_student_recent_idx",
+        ),
+        (
+            "Matrículas do aluno (mais recentes primeiro)",
+            Enrollment.objects.filter(student=student).order_by("-enrolled_at"),
+            "enrollment_student_recent_idx",
+        ),
+        (
+            "Árvore de lições do curso",
+            Lesson.objects.filter(module__course=course).order_by(
+                "module__module_order", "lesson_order"
+            ),
+            None,
+        ),
+        (
+            "Tickets novos (fila do suporte)",
+            SupportTicket.objects.filter(status=TicketStatusChoices.NOVO).order_by(
+                "-created_at"
+            )[:100],
+            "ticket_status_recent_idx",
+        ),
+        (
+            "Tickets em aberto",
+            SupportTicket.objects.filter(status__in=OPEN_TICKET_STATUSES).order_by(
+                "-created_at"
+            )[:100],
+            "ticket_open_recent_idx",
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa EXPLAIN ANALYZE nas consultas canônicas da plataforma e "
+        "confere se o planejador usa os índices declarados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--student", metavar="PUBLIC_ID", help="Aluno de exemplo.")
+        parser.add_argument("--course", metavar="PUBLIC_ID", help="Curso de exemplo.")
+        parser.add_argument(
+            "--no-analyze",
+            action="store_true",
+            help="Só EXPLAIN (sem executar as consultas).",
+        )
+
+    def handle(self, *args, **options):
+        # Por padrão usa a matrícula mais recente como amostra
+        enrollment = Enrollment.objects.order_by("-pk").first()
+        try:
+            student = (
+                Student.objects.get(public_id=options["student"])
+                if options["student"]
+                else enrollment.student
+            )
+            course = (
+                Course.objects.get(public_id=options["course"])
+                if options["course"]
+                else enrollment.course
+            )
+        except (Student.DoesNotExist, Course.DoesNotExist, AttributeError):
+            raise CommandError(
+                "Aluno/curso de exemplo não encontrado (popule o banco ou use "
+                "--student/--course)."
+            )
+
+        missing = 0
+        for title, queryset, index in canonical_queries(student, course):
+            plan = queryset.explain(analyze=not options["no_analyze"], buffers=True)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {title}"))
+            self.stdout.write(plan)
+            if index and index not in plan:
+                missing += 1
+                self.stdout.write(self.style.WARNING(f"Índice {index} não utilizado."))
+            elif index:
+                self.stdout.write(self.style.SUCCESS(f"Índice {index} utilizado."))
+            self.stdout.write("")
+
+        if missing:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{missing} consulta(s) sem o índice esperado. Em bases pequenas "
+                    "o planejador prefere seq scan; rode ANALYZE em uma base populada."
+                )
+            )
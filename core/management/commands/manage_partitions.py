@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Cria as partições mensais dos próximos meses e desanexa (ou apaga) as "
+        "antigas das tabelas em settings.PARTITIONED_TABLES. Agende uma vez por dia."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=3,
+            help="Meses à frente com partição pronta (padrão: 3).",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=None,
+            metavar="MESES",
+            help="Desanexa as partições mais antigas que MESES meses.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Com --keep, apaga as partições desanexadas em vez de mantê-las.",
+        )
+
+    def handle(self, *args, **options):
+        for table, column in partitions.partitioned_tables().items():
+            created = partitions.ensure_partitions(
+                table, column, months_ahead=options["ahead"]
+            )
+            for name in created:
+                self.stdout.write(f"Criada: {name}")
+            if options["keep"] is not None:
+                for name in partitions.detach_partitions(
+                    table, options["keep"], drop=options["drop"]
+                ):
+                    action = "Apagada" if options["drop"] else "Desanexada"
+                    self.stdout.write(f"{action}: {name}")
+        self.stdout.write(self.style.SUCCESS("Partições em dia."))
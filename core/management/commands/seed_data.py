@@ -0,0 +1,242 @@
+import random
+import secrets
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import (
+    AdhdTypeChoices,
+    RoleChoices,
+    SchoolYearChoices,
+    Student,
+    User,
+)
+from learning.models import (
+    Course,
+    Enrollment,
+    Lesson,
+    LessonProgress,
+    LessonTypeChoices,
+    Module,
+)
+from support.models import SupportTicket, TicketStatusChoices
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula o banco com dados sintéticos em volume de produção "
+        "(responsáveis, alunos, cursos, matrículas, progresso e tickets) via bulk_create."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--guardians", type=int, default=50_000)
+        parser.add_argument("--students", type=int, default=100_000)
+        parser.add_argument("--courses", type=int, default=200)
+        parser.add_argument("--modules", type=int, default=5, help="Módulos por curso.")
+        parser.add_argument("--lessons", type=int, default=8, help="Lições por módulo.")
+        parser.add_argument(
+            "--enrollments", type=int, default=3, help="Matrículas por aluno."
+        )
+        parser.add_argument("--tickets", type=int, default=20_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, help="Semente do gerador aleatório.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        # Etiqueta da execução: permite rodar o comando várias vezes
+        self.tag = secrets.token_hex(3)
+        self.now = timezone.now()
+
+        guardian_ids = self.step("Responsáveis", self.create_guardians, options["guardians"])
+        student_ids = self.step(
+            "Alunos", self.create_students, options["students"], guardian_ids
+        )
+        lessons_by_course = self.step(
+            "Cursos", self.create_courses, options["courses"], options["modules"],
+            options["lessons"],
+        )
+        self.step(
+            "Matrículas e progresso", self.create_enrollments, student_ids,
+            lessons_by_course, options["enrollments"],
+        )
+        self.step("Tickets", self.create_tickets, options["tickets"], guardian_ids)
+        # bulk_create não dispara signals: recalcula os contadores de progresso
+        self.step(
+            "Contadores de progresso", call_command, "rebuild_enrollment_progress",
+            stdout=self.stdout,
+        )
+
+    def step(self, label, function, *args, **kwargs):
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{label}: {elapsed:.1f}s"))
+        return result
+
+    def bulk(self, model, objects, keep_ids=True):
+        # Grava em lotes, cada lote em sua transação. Devolve os ids criados
+        # (ou só a quantidade, para tabelas de milhões de linhas)
+        ids = []
+        total = 0
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                total += self._flush(model, batch, ids if keep_ids else None)
+                batch = []
+        if batch:
+            total += self._flush(model, batch, ids if keep_ids else None)
+        return ids if keep_ids else total
+
+    def _flush(self, model, batch, ids):
+        with transaction.atomic():
+            created = model.objects.bulk_create(batch)
+        if ids is not None:
+            ids.extend(obj.pk for obj in created)
+        return len(created)
+
+    def random_past(self, days=180):
+        return self.now - timedelta(seconds=self.rng.randint(0, days * 86400))
+
+    def create_guardians(self, count):
+        # Um único hash para todos: calcular PBKDF2 por usuário levaria horas
+        password = make_password("hipersaber")
+        return self.bulk(
+            User,
+            (
+                User(
+                    email=f"responsavel{n}.{self.tag}@seed.hipersaber.local",
+                    full_name=f"Responsável {n}",
+                    password=password,
+                    role=RoleChoices.GUARDIAN,
+                    agreed_to_terms=True,
+                )
+                for n in range(count)
+            ),
+        )
+
+    def create_students(self, count, guardian_ids):
+        school_years = SchoolYearChoices.values
+        adhd_types = AdhdTypeChoices.values
+        return self.bulk(
+            Student,
+            (
+                Student(
+                    # Todo responsável tem ao menos um aluno; o resto é sorteado
+                    user_id=(
+                        guardian_ids[n]
+                        if n < len(guardian_ids)
+                        else self.rng.choice(guardian_ids)
+                    ),
+                    nickname=f"Aluno {n}",
+                    school_year=self.rng.choice(school_years),
+                    adhd_type=self.rng.choice(adhd_types),
+                )
+                for n in range(count)
+            ),
+        )
+
+    def create_courses(self, count, modules_per_course, lessons_per_module):
+        course_ids = self.bulk(
+            Course,
+            (
+                Course(title=f"Curso {n} ({self.tag})", description="Curso sintético.")
+                for n in range(count)
+            ),
+        )
+        module_ids = self.bulk(
+            Module,
+            (
+                Module(course_id=course_id, title=f"Módulo {m}", module_order=m)
+                for course_id in course_ids
+                for m in range(1, modules_per_course + 1)
+            ),
+        )
+        lesson_types = LessonTypeChoices.values
+        lesson_ids = self.bulk(
+            Lesson,
+            (
+                Lesson(
+                    module_id=module_id,
+                    title=f"Aula {n}",
+                    lesson_order=n,
+                    lesson_type=self.rng.choice(lesson_types),
+                    content="Conteúdo sintético. " * 20,
+                    duration_in_seconds=self.rng.randint(60, 900),
+                )
+                for module_id in module_ids
+                for n in range(1, lessons_per_module + 1)
+            ),
+        )
+        # Lições de cada curso, já na ordem do curso (módulo, lição)
+        per_course = modules_per_course * lessons_per_module
+        return {
+            course_id: lesson_ids[i * per_course : (i + 1) * per_course]
+            for i, course_id in enumerate(course_ids)
+        }
+
+    def create_enrollments(self, student_ids, lessons_by_course, per_student):
+        course_ids = list(lessons_by_course)
+        per_student = min(per_student, len(course_ids))
+        pairs = [
+            (student_id, course_id)
+            for student_id in student_ids
+            for course_id in self.rng.sample(course_ids, per_student)
+        ]
+        self.bulk(
+            Enrollment,
+            (
+                Enrollment(student_id=student_id, course_id=course_id)
+                for student_id, course_id in pairs
+            ),
+        )
+
+        # Cada matrícula concluiu um prefixo das lições do curso, como na vida real
+        def progress_rows():
+            for student_id, course_id in pairs:
+                lessons = lessons_by_course[course_id]
+                done = int(len(lessons) * self.rng.betavariate(1.2, 1.5))
+                started = self.random_past()
+                for position, lesson_id in enumerate(lessons[:done]):
+                    yield LessonProgress(
+                        student_id=student_id,
+                        lesson_id=lesson_id,
+                        completed_at=min(
+                            started + timedelta(hours=position * 6), self.now
+                        ),
+                    )
+
+        total = self.bulk(LessonProgress, progress_rows(), keep_ids=False)
+        self.stdout.write(f"  {len(pairs)} matrículas, {total} conclusões de lição")
+
+    def create_tickets(self, count, guardian_ids):
+        statuses = TicketStatusChoices.values
+        weights = [15, 15, 70]  # A maior parte dos tickets já está resolvida
+        tickets = []
+        for n in range(count):
+            status = self.rng.choices(statuses, weights)[0]
+            ticket = SupportTicket(
+                user_id=self.rng.choice(guardian_ids),
+                subject=f"Ticket sintético {n}",
+                message="Descrição sintética do problema.",
+                status=status,
+            )
+            # created_at é auto_now_add: a data sorteada é aplicada depois
+            ticket.seed_created_at = self.random_past(365)
+            if status == TicketStatusChoices.RESOLVIDO:
+                ticket.resolved_at = ticket.seed_created_at + timedelta(days=2)
+            tickets.append(ticket)
+        ids = self.bulk(SupportTicket, tickets)
+        for ticket in tickets:
+            ticket.created_at = ticket.seed_created_at
+        with transaction.atomic():
+            SupportTicket.objects.bulk_update(
+                tickets, ["created_at"], batch_size=self.batch_size
+            )
+        return ids
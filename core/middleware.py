@@ -0,0 +1,161 @@
+# Em /core/middleware.py
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import routers
+from .instrumentation import (
+    QueryBudgetExceeded,
+    QueryRecorder,
+    budget_for,
+    enforce_budgets,
+    metrics,
+)
+
+logger = logging.getLogger("core.instrumentation")
+
+
+def view_name_for(match):
+    # Nome da rota ou, sem nome, o caminho da view (a classe, nas class-based)
+    if match.view_name:
+        return match.view_name
+    view = getattr(match.func, "view_class", match.func)
+    return f"{view.__module__}.{view.__qualname__}"
+
+
+class QueryInstrumentationMiddleware:
+    # Mede queries, tempo de banco e tempo total de cada requisição.
+    # Deve ser o primeiro middleware, para contar também sessão e autenticação.
+    # Queries feitas durante o envio de um StreamingHttpResponse não entram.
+    # Funciona nos dois modos: no ASGI não força o Django a adaptar a cadeia
+    # de middlewares (ver core/checks.py).
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with QueryRecorder() as recorder:
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.db_time * 1000
+
+        match = request.resolver_match
+        view_name = view_name_for(match) if match else "<não resolvida>"
+        budget, duplicate_budget = budget_for(match) if match else (None, None)
+        over_budget = (budget is not None and recorder.count > budget) or (
+            duplicate_budget is not None and recorder.duplicates > duplicate_budget
+        )
+        metrics.record(
+            view_name,
+            recorder.count,
+            recorder.duplicates,
+            db_ms,
+            wall_ms,
+            over_budget,
+            recorder.connects,
+        )
+
+        level = logging.WARNING if over_budget else logging.INFO
+        logger.log(
+            level,
+            "%s %s %s view=%s queries=%d duplicates=%d connects=%d db_ms=%.1f "
+            "wall_ms=%.1f%s",
+            request.method,
+            request.path,
+            response.status_code,
+            view_name,
+            recorder.count,
+            recorder.duplicates,
+            recorder.connects,
+            db_ms,
+            wall_ms,
+            f" budget={budget} EXCEDIDO" if over_budget else "",
+        )
+        if recorder.duplicates:
+            for key, count, sql in recorder.top_duplicates():
+                logger.debug("query repetida %s (%dx): %s", key, count, sql[:300])
+
+        if getattr(settings, "QUERY_INSTRUMENTATION_HEADERS", False):
+            response["X-DB-Query-Count"] = str(recorder.count)
+            response["X-DB-Duplicate-Queries"] = str(recorder.duplicates)
+            response["X-DB-Connects"] = str(recorder.connects)
+            response["X-DB-Time-Ms"] = f"{db_ms:.1f}"
+            response["X-Request-Time-Ms"] = f"{wall_ms:.1f}"
+            if budget is not None:
+                response["X-DB-Query-Budget"] = str(budget)
+            response["Server-Timing"] = f"db;dur={db_ms:.1f}, total;dur={wall_ms:.1f}"
+
+        if over_budget and enforce_budgets():
+            duplicates = ", ".join(
+                f"{count}x {sql[:120]}" for _, count, sql in recorder.top_duplicates()
+            )
+            raise QueryBudgetExceeded(
+                f"{view_name}: {recorder.count} queries ({recorder.duplicates} "
+                f"repetidas) para um orçamento de {budget}. {duplicates}"
+            )
+        return response
+
+
+class PrimaryStickinessMiddleware:
+    # Leitura das próprias escritas com réplicas (ver core/routers.py): quem
+    # escreveu em um app replicado lê do primário pelos próximos
+    # DATABASE_PRIMARY_STICKY_SECONDS. Um cookie, e não a sessão, para não
+    # custar mais uma escrita no banco a cada requisição que escreve.
+    # Deve vir logo depois do QueryInstrumentationMiddleware.
+    sync_capable = True
+    async_capable = True
+    cookie_name = "hs_primary_until"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routers.routing_scope(self.pinned(request)) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        with routers.routing_scope(self.pinned(request)) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def pinned(self, request):
+        try:
+            return float(request.COOKIES.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def finish(self, response, state):
+        if state.wrote and settings.DATABASE_REPLICAS:
+            window = settings.DATABASE_PRIMARY_STICKY_SECONDS
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time() + window)),
+                max_age=window,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,170 @@
+# Em /core/pagination.py
+#
+# Paginação para tabelas muito grandes no admin: contagens estimadas pelo
+# PostgreSQL e paginação por chave (keyset), usadas pelo
+# KeysetPaginationMixin (core/admin.py).
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+# Abaixo disso o COUNT(*) exato é barato o suficiente
+ESTIMATE_THRESHOLD = 100_000
+
+
+def estimated_count(model, using="default"):
+    # Estimativa do planejador do PostgreSQL (atualizada por VACUUM/ANALYZE).
+    # Devolve None fora do PostgreSQL ou se a tabela nunca foi analisada.
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def planned_count(queryset):
+    # Número de linhas que o planejador espera para o queryset filtrado
+    # (EXPLAIN, sem executar a query). None fora do PostgreSQL.
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    # Usa uma estimativa no lugar do COUNT(*) quando ela passa de
+    # estimate_threshold linhas: o pg_class para a tabela inteira e o EXPLAIN
+    # para os filtros (busca, list_filter). Abaixo disso, o COUNT(*) exato.
+    estimate_threshold = ESTIMATE_THRESHOLD
+
+    @cached_property
+    def estimate(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        if queryset.query.where:
+            estimate = planned_count(queryset)
+        else:
+            estimate = estimated_count(queryset.model, queryset.db)
+        if estimate is None or estimate < self.estimate_threshold:
+            return None
+        return estimate
+
+    @cached_property
+    def count(self):
+        if self.estimate is not None:
+            return self.estimate
+        return super().count
+
+    @property
+    def is_estimated(self):
+        return self.estimate is not None
+
+
+# --- Paginação por chave (keyset / seek) ---
+# Em vez de OFFSET (que lê e descarta todas as linhas das páginas anteriores),
+# cada página continua a partir da última linha exibida:
+#   WHERE (completed_at, id) < (:completed_at, :id) ORDER BY completed_at DESC, id DESC
+# O custo de qualquer página é o mesmo da primeira, desde que exista um índice
+# com as colunas da ordenação.
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _plain(value):
+    # Não usa o DjangoJSONEncoder: ele corta os microssegundos das datas, e a
+    # chave precisa ser exata
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def encode_cursor(values):
+    data = json.dumps([_plain(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, fields):
+    # fields: os campos do modelo na ordem da chave, usados para converter
+    # os valores de volta (ex.: a string ISO em datetime)
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise InvalidCursor(token)
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise InvalidCursor(token) from exc
+
+
+def keyset_filter(ordering, values, backward=False):
+    # Condição "depois desta linha" para a ordenação dada (ex.:
+    # ("-completed_at", "-id")), ou "antes dela" com backward=True.
+    # O PostgreSQL não usa índice para um OR de comparações, então a primeira
+    # coluna também entra como limite (completed_at <= valor).
+    names = [name.lstrip("-") for name in ordering]
+    operators = []
+    for name in ordering:
+        descending = name.startswith("-")
+        operators.append("lt" if descending != backward else "gt")
+
+    condition = Q()
+    for i, (name, operator) in enumerate(zip(names, operators)):
+        equal = {names[j]: values[j] for j in range(i)}
+        condition |= Q(**equal, **{f"{name}__{operator}": values[i]})
+    bound = {f"{names[0]}__{operators[0]}e": values[0]}
+    return Q(**bound) & condition
+
+
+def keyset_page(queryset, ordering, per_page, after=None, before=None):
+    # Devolve (linhas, cursor_anterior, próximo_cursor). after/before são os
+    # valores da chave da linha a partir da qual a página começa.
+    names = [name.lstrip("-") for name in ordering]
+    queryset = queryset.order_by(*ordering)
+    if before is not None:
+        queryset = queryset.filter(keyset_filter(ordering, before, backward=True))
+        queryset = queryset.reverse()
+    elif after is not None:
+        queryset = queryset.filter(keyset_filter(ordering, after))
+
+    rows = list(queryset[: per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before is not None:
+        rows.reverse()
+        has_previous, has_next = has_more, True
+    else:
+        has_previous, has_next = after is not None, has_more
+    if not rows:
+        return rows, None, None
+
+    def cursor(row):
+        return encode_cursor(getattr(row, name) for name in names)
+
+    return (
+        rows,
+        cursor(rows[0]) if has_previous else None,
+        cursor(rows[-1]) if has_next else None,
+    )
@@ -0,0 +1,135 @@
+# Em /core/partitions.py
+#
+# Particionamento mensal (PARTITION BY RANGE) de tabelas de eventos do
+# PostgreSQL. A tabela-mãe é criada por uma migração (ver
+# learning/migrations/0013_partition_study_segments.py); este módulo cria as
+# partições de cada mês, desanexa as antigas e é usado pelo comando
+# "manage_partitions".
+#
+# Convenções:
+#   - cada mês é a partição <tabela>_pAAAAMM, com [dia 1, dia 1 do mês seguinte);
+#   - <tabela>_default recebe o que cair fora dos meses criados (ex.: horário
+#     errado no cliente), para um INSERT nunca falhar. Ao criar o mês, as
+#     linhas dele que estavam na default são movidas para a partição nova.
+#
+# Para o ORM nada muda: o modelo continua com "id" como chave (a PK real é
+# (id, coluna da partição), já que o PostgreSQL exige a coluna em toda
+# constraint única). Filtros pela coluna da partição fazem o planejador ler
+# só as partições dos meses pedidos (partition pruning).
+
+import datetime
+import re
+
+from django.conf import settings
+from django.db import connections, transaction
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def partitioned_tables():
+    # settings.PARTITIONED_TABLES: {"app_label.Model": "coluna"} -> {tabela: coluna}
+    from django.apps import apps
+
+    return {
+        apps.get_model(label)._meta.db_table: column
+        for label, column in settings.PARTITIONED_TABLES.items()
+    }
+
+
+def list_partitions(table, using="default"):
+    # {mês: nome} das partições mensais anexadas à tabela
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.search(name)
+        if match:
+            partitions[datetime.date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_default_partition(table, using="default"):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}_default" '
+            f'PARTITION OF "{table}" DEFAULT'
+        )
+
+
+def create_partition(table, column, month, using="default"):
+    # Cria (se não existir) a partição do mês. Devolve True se criou.
+    month = month_start(month)
+    if month in list_partitions(table, using):
+        return False
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        # Criada fora da mãe e anexada depois, para levar junto as linhas do
+        # mês que estavam na partição default (o ATTACH recusa se sobrar alguma)
+        cursor.execute(
+            f'CREATE TABLE "{name}" '
+            f'(LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{table}_default" '
+            f'WHERE "{column}" >= %s AND "{column}" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+    return True
+
+
+def ensure_partitions(
+    table, column, months_ahead=3, months_back=0, today=None, using="default"
+):
+    # Garante as partições de months_back meses atrás até months_ahead meses
+    # à frente (e a partição default). Devolve os nomes criados.
+    create_default_partition(table, using)
+    current = month_start(today or datetime.date.today())
+    created = []
+    for offset in range(-months_back, months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(table, column, month, using):
+            created.append(partition_name(table, month))
+    return created
+
+
+def detach_partitions(table, keep_months, drop=False, today=None, using="default"):
+    # Desanexa as partições mais antigas que keep_months meses. Sem drop, a
+    # tabela desanexada continua no banco (fora das consultas do ORM), pronta
+    # para ser exportada com pg_dump e apagada. Devolve os nomes.
+    cutoff = add_months(month_start(today or datetime.date.today()), -keep_months)
+    detached = []
+    for month, name in sorted(list_partitions(table, using).items()):
+        if month >= cutoff:
+            break
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if drop:
+                cursor.execute(f'DROP TABLE "{name}"')
+        detached.append(name)
+    return detached
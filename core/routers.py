@@ -0,0 +1,102 @@
+# Em /core/routers.py
+#
+# Réplicas de leitura (DATABASE_REPLICAS em core/settings.py). Leituras dos
+# apps em settings.REPLICA_APPS vão para uma réplica sorteada; escritas, e
+# tudo que roda dentro de uma transação, vão para o primário ("default").
+#
+# Só há leituras nas réplicas dentro de routing_scope(), aberto a cada
+# requisição pelo PrimaryStickinessMiddleware. Fora dele (comandos, scripts,
+# shell) tudo vai ao primário: quem grava e relê logo em seguida não pode
+# depender de uma réplica atrasada.
+#
+# Réplicas atrasam alguns segundos em relação ao primário. Para o usuário ver
+# o que acabou de gravar, a requisição que escreve marca o cliente (cookie de
+# PrimaryStickinessMiddleware) e as próximas requisições dele leem do
+# primário durante DATABASE_PRIMARY_STICKY_SECONDS. Dentro da própria
+# requisição, depois da primeira escrita, as leituras também vão ao primário.
+#
+# Código que preenche caches compartilhados deve ler do primário (primary()),
+# senão uma réplica atrasada recolocaria no cache a versão antiga logo depois
+# da invalidação.
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = ContextVar("database_routing", default=None)
+
+
+class RoutingState:
+    # Estado de uma requisição (ou bloco primary()). Mutável e compartilhado
+    # por referência, para que escritas feitas na thread do sync_to_async
+    # apareçam para o middleware.
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def routing_scope(pinned=False):
+    # Libera as leituras do bloco para as réplicas. Devolve o RoutingState,
+    # em que "wrote" indica se houve escrita em um app replicado.
+    state = RoutingState(pinned)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def primary():
+    # Força as leituras do bloco para o primário
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous, state.pinned = state.pinned, True
+    try:
+        yield
+    finally:
+        state.pinned = previous
+
+
+def _replicated(model):
+    return model._meta.app_label in settings.REPLICA_APPS
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _replicated(model):
+            return None
+        state = _state.get()
+        if state is None or state.pinned or state.wrote:
+            return DEFAULT_DB_ALIAS
+        # Numa transação, a leitura precisa ver o que a transação já gravou
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and _replicated(model):
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primário e réplicas têm os mesmos dados
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # As réplicas recebem o schema pela replicação do PostgreSQL
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,44 @@
+# Em /core/sessions.py
+#
+# Limpeza das sessões vencidas da tabela django_session (engines "db" e
+# "cached_db", ver SESSION_BACKEND em core/settings.py), usada pelo comando
+# "clear_expired_sessions". O clearsessions do Django apaga tudo num único
+# DELETE, que numa tabela grande segura locks por muito tempo e gera um pico
+# de WAL. Aqui cada lote é um DELETE curto pela chave primária, na sua própria
+# transação, com uma pausa opcional entre os lotes.
+#
+# Com "cached_db", as entradas no cache vencem sozinhas junto com a sessão.
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def session_model():
+    # Modelo das sessões do engine configurado (None se não houver tabela,
+    # como em "signed_cookies")
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    if not hasattr(store, "get_model_class"):
+        return None
+    return store.get_model_class()
+
+
+def clear_expired_sessions(batch_size=None, pause=0.0):
+    # Devolve quantas sessões foram apagadas. Só apaga o que já tinha vencido
+    # no início, para terminar mesmo com logins chegando durante a limpeza.
+    model = session_model()
+    if model is None:
+        return 0
+    batch_size = batch_size or settings.SESSION_CLEANUP_BATCH_SIZE
+    expired = model.objects.filter(expire_date__lt=timezone.now())
+    deleted = 0
+    while True:
+        keys = list(expired.values_list("pk", flat=True)[:batch_size])
+        if keys:
+            deleted += model.objects.filter(pk__in=keys).delete()[0]
+        if len(keys) < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
@@ -11,8 +11,10 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -41,12 +43,16 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",  # Busca textual e lookups de trigramas
+    "core",  # Comandos de gerenciamento transversais e verificações (core/checks.py)
     "accounts.apps.AccountsConfig",
     "learning.apps.LearningConfig",
     "support.apps.SupportConfig",
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryInstrumentationMiddleware",  # Sempre o primeiro
+    "core.middleware.PrimaryStickinessMiddleware",  # Réplicas (core/routers.py)
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -87,9 +93,175 @@ DATABASES = {
         "PASSWORD": os.getenv("DATABASE_PASSWORD"),
         "HOST": os.getenv("DATABASE_HOST"),
         "PORT": os.getenv("DATABASE_PORT"),
+        # Reaproveita a conexão da thread por até N segundos (0 = uma conexão
+        # por requisição), testando-a antes de reutilizar
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DATABASE_CONN_HEALTH_CHECKS", "True")
+        == "True",
+        "OPTIONS": {},
     }
 }
 
+# O driver é o psycopg 3 (psycopg[binary,pool] no pyproject.toml), que já traz
+# o pool de conexões. O pool é o modo indicado para o ASGI, em que cada
+# requisição roda numa thread nova e as conexões persistentes acima não são
+# reaproveitadas. Substitui o CONN_MAX_AGE.
+# Métricas em /metrics/queries/ (ver core/dbpool.py).
+DATABASE_POOL = os.getenv("DATABASE_POOL", "False") == "True"
+if DATABASE_POOL:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+        # Segundos esperando uma conexão livre antes de falhar a requisição
+        "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+        # Conexões ociosas acima de min_size fecham depois de max_idle
+        "max_idle": float(os.getenv("DATABASE_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("DATABASE_POOL_MAX_LIFETIME", "1800")),
+        # O CONN_HEALTH_CHECKS vale também aqui: o Django faz o pool testar a
+        # conexão antes de entregá-la a uma requisição
+    }
+
+# Réplicas de leitura (ver core/routers.py)
+# DATABASE_REPLICA_HOSTS="replica1,replica2:5433" cria os aliases replica_1,
+# replica_2... com o mesmo banco, usuário e senha do primário. Nos testes,
+# espelham o "default".
+DATABASE_REPLICAS = []
+for index, address in enumerate(
+    filter(None, os.getenv("DATABASE_REPLICA_HOSTS", "").split(",")), start=1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"]},
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+# Apps cujas leituras podem ir para as réplicas
+REPLICA_APPS = {"learning", "accounts", "support"}
+# Janela em que quem escreveu lê do primário (maior que o atraso das réplicas)
+DATABASE_PRIMARY_STICKY_SECONDS = int(
+    os.getenv("DATABASE_PRIMARY_STICKY_SECONDS", "10")
+)
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Compartilhado entre workers e deploys com Redis (CACHE_BACKEND=redis, exige o
+# pacote "redis"). "file" e "locmem" servem para desenvolvimento e testes; com
+# "locmem" cada processo tem o seu. Helpers de versão, tags e single-flight em
+# core/caching.py.
+CACHE_BACKENDS = {
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND deve ser um de: {', '.join(CACHE_BACKENDS)}."
+    )
+if CACHE_BACKEND == "redis" and find_spec("redis") is None:
+    raise ImproperlyConfigured("CACHE_BACKEND=redis exige o pacote redis.")
+
+# redis: URL(s) separadas por vírgula (a primeira recebe as escritas);
+# file: diretório; locmem: só um nome
+if CACHE_BACKEND == "redis":
+    CACHE_LOCATION = (
+        os.getenv("CACHE_LOCATION") or "redis://localhost:6379/0"
+    ).split(",")
+elif CACHE_BACKEND == "file":
+    CACHE_LOCATION = os.getenv("CACHE_LOCATION") or os.path.join(BASE_DIR, ".cache")
+else:
+    CACHE_LOCATION = "hipersaber"
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": CACHE_LOCATION,
+        # Separa ambientes que dividem o mesmo Redis
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "hipersaber"),
+    }
+}
+
+# Sessões
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+#   - cached_db (padrão): lidas do cache acima e gravadas também no banco; a
+#     requisição autenticada não consulta a django_session. Exige um cache
+#     compartilhado: com CACHE_BACKEND=locmem, um logout só sairia do cache do
+#     worker que o recebeu, e os outros continuariam aceitando a sessão. Nesse
+#     caso cai para "db".
+#   - signed_cookies: a sessão inteira num cookie assinado com a SECRET_KEY,
+#     sem armazenamento (não dá para derrubar uma sessão pelo servidor)
+#   - db: uma consulta à django_session por requisição
+# Sessões vencidas saem com o comando "clear_expired_sessions" (core/sessions.py).
+SESSION_ENGINES = {
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "db": "django.contrib.sessions.backends.db",
+}
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "cached_db")
+if SESSION_BACKEND not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND deve ser um de: {', '.join(SESSION_ENGINES)}."
+    )
+if SESSION_BACKEND == "cached_db" and CACHE_BACKEND == "locmem":
+    SESSION_BACKEND = "db"
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+SESSION_COOKIE_AGE = int(os.getenv("SESSION_COOKIE_AGE", str(60 * 60 * 24 * 14)))
+SESSION_COOKIE_HTTPONLY = True
+# Lote do "clear_expired_sessions": linhas por DELETE (cada um na sua transação)
+SESSION_CLEANUP_BATCH_SIZE = int(os.getenv("SESSION_CLEANUP_BATCH_SIZE", "5000"))
+
+# Instrumentação de queries (core/middleware.py)
+# Headers X-DB-* / Server-Timing nas respostas (padrão: só em DEBUG)
+QUERY_INSTRUMENTATION_HEADERS = (
+    os.getenv("QUERY_INSTRUMENTATION_HEADERS", str(DEBUG)) == "True"
+)
+# Se True, estourar o orçamento de queries de uma view gera erro (usado nos testes)
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "False") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("INSTRUMENTATION_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "learning": {
+            "handlers": ["console"],
+            "level": "WARNING",
+        },
+    },
+}
+
+# Áudio pré-renderizado das lições de texto (learning/tts.py)
+# Motor de síntese: subclasse de learning.tts.Synthesizer
+TTS_SYNTHESIZER = os.getenv("TTS_SYNTHESIZER", "learning.tts.OfflineSynthesizer")
+# A primeira voz é a padrão; só as vozes e velocidades listadas são aceitas
+TTS_VOICES = os.getenv("TTS_VOICES", "pt-BR").split(",")
+TTS_RATES = [float(rate) for rate in os.getenv("TTS_RATES", "1.0,0.75,1.25").split(",")]
+TTS_MAX_CHUNK_CHARS = int(os.getenv("TTS_MAX_CHUNK_CHARS", "300"))
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+# Gera o áudio (voz e velocidade padrão) depois de salvar ou importar a lição,
+# numa thread em segundo plano de cada processo
+TTS_RENDER_ON_SAVE = os.getenv("TTS_RENDER_ON_SAVE", "True") == "True"
+
+# Baixa e indexa as falas da legenda logo depois de salvá-la (learning/subtitles.py)
+SUBTITLE_INGEST_ON_SAVE = os.getenv("SUBTITLE_INGEST_ON_SAVE", "True") == "True"
+
+# Tabelas de eventos particionadas por mês (core/partitions.py), mantidas pelo
+# comando "manage_partitions": {"app.Modelo": "coluna de data"}
+PARTITIONED_TABLES = {"learning.StudySegment": "started_at"}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -153,4 +325,8 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # que NÃO estão dentro de um app (ex: seu logo principal).
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static'),
-]
\ No newline at end of file
+]
+
+# Arquivos enviados/gerados (ex.: áudio das lições, em media/tts/)
+MEDIA_URL = "media/"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(BASE_DIR, "media"))
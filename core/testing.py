@@ -0,0 +1,57 @@
+# Em /core/testing.py
+#
+# Utilitários para testes. LaggedReplica simula uma réplica de leitura
+# atrasada (ver core/routers.py) com uma segunda conexão ao banco de testes
+# presa a um snapshot (transação REPEATABLE READ): ela só enxerga o que o
+# primário confirmou até o último catch_up(), como uma réplica que parou de
+# aplicar a replicação. Use com TransactionTestCase, para que as escritas do
+# teste sejam de fato confirmadas:
+#
+#     with LaggedReplica() as replica, routing_scope():
+#         Course.objects.create(...)   # gravado no primário
+#         Course.objects.exists()      # lido da réplica: False
+#         replica.catch_up()
+#         Course.objects.exists()      # True
+#
+# Requisições do test client já passam pelo routing_scope() do middleware.
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+from django.test.utils import override_settings
+
+
+class LaggedReplica:
+    def __init__(self, alias="lagged_replica"):
+        self.alias = alias
+        self._override = override_settings(DATABASE_REPLICAS=[alias])
+
+    def __enter__(self):
+        # Conexão criada à mão, fora de settings.DATABASES: o TestCase só
+        # permite aliases declarados em "databases", mas libera conexões
+        # criadas dinamicamente
+        settings_dict = {**connections.settings[DEFAULT_DB_ALIAS]}
+        backend = load_backend(settings_dict["ENGINE"])
+        connections[self.alias] = backend.DatabaseWrapper(settings_dict, self.alias)
+        self._override.enable()
+        self._take_snapshot()
+        return self
+
+    def __exit__(self, *exc_info):
+        # Antes do flush do TransactionTestCase, que esperaria pelo snapshot
+        connection = connections[self.alias]
+        with connection.cursor() as cursor:
+            cursor.execute("ROLLBACK")
+        connection.close()
+        del connections[self.alias]
+        self._override.disable()
+
+    def _take_snapshot(self):
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute("BEGIN ISOLATION LEVEL REPEATABLE READ")
+            cursor.execute("SELECT 1")  # O snapshot começa na primeira query
+
+    def catch_up(self):
+        # A réplica aplica tudo o que o primário confirmou até agora
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute("COMMIT")
+        self._take_snapshot()
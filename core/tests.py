@@ -0,0 +1,451 @@
+import datetime
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Student, User
+from learning.models import (
+    Course,
+    Enrollment,
+    Lesson,
+    LessonProgress,
+    Module,
+    StudySegment,
+    StudySession,
+)
+from support.models import SupportTicket
+
+from . import caching, partitions
+from .checks import check_async_middleware
+from .instrumentation import QueryBudgetExceeded, QueryRecorder, metrics
+from .middleware import PrimaryStickinessMiddleware
+from .routers import primary, routing_scope
+from .sessions import clear_expired_sessions
+from .testing import LaggedReplica
+
+
+@override_settings(QUERY_INSTRUMENTATION_HEADERS=True, QUERY_BUDGET_ENFORCE=True)
+class QueryInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin@example.com", "Admin", "senha")
+        course = Course.objects.create(title="Curso")
+        module = Module.objects.create(course=course, title="Módulo", module_order=1)
+        lessons = [
+            Lesson.objects.create(module=module, title=f"Aula {i}", lesson_order=i)
+            for i in range(1, 4)
+        ]
+        # Várias linhas por changelist, para que um N+1 apareça na contagem
+        for n in range(5):
+            guardian = User.objects.create_user(f"r{n}@example.com", f"R{n}", "senha")
+            student = Student.objects.create(
+                user=guardian, nickname=f"Aluno {n}", school_year="ano_4"
+            )
+            Enrollment.objects.create(student=student, course=course)
+            for lesson in lessons:
+                LessonProgress.objects.create(student=student, lesson=lesson)
+            SupportTicket.objects.create(user=guardian, subject="Ajuda", message="...")
+        cls.course = course
+
+    def setUp(self):
+        metrics.reset()
+        cache.clear()
+
+    def test_headers_and_metrics(self):
+        response = self.client.get(
+            reverse("learning:course-outline", args=[self.course.public_id])
+        )
+        self.assertGreater(int(response["X-DB-Query-Count"]), 0)
+        self.assertEqual(response["X-DB-Query-Budget"], "6")
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+        self.client.force_login(self.admin)
+        snapshot = self.client.get(reverse("query-metrics")).json()["views"]
+        self.assertEqual(snapshot["learning:course-outline"]["requests"], 1)
+
+        # Só um POST zera as métricas
+        self.client.get(reverse("query-metrics"), {"reset": "1"})
+        self.assertEqual(self.client.get(reverse("query-metrics-reset")).status_code, 405)
+        self.assertIn("learning:course-outline", metrics.snapshot())
+        self.assertEqual(self.client.post(reverse("query-metrics-reset")).status_code, 204)
+        self.assertNotIn("learning:course-outline", metrics.snapshot())
+
+    def test_metrics_include_connection_state(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse("query-metrics"))
+        self.assertIn("X-DB-Connects", response)
+        default = response.json()["databases"]["default"]
+        self.assertFalse(default["pooled"])
+        self.assertIsNone(default["pool"])
+        self.assertTrue(default["health_checks"])
+
+    async def test_async_views_are_measured(self):
+        # No ASGI as queries rodam na thread do sync_to_async
+        response = await self.async_client.get(
+            reverse("student-api:course-outline", args=[self.course.public_id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response["X-DB-Query-Count"]), 5)
+
+    def test_middleware_stack_is_async_capable(self):
+        self.assertEqual(check_async_middleware(None), [])
+
+    def test_recorder_counts_duplicate_queries(self):
+        with QueryRecorder() as recorder:
+            for progress in LessonProgress.objects.all():
+                str(progress)  # N+1: student e lesson por linha
+        self.assertGreaterEqual(recorder.duplicates, 2 * (LessonProgress.objects.count() - 1))
+
+    def test_over_budget_raises_when_enforced(self):
+        model_admin = admin.site._registry[Enrollment]
+        budgets = model_admin.query_budgets
+        model_admin.query_budgets = {"changelist": 1}
+        try:
+            self.client.force_login(self.admin)
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("admin:learning_enrollment_changelist"))
+        finally:
+            model_admin.query_budgets = budgets
+
+    def test_admin_pages_respect_declared_budgets(self):
+        # Percorre todos os ModelAdmins que declaram orçamento
+        self.client.force_login(self.admin)
+        for model, model_admin in admin.site._registry.items():
+            for page in getattr(model_admin, "query_budgets", {}):
+                opts = model._meta
+                args = [model_admin.get_queryset(None).first().pk] if page == "change" else []
+                with self.subTest(model=opts.label, page=page):
+                    url = reverse(
+                        f"admin:{opts.app_label}_{opts.model_name}_{page}", args=args
+                    )
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin@example.com", "Admin", "senha")
+        guardian = User.objects.create_user("r@example.com", "R", "senha")
+        # Vários tickets com o mesmo created_at: o id desempata a chave
+        tickets = SupportTicket.objects.bulk_create(
+            SupportTicket(user=guardian, subject=f"Ticket {n}", message="...")
+            for n in range(7)
+        )
+        same_time = tickets[0].created_at
+        SupportTicket.objects.filter(pk__in=[t.pk for t in tickets[2:5]]).update(
+            created_at=same_time
+        )
+        cls.expected = list(
+            SupportTicket.objects.order_by("-created_at", "-id").values_list("pk", flat=True)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.model_admin = admin.site._registry[SupportTicket]
+        self.list_per_page = self.model_admin.list_per_page
+        self.model_admin.list_per_page = 3
+        self.url = reverse("admin:support_supportticket_changelist")
+
+    def tearDown(self):
+        self.model_admin.list_per_page = self.list_per_page
+
+    def page(self, url):
+        cl = self.client.get(url).context["cl"]
+        return [t.pk for t in cl.result_list], cl
+
+    def test_walks_forward_and_back_without_gaps(self):
+        seen = []
+        url = self.url
+        while url:
+            pks, cl = self.page(self.url + url if url.startswith("?") else url)
+            seen.extend(pks)
+            url = cl.next_url
+        self.assertEqual(seen, self.expected)
+
+        # Volta da última página para a anterior
+        pks, cl = self.page(self.url + cl.previous_url)
+        self.assertEqual(pks, self.expected[3:6])
+        self.assertTrue(cl.next_url)
+
+    def test_invalid_cursor_redirects_with_error_flag(self):
+        response = self.client.get(self.url, {"after": "não-é-um-cursor"})
+        self.assertRedirects(response, self.url + "?e=1", fetch_redirect_response=False)
+
+    def test_sorting_by_column_falls_back_to_offset_pages(self):
+        pks, cl = self.page(self.url + "?o=1")
+        self.assertFalse(cl.uses_keyset)
+        self.assertEqual(len(pks), 3)
+
+    def test_estimated_count_above_threshold(self):
+        paginator_class = self.model_admin.paginator
+        with (
+            mock.patch.object(paginator_class, "estimate_threshold", 0),
+            mock.patch("core.pagination.estimated_count", return_value=5_000_000),
+        ):
+            _, cl = self.page(self.url)
+        self.assertEqual(cl.result_count, 5_000_000)
+        self.assertTrue(cl.count_is_estimated)
+
+
+class PartitionTests(TestCase):
+    table = "learning_studysegment"
+
+    def setUp(self):
+        guardian = User.objects.create_user("resp@example.com", "Resp", "senha")
+        student = Student.objects.create(
+            user=guardian, nickname="Aluno", school_year="ano_4"
+        )
+        self.session = StudySession.objects.create(student=student)
+        self.this_month = partitions.month_start(datetime.date.today())
+
+    def segment(self, started_at):
+        return StudySegment.objects.create(
+            session=self.session,
+            state="focus",
+            started_at=started_at,
+            ended_at=started_at,
+        )
+
+    def partition_of(self, segment):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT tableoid::regclass::text FROM {self.table} WHERE id = %s",
+                [segment.pk],
+            )
+            return cursor.fetchone()[0]
+
+    def test_rows_are_routed_and_moved_out_of_default(self):
+        recent = self.segment(timezone.now())
+        self.assertEqual(
+            self.partition_of(recent),
+            partitions.partition_name(self.table, self.this_month),
+        )
+        old_month = partitions.add_months(self.this_month, -24)
+        old = self.segment(
+            datetime.datetime(old_month.year, old_month.month, 15, tzinfo=datetime.UTC)
+        )
+        self.assertEqual(self.partition_of(old), f"{self.table}_default")
+
+        self.assertTrue(
+            partitions.create_partition(self.table, "started_at", old_month)
+        )
+        self.assertEqual(
+            self.partition_of(old), partitions.partition_name(self.table, old_month)
+        )
+        # O ORM continua enxergando tudo pela tabela-mãe
+        self.assertEqual(self.session.segments.count(), 2)
+
+    def test_recent_queries_skip_old_partitions(self):
+        old_month = partitions.add_months(self.this_month, -1)
+        since = datetime.datetime.combine(
+            self.this_month, datetime.time(), datetime.UTC
+        )
+        plan = StudySegment.objects.filter(started_at__gte=since).explain()
+        self.assertIn(partitions.partition_name(self.table, self.this_month), plan)
+        self.assertNotIn(partitions.partition_name(self.table, old_month), plan)
+
+    def test_command_creates_ahead_and_detaches_old(self):
+        call_command("manage_partitions", "--ahead", "6", stdout=StringIO())
+        months = partitions.list_partitions(self.table)
+        self.assertIn(partitions.add_months(self.this_month, 6), months)
+
+        out = StringIO()
+        call_command("manage_partitions", "--keep", "0", "--drop", stdout=out)
+        self.assertIn(
+            partitions.partition_name(
+                self.table, partitions.add_months(self.this_month, -1)
+            ),
+            out.getvalue(),
+        )
+        self.assertEqual(min(partitions.list_partitions(self.table)), self.this_month)
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    # Réplica atrasada simulada (core/testing.py): só vê o que já existia
+    # quando o teste começou, até catch_up()
+    def setUp(self):
+        self.guardian = User.objects.create_user("resp@example.com", "Resp", "senha")
+        self.student = Student.objects.create(
+            user=self.guardian, nickname="Aluno", school_year="ano_5"
+        )
+        course = Course.objects.create(title="Frações")
+        module = Module.objects.create(course=course, title="Módulo", module_order=1)
+        self.lesson = Lesson.objects.create(module=module, title="Aula", lesson_order=1)
+        Enrollment.objects.create(student=self.student, course=course)
+        self.replica = self.enterContext(LaggedReplica())
+
+    def test_reads_use_replica_inside_scope(self):
+        Course.objects.create(title="Nova")
+        new_course = Course.objects.filter(title="Nova")
+        self.assertTrue(new_course.exists())  # Fora do escopo: primário
+        with routing_scope():
+            self.assertFalse(new_course.exists())
+            with transaction.atomic():
+                self.assertTrue(new_course.exists())
+            with primary():
+                self.assertTrue(new_course.exists())
+            self.replica.catch_up()
+            self.assertTrue(new_course.exists())
+
+    def test_writer_reads_own_writes(self):
+        url = reverse("learning:student-progress", args=[self.student.public_id])
+        self.client.force_login(self.guardian)
+        response = self.client.post(
+            reverse("learning:completions"),
+            data={
+                "events": [
+                    {
+                        "student": str(self.student.public_id),
+                        "lesson": str(self.lesson.public_id),
+                    }
+                ]
+            },
+            content_type="application/json",
+        )
+        self.assertIn(PrimaryStickinessMiddleware.cookie_name, response.cookies)
+        progress = self.client.get(url).json()["courses"][0]
+        self.assertEqual(progress["lessons_completed"], 1)
+
+        # Outro cliente do mesmo usuário, sem o cookie, lê a réplica atrasada
+        other = Client()
+        other.force_login(self.guardian)
+        self.assertEqual(other.get(url).json()["courses"][0]["lessons_completed"], 0)
+        self.replica.catch_up()
+        self.assertEqual(other.get(url).json()["courses"][0]["lessons_completed"], 1)
+
+
+class CachingTests(TestCase):
+    # Os helpers de core/caching.py sobre o cache em memória local; a subclasse
+    # abaixo repete os testes com o cache em arquivos
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return self.calls
+
+    def get(self):
+        return caching.get_or_compute("test:key", self.compute, 60, tags=("test",))
+
+    def test_cached_until_tag_is_invalidated_after_commit(self):
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.get(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            caching.invalidate_tags("test")
+            self.assertEqual(self.get(), 1)  # Antes do commit, nada muda
+        self.assertEqual(self.get(), 2)
+        self.assertEqual(self.calls, 2)
+
+    def test_expired_entry_is_recomputed(self):
+        self.get()
+        with mock.patch.object(caching.time, "time", return_value=time.time() + 61):
+            self.assertEqual(self.get(), 2)
+
+    def test_stale_entry_served_while_another_worker_recomputes(self):
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            caching.invalidate_tags("test")
+        # Outro worker pegou o lock: este serve a versão velha sem ir ao banco
+        cache.add(caching._lock_key("test:key"), 1)
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.calls, 1)
+        cache.delete(caching._lock_key("test:key"))
+        self.assertEqual(self.get(), 2)
+
+    @mock.patch.object(caching, "WAIT_TIMEOUT", 0.1)
+    def test_without_stale_entry_waits_then_computes(self):
+        cache.add(caching._lock_key("test:key"), 1)
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.calls, 1)
+
+    def test_lock_released_when_compute_fails(self):
+        def fail():
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            caching.get_or_compute("test:key", fail, 60)
+        self.assertIsNone(cache.get(caching._lock_key("test:key")))
+
+    async def test_async_helpers(self):
+        async def compute():
+            return self.compute()
+
+        self.assertEqual(
+            await caching.aget_or_compute("test:key", compute, 60, tags=("test",)), 1
+        )
+        await caching.ainvalidate_tags("test")
+        self.assertEqual(
+            await caching.aget_or_compute("test:key", compute, 60, tags=("test",)), 2
+        )
+
+
+class FileCachingTests(CachingTests):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": directory.name,
+                }
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+
+class SessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        for n in range(5):
+            Session.objects.create(
+                session_key=f"vencida{n}",
+                session_data="",
+                expire_date=now - datetime.timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key="valida",
+            session_data="",
+            expire_date=now + datetime.timedelta(days=1),
+        )
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+    def test_authenticated_request_skips_session_table(self):
+        user = User.objects.create_user("resp@example.com", "Resp", "senha")
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("learning:dashboard"))
+        self.assertFalse(
+            any("django_session" in q["sql"] for q in captured.captured_queries)
+        )
+
+    def test_clears_expired_sessions_in_batches(self):
+        # 3 lotes (2 + 2 + 1), cada um com SELECT das chaves e DELETE
+        with self.assertNumQueries(6):
+            self.assertEqual(clear_expired_sessions(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list("pk", flat=True)), ["valida"])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("clear_expired_sessions", "--batch-size", "10", stdout=out)
+        self.assertIn("5 sessão(ões) apagada(s)", out.getvalue())
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookies_have_nothing_to_clear(self):
+        self.assertEqual(clear_expired_sessions(), 0)
+        self.assertEqual(Session.objects.count(), 6)
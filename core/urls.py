@@ -16,8 +16,19 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from . import views
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics/queries/", views.query_metrics, name="query-metrics"),
+    path(
+        "metrics/queries/reset/",
+        views.reset_query_metrics,
+        name="query-metrics-reset",
+    ),
+    path("api/learning/", include("learning.urls")),
+    # Mesma API do aluno em views assíncronas, para o caminho ASGI
+    path("api/student/", include("learning.api_urls")),
 ]
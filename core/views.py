@@ -0,0 +1,23 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from .dbpool import database_stats
+from .instrumentation import metrics
+
+
+# Métricas agregadas de queries por view e estado das conexões com o banco
+# (pool, conexões persistentes), apenas deste processo
+@require_GET
+@staff_member_required
+def query_metrics(request):
+    return JsonResponse({"views": metrics.snapshot(), "databases": database_stats()})
+
+
+# Zera as métricas deste processo (POST: um GET de crawler ou prefetch não
+# pode apagar os números)
+@require_POST
+@staff_member_required
+def reset_query_metrics(request):
+    metrics.reset()
+    return HttpResponse(status=204)
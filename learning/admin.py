@@ -1,9 +1,69 @@
-from django.contrib import admin
-from .models import Course, Module, Lesson, Enrollment, LessonProgress, Material, Subtitle
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import DatabaseError
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from core.admin import KeysetPaginationMixin
+
+from .exports import export_response
+from .importer import FORMATS, ManifestError, guess_format, import_manifest
+from .models import (
+    Course,
+    CourseStats,
+    Enrollment,
+    Lesson,
+    LessonProgress,
+    LessonTypeChoices,
+    Material,
+    Module,
+    QuestionKindChoices,
+    QuizAttempt,
+    QuizChoice,
+    QuizItemStats,
+    QuizQuestion,
+    StudySegment,
+    StudySession,
+    Subtitle,
+)
+from .quiz import MAX_CHOICES
+from .reports import course_funnel, last_refreshed_at, refresh_reports
+from .search import match
+from .tts import render_lesson_speech
 
 # --- Configuração Avançada para Cursos, Módulos e Lições ---
 
 
+# Troca o "icontains" da caixa de busca (que varre o texto inteiro de cada
+# linha) pela busca textual indexada de learning/search.py. search_fields
+# continua declarado só para o admin mostrar a caixa de busca. No
+# autocomplete e em termos de uma palavra, o usuário ainda está digitando:
+# títulos que começam pelo termo também entram.
+class FullTextSearchMixin:
+    search_title_field = "title"
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        autocomplete = (
+            request is not None
+            and request.resolver_match is not None
+            and request.resolver_match.url_name == "autocomplete"
+        )
+        matches = match(
+            queryset,
+            term,
+            title_field=self.search_title_field,
+            prefix=autocomplete or len(term.split()) == 1,
+        )
+        return matches, False
+
+
 # Permite editar Lições (Lessons) diretamente de dentro do admin do Módulo (Module)
 class LessonInline(admin.TabularInline):
     model = Lesson
@@ -17,9 +77,19 @@ class ModuleInline(admin.StackedInline):
     inlines = [LessonInline]  # Aninhamento: Lições dentro de Módulos
 
 
+# Formulário de upload do manifesto de importação de cursos
+class CourseImportForm(forms.Form):
+    manifest = forms.FileField(label="Manifesto")
+    format = forms.ChoiceField(
+        label="Formato",
+        choices=[("", "Deduzir pela extensão")] + [(fmt, fmt.upper()) for fmt in FORMATS],
+        required=False,
+    )
+
+
 # Configuração personalizada para o modelo Curso no admin.
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'created_at', 'updated_at')
     list_filter = ('created_at',)
     search_fields = ("title", "description")
@@ -30,15 +100,67 @@ class CourseAdmin(admin.ModelAdmin):
         "public_id",
     )  # Preenche o 'public_id' automaticamente (não editável)
 
+    # Página extra "Importar manifesto" (ver learning/importer.py)
+    def get_urls(self):
+        urls = [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name="learning_course_import",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = CourseImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["manifest"]
+            imported = 0
+            try:
+                fmt = form.cleaned_data["format"] or guess_format(upload.name)
+                stream = io.TextIOWrapper(upload.file, encoding="utf-8", newline="")
+                for result in import_manifest(stream, fmt):
+                    imported += 1
+                    self.message_user(
+                        request,
+                        f"{result.title}: {result.modules} módulo(s), "
+                        f"{result.lessons} lição(ões) "
+                        f"({'criado' if result.created else 'atualizado'}).",
+                        messages.SUCCESS,
+                    )
+            except (ManifestError, UnicodeDecodeError, DatabaseError) as exc:
+                # DatabaseError: algo que a validação deixou passar; o curso
+                # em andamento é desfeito (uma transação por curso)
+                self.message_user(
+                    request,
+                    f"Importação interrompida após {imported} curso(s): {exc}",
+                    messages.ERROR,
+                )
+                return redirect("admin:learning_course_import")
+            return redirect("admin:learning_course_changelist")
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Importar cursos",
+            "form": form,
+        }
+        return TemplateResponse(request, "admin/learning/course/import.html", context)
+
 
 # Configuração personalizada para o modelo Módulo no admin (Usado se você clicar em um Módulo separadamente)
 @admin.register(Module)
 class ModuleAdmin(admin.ModelAdmin):
     list_display = ("title", "course", "module_order")
     list_filter = ("course",)
+    list_select_related = ("course",)
     search_fields = ("title",)
+    autocomplete_fields = ("course",)
     inlines = [LessonInline]
     readonly_fields = ("public_id",)
+    query_budgets = {"changelist": 10}
 
 
 # Configuração personalizada para o modelo Material no admin
@@ -53,36 +175,332 @@ class SubtitleInline(admin.TabularInline):
     extra = 1 # Mostra 1 slot de upload em branco
 
 
+# Estatísticas das questões do quiz (somente leitura). Lê as somas já
+# acumuladas em QuizItemStats: uma linha por questão, independente do número
+# de tentativas (ver learning/quiz_stats.py)
+class QuizItemStatsInline(admin.TabularInline):
+    model = QuizItemStats
+    fields = (
+        "question",
+        "attempts",
+        "answered",
+        "correct",
+        "difficulty_display",
+        "discrimination_display",
+        "updated_at",
+    )
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    verbose_name_plural = "Estatísticas do quiz"
+
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request)
+            .select_related("question")
+            .order_by("question__question_order")
+        )
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Dificuldade (p)")
+    def difficulty_display(self, obj):
+        return "-" if obj.difficulty is None else f"{obj.difficulty:.2f}"
+
+    @admin.display(description="Discriminação")
+    def discrimination_display(self, obj):
+        return "-" if obj.discrimination is None else f"{obj.discrimination:.2f}"
+
+
 # Configuração personalizada para o modelo Lição no admin
 @admin.register(Lesson)
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ("title", "module", "lesson_type", "lesson_order")
     list_filter = ("module__course", "lesson_type")  # Filtra por curso ou tipo
+    # Lesson.__str__ e Module.__str__ leem module.title e course.title
+    list_select_related = ("module__course",)
     search_fields = ("title", "content")
+    autocomplete_fields = ("module",)
     readonly_fields = ("public_id",)
-    inlines = [MaterialInline, SubtitleInline]
+    inlines = [MaterialInline, SubtitleInline, QuizItemStatsInline]
+    actions = ["render_speech"]
+    query_budgets = {"changelist": 12}
+
+    # Gera agora o áudio (TTS) das lições de texto selecionadas
+    @admin.action(description="Gerar áudio (TTS) das lições de texto")
+    def render_speech(self, request, queryset):
+        synthesized = 0
+        lessons = queryset.filter(lesson_type=LessonTypeChoices.TEXT)
+        for lesson in lessons:
+            synthesized += render_lesson_speech(lesson)[1]
+        self.message_user(
+            request,
+            f"Áudio gerado para {len(lessons)} lição(ões) "
+            f"({synthesized} trecho(s) novo(s)).",
+            messages.SUCCESS,
+        )
+
+    def get_queryset(self, request):
+        # Vale também para o autocomplete usado por LessonProgressAdmin
+        return super().get_queryset(request).select_related("module")
 
 
 # --- Configuração Simples para Matrículas e Progresso ---
 
 
+# Ações de exportação em streaming (ver learning/exports.py)
+def export_action(kind, fmt):
+    def action(modeladmin, request, queryset):
+        return export_response(kind, fmt, queryset)
+
+    action.__name__ = f"export_{kind}_{fmt}"
+    action.short_description = f"Exportar selecionados ({fmt.upper()})"
+    return action
+
+
 # Configuração personalizada para o modelo Matrícula no admin
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
-    list_display = ("student", "course", "enrolled_at", "completed_at")
+class EnrollmentAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = (
+        "student",
+        "course",
+        "progress_percent",
+        "enrolled_at",
+        "completed_at",
+    )
     list_filter = ("course",)
     search_fields = (
         "student__nickname",
         "course__title",
     )  # Busca por nome do aluno ou curso
-    readonly_fields = ("public_id", "enrolled_at")
+    # Enrollment.__str__ lê student e course; Student.__str__ lê user.email
+    list_select_related = ("student__user", "course")
+    # Autocomplete no lugar de <select> com todos os alunos/cursos
+    autocomplete_fields = ("student", "course")
+    # Tabela grande: contagem estimada e paginação por chave (core/admin.py)
+    keyset_ordering = ("-enrolled_at", "-id")
+    actions = [export_action("enrollments", "csv"), export_action("enrollments", "jsonl")]
+    query_budgets = {"changelist": 10, "change": 12}  # Verificado em core/tests.py
+    # Os contadores de progresso são mantidos automaticamente (learning/progress.py)
+    readonly_fields = (
+        "public_id",
+        "enrolled_at",
+        "lessons_completed",
+        "total_lessons",
+        "progress_percent",
+        "last_activity_at",
+        "completed_at",
+    )
 
 
 # Configuração personalizada para o modelo Progresso de Lição no admin
 @admin.register(LessonProgress)
-class LessonProgressAdmin(admin.ModelAdmin):
+class LessonProgressAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_display = ("student", "lesson", "completed_at")
     list_filter = ("lesson__module__course",)  # Filtra pelo curso
+    # LessonProgress.__str__ lê student e lesson; Lesson.__str__ lê module.title
+    list_select_related = ("student__user", "lesson__module")
     search_fields = ("student__nickname", "lesson__title")
+    autocomplete_fields = ("student", "lesson")
     readonly_fields = ("public_id", "completed_at")
+    # A maior tabela da plataforma: contagem estimada e paginação por chave
+    keyset_ordering = ("-completed_at", "-id")
+    actions = [export_action("progress", "csv"), export_action("progress", "jsonl")]
+    query_budgets = {"changelist": 10, "change": 12}
+
+
+
+# --- Quiz (ver learning/quiz.py) ---
+
+
+# Valida o gabarito da questão antes de salvar as alternativas
+class QuizChoiceFormSet(forms.BaseInlineFormSet):
+    def clean(self):
+        super().clean()
+        choices = [
+            form.cleaned_data
+            for form in self.forms
+            if form.cleaned_data and not form.cleaned_data.get("DELETE")
+        ]
+        correct = sum(bool(choice.get("is_correct")) for choice in choices)
+        if len(choices) > MAX_CHOICES:
+            raise ValidationError(f"Uma questão pode ter no máximo {MAX_CHOICES} alternativas.")
+        if choices and not correct:
+            raise ValidationError("Marque ao menos uma alternativa correta.")
+        if self.instance.kind == QuestionKindChoices.SINGLE and correct > 1:
+            raise ValidationError("Questões de escolha única têm só uma alternativa correta.")
+
+
+# Permite editar as alternativas dentro da página da questão
+class QuizChoiceInline(admin.TabularInline):
+    model = QuizChoice
+    formset = QuizChoiceFormSet
+    extra = 4
+
+
+# Configuração personalizada para o modelo Questão no admin
+@admin.register(QuizQuestion)
+class QuizQuestionAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "lesson", "kind", "points", "question_order")
+    list_filter = ("kind", "lesson__module__course")
+    list_select_related = ("lesson__module",)
+    search_fields = ("prompt", "lesson__title")
+    autocomplete_fields = ("lesson",)
+    readonly_fields = ("public_id",)
+    inlines = [QuizChoiceInline]
+    query_budgets = {"changelist": 12}
+
+
+# Configuração personalizada para o modelo Tentativa de Quiz no admin
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = ("student", "lesson", "score", "max_score", "submitted_at")
+    list_filter = ("lesson__module__course",)
+    # QuizAttempt.__str__ lê student e lesson
+    list_select_related = ("student__user", "lesson__module")
+    search_fields = ("student__nickname", "lesson__title")
+    autocomplete_fields = ("student", "lesson")
+    keyset_ordering = ("-submitted_at", "-id")
+    # Tentativas são corrigidas pelo motor de quiz, nunca editadas à mão
+    readonly_fields = (
+        "public_id",
+        "revision",
+        "answers",
+        "score",
+        "max_score",
+        "submitted_at",
+    )
+    query_budgets = {"changelist": 10}
+
+
+# Trechos de foco/pausa da sessão (gravados pelo learning/study.py)
+class StudySegmentInline(admin.TabularInline):
+    model = StudySegment
+    extra = 0
+    can_delete = False
+    fields = ("state", "started_at", "ended_at", "heartbeats")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+# Configuração personalizada para o modelo Sessão de Estudo no admin
+@admin.register(StudySession)
+class StudySessionAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = (
+        "student",
+        "lesson",
+        "started_at",
+        "ended_at",
+        "focus_seconds",
+        "break_seconds",
+        "break_count",
+    )
+    # Student.__str__ e Lesson.__str__ leem o responsável e o módulo
+    list_select_related = ("student__user", "lesson__module")
+    search_fields = ("student__nickname",)
+    keyset_ordering = ("-started_at", "-id")
+    inlines = [StudySegmentInline]
+    # Os totais são somados pelos heartbeats, nunca editados à mão
+    readonly_fields = (
+        "public_id",
+        "student",
+        "lesson",
+        "started_at",
+        "ended_at",
+        "focus_seconds",
+        "break_seconds",
+        "break_count",
+    )
+    query_budgets = {"changelist": 8}
+
+
+# Painel de indicadores dos cursos. Lê só as views materializadas de
+# learning/reports.py; nada aqui agrega as tabelas de matrículas e progresso.
+@admin.register(CourseStats)
+class CourseStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "course",
+        "enrollments",
+        "completions",
+        "completion_rate_display",
+        "average_progress_display",
+        "median_days_display",
+        "last_activity_at",
+    )
+    list_select_related = ("course",)
+    search_fields = ("course__title",)
+    ordering = ("-enrollments", "course_id")
+    change_list_template = "admin/learning/coursestats/change_list.html"
+    query_budgets = {"changelist": 8}
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Conclusão", ordering="completions")
+    def completion_rate_display(self, obj):
+        rate = obj.completion_rate
+        return "-" if rate is None else f"{rate:.0%}"
+
+    @admin.display(description="Progresso médio", ordering="average_progress")
+    def average_progress_display(self, obj):
+        return f"{obj.average_progress:.0f}%"
+
+    @admin.display(
+        description="Mediana até concluir", ordering="median_seconds_to_complete"
+    )
+    def median_days_display(self, obj):
+        days = obj.median_days_to_complete
+        return "-" if days is None else f"{days:.1f} dias"
+
+    def get_urls(self):
+        urls = [
+            path(
+                "refresh/",
+                self.admin_site.admin_view(self.refresh_view),
+                name="learning_coursestats_refresh",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {"refreshed_at": last_refreshed_at(), **(extra_context or {})}
+        return super().changelist_view(request, extra_context)
+
+    # Funil de lições do curso no lugar do formulário de edição
+    def change_view(self, request, object_id, form_url="", extra_context=None):
+        stats = self.get_object(request, object_id)
+        if stats is None or not self.has_view_permission(request, stats):
+            raise PermissionDenied
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Funil de lições: {stats.course.title}",
+            "stats": stats,
+            "funnel": course_funnel(stats.course_id),
+        }
+        return TemplateResponse(
+            request, "admin/learning/coursestats/funnel.html", context
+        )
 
+    # Refresh manual (o normal é o comando agendado "refresh_reports")
+    def refresh_view(self, request):
+        if request.method != "POST" or not request.user.is_superuser:
+            raise PermissionDenied
+        timings = refresh_reports()
+        total = sum(seconds for _, seconds in timings)
+        self.message_user(
+            request, f"Relatórios atualizados em {total:.1f}s.", messages.SUCCESS
+        )
+        return redirect("admin:learning_coursestats_changelist")
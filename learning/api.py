@@ -0,0 +1,63 @@
+# Em /learning/api.py
+#
+# API do aluno em views assíncronas (montada em /api/student/), para o caminho
+# de produção ASGI (core/asgi.py). Repete as views síncronas equivalentes de
+# learning/views.py com o ORM assíncrono (aget, aiterator, abulk_create):
+# enquanto uma requisição espera o banco, o worker atende outras, em vez de
+# ficar com uma thread parada por requisição.
+#
+# Servidas pelo WSGI elas também funcionam, mas cada requisição ganharia um
+# event loop próprio; lá, use as views de learning/views.py. O comando
+# "benchmark_servers" compara os dois caminhos sob carga concorrente.
+
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+
+from accounts.models import Student
+from core.instrumentation import query_budget
+
+from .ingestion import aingest_completions
+from .models import Course
+from .outline import aget_course_outline
+from .progress import astudent_progress
+from .views import INVALID_EVENTS, completion_events, completions_response
+
+
+@require_GET
+@query_budget(6)
+async def course_outline(request, public_id):
+    try:
+        outline = await aget_course_outline(public_id)
+    except Course.DoesNotExist:
+        raise Http404("Curso não encontrado.")
+    return JsonResponse(outline)
+
+
+@require_GET
+@login_required
+@query_budget(4)
+async def student_progress(request, public_id):
+    user = await request.auser()
+    try:
+        student = await Student.objects.aget(public_id=public_id)
+    except Student.DoesNotExist:
+        raise Http404("Aluno não encontrado.")
+    if not user.is_staff and student.user_id != user.pk:
+        return JsonResponse({"error": "Aluno não pertence ao usuário."}, status=403)
+    return JsonResponse({"courses": await astudent_progress(student)})
+
+
+# Corpo: {"events": [{"student": uuid, "lesson": uuid, "completed_at": iso8601}]}
+@require_POST
+@login_required
+@query_budget(12, max_duplicates=2)
+async def lesson_completions(request):
+    events = completion_events(request.body)
+    if events is None:
+        return JsonResponse(INVALID_EVENTS, status=400)
+    try:
+        results = await aingest_completions(events, user=await request.auser())
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return completions_response(results)
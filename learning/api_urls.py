@@ -0,0 +1,19 @@
+from django.urls import path
+
+from . import api
+
+app_name = "student-api"
+
+urlpatterns = [
+    path(
+        "courses/<uuid:public_id>/outline/",
+        api.course_outline,
+        name="course-outline",
+    ),
+    path(
+        "students/<uuid:public_id>/progress/",
+        api.student_progress,
+        name="student-progress",
+    ),
+    path("completions/", api.lesson_completions, name="completions"),
+]
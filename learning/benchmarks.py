@@ -0,0 +1,73 @@
+# Cenários de benchmark do app learning (ver core/benchmarks.py)
+
+from django.db.models import Q
+
+from core.benchmarks import scenario
+
+from .ingestion import ingest_completions
+from .models import Course, Enrollment, Lesson
+from .outline import build_course_outline, get_course_outline
+
+
+@scenario("outline.cold")
+def outline_cold(ctx):
+    build_course_outline(ctx.pick(ctx.courses))
+
+
+@scenario("outline.warm")
+def outline_warm(ctx):
+    get_course_outline(ctx.pick(ctx.courses).public_id)
+
+
+@scenario("dashboard.guardian")
+def guardian_dashboard(ctx):
+    # Alunos do responsável com matrículas e progresso (RF020)
+    guardian = ctx.pick(ctx.guardians)
+    list(
+        Enrollment.objects.filter(student__user=guardian)
+        .select_related("student", "course")
+        .order_by("student_id", "-enrolled_at")
+    )
+
+
+@scenario("dashboard.student")
+def student_dashboard(ctx):
+    # Cursos do aluno com a árvore de cada um (RF021)
+    student = ctx.pick(ctx.students)
+    for enrollment in Enrollment.objects.filter(student=student).select_related(
+        "course"
+    ):
+        get_course_outline(enrollment.course.public_id)
+
+
+@scenario("admin.enrollment_changelist")
+def enrollment_changelist(ctx):
+    ctx.get("/admin/learning/enrollment/")
+
+
+@scenario("admin.lessonprogress_changelist")
+def lessonprogress_changelist(ctx):
+    ctx.get("/admin/learning/lessonprogress/")
+
+
+@scenario("write.completions", kind="write")
+def completions_batch(ctx):
+    # Lote de 20 conclusões de um aluno em lições de um curso qualquer
+    student = ctx.pick(ctx.students)
+    course = ctx.pick(ctx.courses)
+    lessons = Lesson.objects.filter(module__course=course).values_list(
+        "public_id", flat=True
+    )[:20]
+    ingest_completions(
+        [{"student": student.public_id, "lesson": lesson} for lesson in lessons]
+    )
+
+
+@scenario("write.enrollment", kind="write")
+def create_enrollment(ctx):
+    student = ctx.pick(ctx.students)
+    course = (
+        Course.objects.filter(~Q(enrollments__student=student)).order_by("?").first()
+    )
+    if course is not None:
+        Enrollment.objects.create(student=student, course=course)
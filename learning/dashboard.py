@@ -0,0 +1,150 @@
+# Em /learning/dashboard.py
+#
+# Painel do responsável (RF020): todos os alunos do usuário com matrículas,
+# progresso, próxima lição e atividade recente. Montado em 3 queries, não
+# importa quantos alunos ou cursos existam, e guardado no cache compartilhado
+# por responsável (core/caching.py), como learning/outline.py. Os signals de
+# Student, Enrollment e LessonProgress invalidam a tag do responsável.
+#
+# Mudanças na estrutura dos cursos (títulos, lições novas) afetam todos os
+# responsáveis matriculados; nesses casos o painel se atualiza pelo timeout.
+
+from datetime import timedelta
+
+from django.db.models import Count, F, Max, Prefetch, Q
+from django.utils import timezone
+
+from accounts.models import Student
+from core.caching import ainvalidate_tags, get_or_compute, invalidate_tags
+from core.routers import primary
+
+from .models import Enrollment, LessonProgress
+from .progress import with_next_lesson
+
+# Mude quando o formato serializado mudar, para descartar o cache antigo
+DASHBOARD_FORMAT = 1
+DASHBOARD_TIMEOUT = 60 * 5
+RECENT_ACTIVITY = 5  # Últimas lições concluídas mostradas por aluno
+ACTIVITY_WINDOW = timedelta(days=7)
+
+
+def _dashboard_key(user_id):
+    return f"learning:dashboard:{DASHBOARD_FORMAT}:{user_id}"
+
+
+def _dashboard_tag(user_id):
+    return f"learning:dashboard:{user_id}"
+
+
+def build_dashboard(user_id):
+    # 3 queries: alunos (com agregados condicionais), matrículas (com a
+    # próxima lição) e as últimas lições concluídas de cada aluno
+    since = timezone.now() - ACTIVITY_WINDOW
+    students = (
+        Student.objects.filter(user_id=user_id)
+        .order_by("nickname", "pk")
+        .annotate(
+            lessons_completed=Count("lesson_progress"),
+            lessons_this_week=Count(
+                "lesson_progress", filter=Q(lesson_progress__completed_at__gte=since)
+            ),
+            last_activity_at=Max("lesson_progress__completed_at"),
+        )
+        .prefetch_related(
+            Prefetch(
+                "enrollments",
+                queryset=with_next_lesson(
+                    Enrollment.objects.select_related("course").order_by(
+                        F("last_activity_at").desc(nulls_last=True),
+                        "-enrolled_at",
+                        "-id",
+                    )
+                ),
+            ),
+            # Prefetch fatiado: o Django limita por aluno com ROW_NUMBER()
+            Prefetch(
+                "lesson_progress",
+                queryset=LessonProgress.objects.select_related("lesson").order_by(
+                    "-completed_at", "-id"
+                )[:RECENT_ACTIVITY],
+                to_attr="recent_progress",
+            ),
+        )
+    )
+    payload = []
+    for student in students:
+        enrollments = student.enrollments.all()
+        payload.append(
+            {
+                "public_id": str(student.public_id),
+                "nickname": student.nickname,
+                "school_year": student.school_year,
+                "lessons_completed": student.lessons_completed,
+                "lessons_this_week": student.lessons_this_week,
+                "last_activity_at": student.last_activity_at,
+                "courses_completed": sum(
+                    enrollment.completed_at is not None for enrollment in enrollments
+                ),
+                "enrollments": [
+                    {
+                        "course": str(enrollment.course.public_id),
+                        "course_title": enrollment.course.title,
+                        "lessons_completed": enrollment.lessons_completed,
+                        "total_lessons": enrollment.total_lessons,
+                        "progress_percent": enrollment.progress_percent,
+                        "last_activity_at": enrollment.last_activity_at,
+                        "completed_at": enrollment.completed_at,
+                        "next_lesson": (enrollment.next_lesson or {}).get("public_id"),
+                        "next_lesson_title": (enrollment.next_lesson or {}).get("title"),
+                    }
+                    for enrollment in enrollments
+                ],
+                "recent_activity": [
+                    {
+                        "lesson": str(record.lesson.public_id),
+                        "lesson_title": record.lesson.title,
+                        "completed_at": record.completed_at,
+                    }
+                    for record in student.recent_progress
+                ],
+            }
+        )
+    return {"students": payload, "generated_at": timezone.now()}
+
+
+def get_dashboard(user_id):
+    def compute():
+        with primary():
+            return build_dashboard(user_id)
+
+    return get_or_compute(
+        _dashboard_key(user_id),
+        compute,
+        DASHBOARD_TIMEOUT,
+        tags=(_dashboard_tag(user_id),),
+    )
+
+
+def invalidate_dashboard(user_id):
+    invalidate_tags(_dashboard_tag(user_id))
+
+
+def invalidate_dashboard_for_students(student_ids):
+    # Responsáveis dos alunos informados (1 query)
+    user_ids = (
+        Student.objects.filter(pk__in=student_ids)
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    for user_id in user_ids:
+        invalidate_dashboard(user_id)
+
+
+async def ainvalidate_dashboard_for_students(student_ids):
+    user_ids = (
+        Student.objects.filter(pk__in=student_ids)
+        .values_list("user_id", flat=True)
+        .distinct()
+    )
+    # Views assíncronas rodam em autocommit: invalida na hora
+    await ainvalidate_tags(*[_dashboard_tag(user_id) async for user_id in user_ids])
@@ -0,0 +1,122 @@
+# Em /learning/exports.py
+#
+# Exportação em streaming (CSV ou JSONL) de matrículas e progresso.
+# As linhas vêm de .values() com os campos relacionados já resolvidos no JOIN
+# (sem queries por linha) e são lidas com .iterator(chunk_size=...), que no
+# PostgreSQL usa cursor no servidor: a memória fica constante.
+
+import csv
+import datetime
+import json
+import uuid
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Enrollment, LessonProgress
+
+CHUNK_SIZE = 2000
+EXPORT_FORMATS = ("csv", "jsonl")
+
+ENROLLMENT_COLUMNS = {
+    # coluna exportada -> campo do .values()
+    "enrollment_id": "public_id",
+    "student_id": "student__public_id",
+    "student_nickname": "student__nickname",
+    "guardian_email": "student__user__email",
+    "course_id": "course__public_id",
+    "course_title": "course__title",
+    "lessons_completed": "lessons_completed",
+    "total_lessons": "total_lessons",
+    "progress_percent": "progress_percent",
+    "enrolled_at": "enrolled_at",
+    "last_activity_at": "last_activity_at",
+    "completed_at": "completed_at",
+}
+
+PROGRESS_COLUMNS = {
+    "progress_id": "public_id",
+    "student_id": "student__public_id",
+    "student_nickname": "student__nickname",
+    "guardian_email": "student__user__email",
+    "course_id": "lesson__module__course__public_id",
+    "course_title": "lesson__module__course__title",
+    "module_order": "lesson__module__module_order",
+    "module_title": "lesson__module__title",
+    "lesson_id": "lesson__public_id",
+    "lesson_order": "lesson__lesson_order",
+    "lesson_title": "lesson__title",
+    "completed_at": "completed_at",
+}
+
+EXPORTS = {
+    "enrollments": (Enrollment, ENROLLMENT_COLUMNS, ("pk",)),
+    "progress": (LessonProgress, PROGRESS_COLUMNS, ("pk",)),
+}
+
+
+def _format_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def iter_rows(kind, queryset=None):
+    # Gera dicionários {coluna: valor} já formatados para exportação
+    model, columns, ordering = EXPORTS[kind]
+    if queryset is None:
+        queryset = model.objects.all()
+    fields = list(columns.values())
+    rows = queryset.order_by(*ordering).values_list(*fields)
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        record = dict(zip(columns, map(_format_value, row)))
+        if kind == "progress":
+            record["lesson_path"] = (
+                f"{record['course_title']} / Módulo {record['module_order']}: "
+                f"{record['module_title']} / Aula {record['lesson_order']}: "
+                f"{record['lesson_title']}"
+            )
+        yield record
+
+
+def columns_for(kind):
+    columns = list(EXPORTS[kind][1])
+    if kind == "progress":
+        columns.insert(columns.index("lesson_title") + 1, "lesson_path")
+    return columns
+
+
+class _Echo:
+    # "Arquivo" que só devolve o que recebe: o csv.writer escreve linha a linha
+    def write(self, value):
+        return value
+
+
+def iter_csv(kind, rows):
+    writer = csv.DictWriter(_Echo(), fieldnames=columns_for(kind))
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def iter_export(kind, fmt, queryset=None):
+    rows = iter_rows(kind, queryset)
+    return iter_csv(kind, rows) if fmt == "csv" else iter_jsonl(rows)
+
+
+def export_response(kind, fmt, queryset=None):
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"{kind}-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+    response = StreamingHttpResponse(
+        iter_export(kind, fmt, queryset),
+        content_type=f"{content_type}; charset=utf-8",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
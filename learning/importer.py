@@ -0,0 +1,580 @@
+# Em /learning/importer.py
+#
+# Importação em lote de cursos a partir de um manifesto (JSON, JSONL ou CSV).
+# Cada curso é validado em memória e gravado inteiro com bulk_create dentro de
+# uma única transação: ou o curso entra completo, ou nada muda.
+#
+# A importação é idempotente pelo public_id do curso. Módulos e lições sem
+# public_id no manifesto reaproveitam o public_id da linha que já ocupa a mesma
+# posição (module_order/lesson_order), para não perder o progresso dos alunos.
+# O manifesto descreve o curso inteiro: módulos, lições, materiais e legendas
+# que não aparecem nele são removidos.
+#
+# Formato JSON de um curso:
+#
+#   {"public_id": "...", "title": "...", "description": "...",
+#    "thumbnail_url": "...",
+#    "modules": [{"public_id": "...", "title": "...", "module_order": 1,
+#                 "lessons": [{"public_id": "...", "title": "...",
+#                              "lesson_order": 1, "lesson_type": "video",
+#                              "content": "...", "video_url": "...",
+#                              "duration_in_seconds": 300,
+#                              "materials": [{"title": "...", "file_url": "...",
+#                                             "file_type": "pdf"}],
+#                              "subtitles": [{"language_code": "pt-BR",
+#                                             "file_url": "..."}]}]}]}
+#
+# No CSV cada linha é uma lição (sem materiais/legendas), com as colunas
+# course_public_id, course_title, course_description, module_public_id,
+# module_order, module_title, lesson_public_id, lesson_order, lesson_title,
+# lesson_type, content, video_url e duration_in_seconds. As linhas de um mesmo
+# curso precisam estar juntas no arquivo.
+#
+# Um curso só pode aparecer uma vez por manifesto: a segunda ocorrência
+# removeria as lições que só a primeira lista (e o progresso dos alunos nelas).
+
+import csv
+import itertools
+import json
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from . import outline, progress, subtitles, tts
+from .models import (
+    Course,
+    Enrollment,
+    Lesson,
+    LessonTypeChoices,
+    Material,
+    Module,
+    Subtitle,
+)
+
+# Namespace dos UUIDs derivados (determinísticos) para itens sem public_id
+IMPORT_NAMESPACE = uuid.UUID("6f1d3c52-8f0e-4c8a-9a57-3c1c8f3b2a10")
+
+FORMATS = ("json", "jsonl", "csv")
+
+
+class ManifestError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    public_id: str
+    title: str
+    created: bool
+    modules: int
+    lessons: int
+    removed_lessons: int
+
+
+# --- Leitura do manifesto (streaming) ---
+
+
+def guess_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension not in FORMATS:
+        raise ManifestError(f"Formato de manifesto desconhecido: '{filename}'.")
+    return extension
+
+
+def iter_manifest(stream, fmt):
+    # Gera um dicionário por curso, sem carregar o arquivo inteiro (JSON puro
+    # é a exceção: o módulo json não lê de forma incremental)
+    seen = set()
+    for data in _iter_courses(stream, fmt):
+        public_id = data.get("public_id") if isinstance(data, dict) else None
+        if public_id:
+            public_id = _uuid(public_id, "Curso")
+            if public_id in seen:
+                raise ManifestError(
+                    f"Curso {public_id}: aparece mais de uma vez no manifesto "
+                    "(no CSV, as linhas de um curso precisam estar juntas)."
+                )
+            seen.add(public_id)
+        yield data
+
+
+def _iter_courses(stream, fmt):
+    if fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as exc:
+                    raise ManifestError(f"Linha {line_number}: JSON inválido ({exc}).")
+    elif fmt == "json":
+        try:
+            data = json.load(stream)
+        except json.JSONDecodeError as exc:
+            raise ManifestError(f"JSON inválido ({exc}).")
+        yield from data if isinstance(data, list) else [data]
+    elif fmt == "csv":
+        rows = csv.DictReader(stream)
+        for _, course_rows in itertools.groupby(
+            rows, key=lambda row: row.get("course_public_id")
+        ):
+            yield _course_from_csv(list(course_rows))
+    else:
+        raise ManifestError(f"Formato de manifesto desconhecido: '{fmt}'.")
+
+
+def _course_from_csv(rows):
+    first = rows[0]
+    modules = {}
+    for row in rows:
+        module = modules.setdefault(
+            row.get("module_order"),
+            {
+                "public_id": row.get("module_public_id") or None,
+                "title": row.get("module_title"),
+                "module_order": row.get("module_order"),
+                "lessons": [],
+            },
+        )
+        module["lessons"].append(
+            {
+                "public_id": row.get("lesson_public_id") or None,
+                "title": row.get("lesson_title"),
+                "lesson_order": row.get("lesson_order"),
+                "lesson_type": row.get("lesson_type") or LessonTypeChoices.VIDEO,
+                "content": row.get("content") or None,
+                "video_url": row.get("video_url") or None,
+                "duration_in_seconds": row.get("duration_in_seconds") or None,
+            }
+        )
+    return {
+        "public_id": first.get("course_public_id"),
+        "title": first.get("course_title"),
+        "description": first.get("course_description") or None,
+        "modules": list(modules.values()),
+    }
+
+
+# --- Validação em memória ---
+
+
+def _uuid(value, where):
+    if value in (None, ""):
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise ManifestError(f"{where}: public_id inválido ('{value}').")
+
+
+def _int(value, where, field, required=True):
+    if value in (None, ""):
+        if required:
+            raise ManifestError(f"{where}: o campo '{field}' é obrigatório.")
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ManifestError(f"{where}: '{field}' deve ser um número inteiro.")
+    if number < 0:
+        raise ManifestError(f"{where}: '{field}' não pode ser negativo.")
+    return number
+
+
+def _text(value, where, field, max_length=None, required=True):
+    if value is None or not str(value).strip():
+        if required:
+            raise ManifestError(f"{where}: o campo '{field}' é obrigatório.")
+        return None
+    if not isinstance(value, (str, int, float)):
+        raise ManifestError(f"{where}: '{field}' deve ser um texto.")
+    value = str(value).strip()
+    if max_length is not None and len(value) > max_length:
+        raise ManifestError(
+            f"{where}: '{field}' passa de {max_length} caracteres."
+        )
+    return value
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length
+
+
+def validate_course(data):
+    # Normaliza o dicionário do curso e garante as unicidades que o banco
+    # exigiria (module_order por curso, lesson_order por módulo, public_ids)
+    if not isinstance(data, dict):
+        raise ManifestError("Cada curso do manifesto deve ser um objeto.")
+    public_id = _uuid(data.get("public_id"), "Curso")
+    if public_id is None:
+        raise ManifestError("Curso: o public_id é obrigatório para a importação.")
+    where = f"Curso {public_id}"
+    course = {
+        "public_id": public_id,
+        "title": _text(
+            data.get("title"), where, "title", _max_length(Course, "title")
+        ),
+        "description": _text(
+            data.get("description"), where, "description", required=False
+        ),
+        "thumbnail_url": _text(
+            data.get("thumbnail_url"),
+            where,
+            "thumbnail_url",
+            _max_length(Course, "thumbnail_url"),
+            required=False,
+        ),
+        "modules": [],
+    }
+
+    module_orders = set()
+    lesson_types = set(LessonTypeChoices.values)
+    for module_data in data.get("modules") or []:
+        module_order = _int(module_data.get("module_order"), where, "module_order")
+        module_where = f"{where}, módulo {module_order}"
+        if module_order in module_orders:
+            raise ManifestError(f"{module_where}: module_order repetido.")
+        module_orders.add(module_order)
+        module = {
+            "public_id": _uuid(module_data.get("public_id"), module_where),
+            "title": _text(
+                module_data.get("title"),
+                module_where,
+                "title",
+                _max_length(Module, "title"),
+            ),
+            "module_order": module_order,
+            "lessons": [],
+        }
+
+        lesson_orders = set()
+        for lesson_data in module_data.get("lessons") or []:
+            lesson_order = _int(
+                lesson_data.get("lesson_order"), module_where, "lesson_order"
+            )
+            lesson_where = f"{module_where}, lição {lesson_order}"
+            if lesson_order in lesson_orders:
+                raise ManifestError(f"{lesson_where}: lesson_order repetido.")
+            lesson_orders.add(lesson_order)
+            lesson_type = lesson_data.get("lesson_type") or LessonTypeChoices.VIDEO
+            if not isinstance(lesson_type, str) or lesson_type not in lesson_types:
+                raise ManifestError(
+                    f"{lesson_where}: lesson_type inválido ('{lesson_type}')."
+                )
+            languages = [
+                _text(
+                    subtitle.get("language_code"),
+                    lesson_where,
+                    "language_code",
+                    _max_length(Subtitle, "language_code"),
+                )
+                for subtitle in lesson_data.get("subtitles") or []
+            ]
+            if len(languages) != len(set(languages)):
+                raise ManifestError(f"{lesson_where}: legenda repetida para uma língua.")
+            module["lessons"].append(
+                {
+                    "public_id": _uuid(lesson_data.get("public_id"), lesson_where),
+                    "title": _text(
+                        lesson_data.get("title"),
+                        lesson_where,
+                        "title",
+                        _max_length(Lesson, "title"),
+                    ),
+                    "lesson_order": lesson_order,
+                    "lesson_type": lesson_type,
+                    "content": _text(
+                        lesson_data.get("content"),
+                        lesson_where,
+                        "content",
+                        required=False,
+                    ),
+                    "video_url": _text(
+                        lesson_data.get("video_url"),
+                        lesson_where,
+                        "video_url",
+                        _max_length(Lesson, "video_url"),
+                        required=False,
+                    ),
+                    "duration_in_seconds": _int(
+                        lesson_data.get("duration_in_seconds"),
+                        lesson_where,
+                        "duration_in_seconds",
+                        required=False,
+                    ),
+                    "materials": [
+                        {
+                            "title": _text(
+                                m.get("title"),
+                                lesson_where,
+                                "title",
+                                _max_length(Material, "title"),
+                            ),
+                            "file_url": _text(
+                                m.get("file_url"),
+                                lesson_where,
+                                "file_url",
+                                _max_length(Material, "file_url"),
+                            ),
+                            "file_type": _text(
+                                m.get("file_type"),
+                                lesson_where,
+                                "file_type",
+                                _max_length(Material, "file_type"),
+                                required=False,
+                            ),
+                        }
+                        for m in lesson_data.get("materials") or []
+                    ],
+                    "subtitles": [
+                        {
+                            "language_code": language,
+                            "file_url": _text(
+                                s.get("file_url"),
+                                lesson_where,
+                                "file_url",
+                                _max_length(Subtitle, "file_url"),
+                            ),
+                        }
+                        for language, s in zip(
+                            languages, lesson_data.get("subtitles") or []
+                        )
+                    ],
+                }
+            )
+        course["modules"].append(module)
+
+    public_ids = [module["public_id"] for module in course["modules"]] + [
+        lesson["public_id"]
+        for module in course["modules"]
+        for lesson in module["lessons"]
+    ]
+    public_ids = [public_id for public_id in public_ids if public_id is not None]
+    if len(public_ids) != len(set(public_ids)):
+        raise ManifestError(f"{where}: public_id repetido no manifesto.")
+    return course
+
+
+# --- Gravação ---
+
+
+def _derived_uuid(*parts):
+    return uuid.uuid5(IMPORT_NAMESPACE, ":".join(str(part) for part in parts))
+
+
+def _check_foreign_ids(course, module_ids, lesson_ids):
+    # Um public_id do manifesto não pode "roubar" itens de outro curso
+    foreign = list(
+        Module.objects.filter(public_id__in=module_ids)
+        .exclude(course=course)
+        .values_list("public_id", flat=True)[:1]
+    ) or list(
+        Lesson.objects.filter(public_id__in=lesson_ids)
+        .exclude(module__course=course)
+        .values_list("public_id", flat=True)[:1]
+    )
+    if foreign:
+        raise ManifestError(
+            f"Curso {course.public_id}: o public_id {foreign[0]} pertence a outro curso."
+        )
+
+
+@transaction.atomic
+def import_course(data):
+    course_data = validate_course(data)
+    course, created = Course.objects.update_or_create(
+        public_id=course_data["public_id"],
+        defaults={
+            "title": course_data["title"],
+            "description": course_data["description"],
+            "thumbnail_url": course_data["thumbnail_url"],
+        },
+    )
+
+    # Posições já ocupadas -> public_id, para reaproveitar em itens sem public_id
+    existing_modules = dict(
+        Module.objects.filter(course=course).values_list("module_order", "public_id")
+    )
+    existing_lessons = {
+        (module_order, lesson_order): public_id
+        for module_order, lesson_order, public_id in Lesson.objects.filter(
+            module__course=course
+        ).values_list("module__module_order", "lesson_order", "public_id")
+    }
+    for module in course_data["modules"]:
+        module["public_id"] = (
+            module["public_id"]
+            or existing_modules.get(module["module_order"])
+            or _derived_uuid(course.public_id, module["module_order"])
+        )
+        for lesson in module["lessons"]:
+            position = (module["module_order"], lesson["lesson_order"])
+            lesson["public_id"] = (
+                lesson["public_id"]
+                or existing_lessons.get(position)
+                or _derived_uuid(course.public_id, *position)
+            )
+    module_ids = [module["public_id"] for module in course_data["modules"]]
+    lesson_ids = [
+        lesson["public_id"]
+        for module in course_data["modules"]
+        for lesson in module["lessons"]
+    ]
+    _check_foreign_ids(course, module_ids, lesson_ids)
+
+    # Remove o que saiu do manifesto e afasta as ordens atuais para valores
+    # negativos, evitando colisões de (course, module_order) e
+    # (module, lesson_order) enquanto as novas ordens são gravadas
+    _, removed = (
+        Lesson.objects.filter(module__course=course)
+        .exclude(public_id__in=lesson_ids)
+        .delete()
+    )
+    Module.objects.filter(course=course).exclude(public_id__in=module_ids).delete()
+    Module.objects.filter(course=course).update(module_order=-F("module_order") - 1)
+    Lesson.objects.filter(module__course=course).update(
+        lesson_order=-F("lesson_order") - 1
+    )
+
+    modules = Module.objects.bulk_create(
+        [
+            Module(
+                public_id=module["public_id"],
+                course=course,
+                title=module["title"],
+                module_order=module["module_order"],
+            )
+            for module in course_data["modules"]
+        ],
+        update_conflicts=True,
+        unique_fields=["public_id"],
+        update_fields=["course", "title", "module_order", "updated_at"],
+    )
+    lesson_items = [
+        (module, lesson)
+        for module, module_data in zip(modules, course_data["modules"])
+        for lesson in module_data["lessons"]
+    ]
+    lessons = Lesson.objects.bulk_create(
+        [
+            Lesson(
+                public_id=lesson["public_id"],
+                module=module,
+                title=lesson["title"],
+                lesson_order=lesson["lesson_order"],
+                lesson_type=lesson["lesson_type"],
+                content=lesson["content"],
+                video_url=lesson["video_url"],
+                duration_in_seconds=lesson["duration_in_seconds"],
+            )
+            for module, lesson in lesson_items
+        ],
+        update_conflicts=True,
+        unique_fields=["public_id"],
+        update_fields=[
+            "module",
+            "title",
+            "lesson_order",
+            "lesson_type",
+            "content",
+            "video_url",
+            "duration_in_seconds",
+            "updated_at",
+        ],
+    )
+    lesson_items = [
+        (lesson, lesson_data) for lesson, (_, lesson_data) in zip(lessons, lesson_items)
+    ]
+    _import_attachments(course, lesson_items)
+
+    # bulk_create não dispara signals: atualiza contadores e cache manualmente
+    if not created:
+        progress.refresh_enrollments(Enrollment.objects.filter(course=course))
+    outline.invalidate_course_outline(course.public_id)
+    if settings.TTS_RENDER_ON_SAVE:
+        # Só as lições de texto novas ou com outro conteúdo são sintetizadas
+        text_lessons = [
+            lesson.pk for lesson in lessons if lesson.lesson_type == LessonTypeChoices.TEXT
+        ]
+        if text_lessons:
+            transaction.on_commit(lambda: tts.render_in_background(text_lessons))
+
+    return ImportResult(
+        public_id=str(course.public_id),
+        title=course.title,
+        created=created,
+        modules=len(modules),
+        lessons=len(lessons),
+        removed_lessons=removed.get(Lesson._meta.label, 0),
+    )
+
+
+def _import_attachments(course, lesson_items):
+    # Materiais e legendas também são gravados por upsert; as legendas já
+    # existentes mantêm o public_id da mesma (lição, língua)
+    existing_subtitles = {
+        (lesson_id, language_code): (public_id, file_url)
+        for lesson_id, language_code, public_id, file_url in Subtitle.objects.filter(
+            lesson__module__course=course
+        ).values_list("lesson_id", "language_code", "public_id", "file_url")
+    }
+    materials = [
+        Material(
+            public_id=_derived_uuid(lesson.public_id, "material", index),
+            lesson=lesson,
+            **material,
+        )
+        for lesson, lesson_data in lesson_items
+        for index, material in enumerate(lesson_data["materials"])
+    ]
+    subtitle_items = [
+        (existing_subtitles.get((lesson.pk, subtitle["language_code"])), lesson, subtitle)
+        for lesson, lesson_data in lesson_items
+        for subtitle in lesson_data["subtitles"]
+    ]
+    new_subtitles = [
+        Subtitle(
+            public_id=existing[0]
+            if existing
+            else _derived_uuid(lesson.public_id, "subtitle", subtitle["language_code"]),
+            lesson=lesson,
+            **subtitle,
+        )
+        for existing, lesson, subtitle in subtitle_items
+    ]
+
+    Material.objects.filter(lesson__module__course=course).exclude(
+        public_id__in=[material.public_id for material in materials]
+    ).delete()
+    Subtitle.objects.filter(lesson__module__course=course).exclude(
+        public_id__in=[subtitle.public_id for subtitle in new_subtitles]
+    ).delete()
+    Material.objects.bulk_create(
+        materials,
+        update_conflicts=True,
+        unique_fields=["public_id"],
+        update_fields=["lesson", "title", "file_url", "file_type", "updated_at"],
+    )
+    stored = Subtitle.objects.bulk_create(
+        new_subtitles,
+        update_conflicts=True,
+        unique_fields=["public_id"],
+        update_fields=["lesson", "language_code", "file_url", "updated_at"],
+    )
+
+    # bulk_create não dispara o post_save: agenda a ingestão das legendas
+    # novas ou com outro arquivo
+    if settings.SUBTITLE_INGEST_ON_SAVE:
+        subtitles.ingest_on_commit(
+            subtitle
+            for subtitle, (existing, _, data) in zip(stored, subtitle_items)
+            if existing is None or existing[1] != data["file_url"]
+        )
+
+
+def import_manifest(stream, fmt):
+    # Importa curso a curso; cada um em sua própria transação
+    for data in iter_manifest(stream, fmt):
+        yield import_course(data)
@@ -0,0 +1,220 @@
+# Em /learning/ingestion.py
+#
+# Ingestão em lote das conclusões de lição enviadas pelos players.
+# Um lote inteiro custa um número fixo de queries: resolve os public_ids de
+# uma vez, remove duplicatas em memória, grava com um único
+# bulk_create(ignore_conflicts=True) e recalcula os contadores das matrículas
+# afetadas em um único UPDATE (ver learning/progress.py).
+
+import uuid
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import Student
+from . import dashboard, progress
+from .models import Enrollment, Lesson, LessonProgress
+
+MAX_BATCH_SIZE = 500
+
+
+# Status possíveis de cada evento do lote
+class CompletionStatus:
+    CREATED = "created"  # Conclusão gravada agora
+    DUPLICATE = "duplicate"  # Já existia (ou repetida dentro do lote)
+    INVALID = "invalid"  # Evento mal formado
+    NOT_FOUND = "not_found"  # Aluno ou lição inexistente
+    FORBIDDEN = "forbidden"  # Aluno não pertence ao usuário logado
+
+
+@dataclass
+class CompletionEvent:
+    index: int
+    student: uuid.UUID = None
+    lesson: uuid.UUID = None
+    completed_at: object = None
+    status: str = None
+    error: str = None
+
+    def as_result(self):
+        result = {"index": self.index, "status": self.status}
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+def _parse_event(index, data, now):
+    event = CompletionEvent(index=index)
+    if not isinstance(data, dict):
+        event.status, event.error = CompletionStatus.INVALID, "Evento deve ser um objeto."
+        return event
+    try:
+        event.student = uuid.UUID(str(data.get("student")))
+        event.lesson = uuid.UUID(str(data.get("lesson")))
+    except ValueError:
+        event.status, event.error = CompletionStatus.INVALID, "public_id inválido."
+        return event
+
+    completed_at = data.get("completed_at")
+    if completed_at in (None, ""):
+        event.completed_at = now
+    else:
+        try:
+            # None se o formato não bate; ValueError se a data não existe
+            # (ex.: 30 de fevereiro)
+            parsed = parse_datetime(str(completed_at))
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            event.status, event.error = CompletionStatus.INVALID, "completed_at inválido."
+            return event
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        # Relógio adiantado no dispositivo não pode gerar datas no futuro
+        event.completed_at = min(parsed, now)
+    return event
+
+
+def _prepare(payload):
+    if len(payload) > MAX_BATCH_SIZE:
+        raise ValueError(f"O lote deve ter no máximo {MAX_BATCH_SIZE} eventos.")
+    now = timezone.now()
+    events = [_parse_event(index, data, now) for index, data in enumerate(payload)]
+    return events, [event for event in events if event.status is None]
+
+
+def _lookups(pending):
+    # public_id -> (pk, user_id) dos alunos e public_id -> pk das lições
+    students = Student.objects.filter(
+        public_id__in={e.student for e in pending}
+    ).values_list("public_id", "pk", "user_id")
+    lessons = Lesson.objects.filter(
+        public_id__in={e.lesson for e in pending}
+    ).values_list("public_id", "pk")
+    return students, lessons
+
+
+def _resolve(pending, students, lessons, user):
+    # Resolve e remove duplicatas do próprio lote (fica a conclusão mais antiga)
+    restrict_to = None if user is None or user.is_staff else user.pk
+    first_by_pair = {}
+    for event in pending:
+        student = students.get(event.student)
+        lesson_pk = lessons.get(event.lesson)
+        if student is None or lesson_pk is None:
+            event.status = CompletionStatus.NOT_FOUND
+            continue
+        if restrict_to is not None and student[1] != restrict_to:
+            event.status = CompletionStatus.FORBIDDEN
+            continue
+        pair = (student[0], lesson_pk)
+        first = first_by_pair.get(pair)
+        if first is None or event.completed_at < first.completed_at:
+            if first is not None:
+                first.status = CompletionStatus.DUPLICATE
+            first_by_pair[pair] = event
+        else:
+            event.status = CompletionStatus.DUPLICATE
+    return first_by_pair
+
+
+def ingest_completions(payload, user=None):
+    # payload: lista de {"student": uuid, "lesson": uuid, "completed_at": iso8601}
+    # user: se informado (e não for staff), só aceita alunos desse responsável.
+    # Devolve a lista de eventos com o status de cada um, na ordem recebida.
+    events, pending = _prepare(payload)
+    students, lessons = _lookups(pending)
+    first_by_pair = _resolve(
+        pending,
+        {public_id: (pk, user_id) for public_id, pk, user_id in students},
+        dict(lessons),
+        user,
+    )
+    if first_by_pair:
+        with transaction.atomic():
+            _write_completions(first_by_pair)
+    return events
+
+
+def _existing_pairs(first_by_pair):
+    return LessonProgress.objects.filter(
+        student_id__in={student_id for student_id, _ in first_by_pair},
+        lesson_id__in={lesson_id for _, lesson_id in first_by_pair},
+    ).values_list("student_id", "lesson_id")
+
+
+def _new_pairs(first_by_pair, existing):
+    new_pairs = []
+    for pair, event in first_by_pair.items():
+        if pair in existing:
+            event.status = CompletionStatus.DUPLICATE
+        else:
+            event.status = CompletionStatus.CREATED
+            new_pairs.append(pair)
+    return new_pairs
+
+
+def _progress_rows(first_by_pair, new_pairs):
+    return [
+        LessonProgress(
+            student_id=student_id,
+            lesson_id=lesson_id,
+            completed_at=first_by_pair[(student_id, lesson_id)].completed_at,
+        )
+        for student_id, lesson_id in new_pairs
+    ]
+
+
+def _affected_enrollments(new_pairs):
+    return Enrollment.objects.filter(
+        student_id__in={student_id for student_id, _ in new_pairs},
+        course__modules__lessons__in={lesson_id for _, lesson_id in new_pairs},
+    )
+
+
+def _write_completions(first_by_pair):
+    new_pairs = _new_pairs(first_by_pair, set(_existing_pairs(first_by_pair)))
+    if not new_pairs:
+        return
+
+    # ignore_conflicts cobre a corrida com outro lote gravando o mesmo par
+    LessonProgress.objects.bulk_create(
+        _progress_rows(first_by_pair, new_pairs), ignore_conflicts=True
+    )
+    # bulk_create não dispara signals: recalcula as matrículas afetadas de uma
+    # vez (recalcular, e não somar, é seguro mesmo se houve conflito)
+    progress.refresh_enrollments(_affected_enrollments(new_pairs))
+    dashboard.invalidate_dashboard_for_students(
+        {student_id for student_id, _ in new_pairs}
+    )
+
+
+async def aingest_completions(payload, user=None):
+    # Versão assíncrona de ingest_completions (learning/api.py), com as mesmas
+    # queries. O Django não tem transações assíncronas, então cada comando é
+    # confirmado sozinho: se o processo cair entre o INSERT e o recálculo, os
+    # contadores ficam atrasados até o próximo lote do aluno ou até o comando
+    # "rebuild_enrollment_progress".
+    events, pending = _prepare(payload)
+    students, lessons = _lookups(pending)
+    first_by_pair = _resolve(
+        pending,
+        {public_id: (pk, user_id) async for public_id, pk, user_id in students},
+        {public_id: pk async for public_id, pk in lessons},
+        user,
+    )
+    if not first_by_pair:
+        return events
+    existing = {pair async for pair in _existing_pairs(first_by_pair)}
+    new_pairs = _new_pairs(first_by_pair, existing)
+    if new_pairs:
+        await LessonProgress.objects.abulk_create(
+            _progress_rows(first_by_pair, new_pairs), ignore_conflicts=True
+        )
+        await progress.arefresh_enrollments(_affected_enrollments(new_pairs))
+        await dashboard.ainvalidate_dashboard_for_students(
+            {student_id for student_id, _ in new_pairs}
+        )
+    return events
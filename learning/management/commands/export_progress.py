@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from learning.exports import EXPORT_FORMATS, EXPORTS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Exporta matrículas ou progresso de lições em CSV/JSONL (streaming)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument(
+            "--output", "-o", help="Arquivo de saída (padrão: saída padrão)."
+        )
+        parser.add_argument(
+            "--course",
+            action="append",
+            default=[],
+            metavar="PUBLIC_ID",
+            help="Limita aos cursos informados (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--guardian",
+            metavar="EMAIL",
+            help="Limita aos alunos de um responsável.",
+        )
+
+    def handle(self, *args, **options):
+        kind = options["kind"]
+        model = EXPORTS[kind][0]
+        queryset = model.objects.all()
+        course_field = "course" if kind == "enrollments" else "lesson__module__course"
+        if options["course"]:
+            queryset = queryset.filter(
+                **{f"{course_field}__public_id__in": options["course"]}
+            )
+        if options["guardian"]:
+            queryset = queryset.filter(student__user__email=options["guardian"])
+
+        output = (
+            open(options["output"], "w", encoding="utf-8", newline="")
+            if options["output"]
+            else sys.stdout
+        )
+        try:
+            for chunk in iter_export(kind, options["format"], queryset):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
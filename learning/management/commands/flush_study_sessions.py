@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.caching import is_shared
+from learning.study import flush_idle_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Grava os trechos de estudo parados e encerra as sessões abandonadas. "
+        "Agende para rodar a cada poucos minutos."
+    )
+
+    def handle(self, *args, **options):
+        # Com o cache só deste processo, o comando não vê os heartbeats dos
+        # workers e encerraria sessões ativas como abandonadas
+        if not is_shared():
+            raise CommandError(
+                "Os heartbeats ficam no cache: configure um cache compartilhado "
+                "(CACHE_BACKEND=redis) antes de agendar este comando."
+            )
+        written, closed = flush_idle_sessions()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{written} trecho(s) gravado(s), {closed} sessão(ões) encerrada(s)."
+            )
+        )
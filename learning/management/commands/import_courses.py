@@ -0,0 +1,67 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from learning.importer import (
+    FORMATS,
+    ManifestError,
+    guess_format,
+    import_course,
+    iter_manifest,
+    validate_course,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa cursos (módulos, lições, materiais e legendas) a partir de um "
+        "manifesto JSON, JSONL ou CSV. Idempotente pelo public_id do curso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "manifest", help="Caminho do manifesto ('-' para ler da entrada padrão)."
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Formato do manifesto (padrão: deduzido pela extensão).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas valida o manifesto, sem gravar nada.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["manifest"]
+        if path == "-" and not options["format"]:
+            raise CommandError("Informe --format ao ler da entrada padrão.")
+        try:
+            fmt = options["format"] or guess_format(path)
+            stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        except (ManifestError, OSError) as exc:
+            raise CommandError(exc)
+
+        total = 0
+        with stream:
+            try:
+                for data in iter_manifest(stream, fmt):
+                    if options["dry_run"]:
+                        course = validate_course(data)
+                        self.stdout.write(f"OK: {course['public_id']} ({course['title']})")
+                    else:
+                        result = import_course(data)
+                        action = "criado" if result.created else "atualizado"
+                        self.stdout.write(
+                            f"{result.public_id} ({result.title}): {action}, "
+                            f"{result.modules} módulo(s), {result.lessons} lição(ões), "
+                            f"{result.removed_lessons} lição(ões) removida(s)."
+                        )
+                    total += 1
+            except (ManifestError, DatabaseError) as exc:
+                # Os cursos anteriores já foram gravados (uma transação por curso)
+                raise CommandError(f"{exc} ({total} curso(s) processado(s) antes do erro.)")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} curso(s) processado(s)."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from learning.models import Subtitle
+from learning.subtitles import ingest_subtitle
+
+
+class Command(BaseCommand):
+    help = (
+        "Baixa e indexa as falas das legendas (.vtt/.srt). Por padrão só "
+        "processa as legendas novas ou cuja URL mudou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lesson",
+            action="append",
+            default=[],
+            metavar="PUBLIC_ID",
+            help="Limita às lições informadas (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Baixa e processa de novo mesmo as legendas já indexadas.",
+        )
+
+    def handle(self, *args, **options):
+        subtitles = Subtitle.objects.order_by("pk")
+        if options["lesson"]:
+            subtitles = subtitles.filter(lesson__public_id__in=options["lesson"])
+        processed = failed = 0
+        for subtitle in subtitles.iterator():
+            try:
+                ingest_subtitle(subtitle, force=options["force"])
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"{subtitle.public_id} ({subtitle.file_url}): {exc}")
+                continue
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(f"{processed} legenda(s) processada(s)."))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} legenda(s) com erro."))
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from learning.models import Enrollment
+from learning.progress import live_counts, refresh_enrollments
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula os contadores de progresso das matrículas a partir das "
+        "tabelas LessonProgress/Lesson. Use --check para apenas conferir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Apenas lista as matrículas divergentes, sem gravar nada.",
+        )
+        parser.add_argument(
+            "--course",
+            action="append",
+            default=[],
+            metavar="PUBLIC_ID",
+            help="Limita aos cursos informados (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Quantidade de matrículas atualizadas por transação.",
+        )
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.order_by("pk")
+        if options["course"]:
+            enrollments = enrollments.filter(course__public_id__in=options["course"])
+
+        if options["check"]:
+            return self.check_divergences(enrollments)
+
+        batch_size = options["batch_size"]
+        updated = 0
+        last_pk = 0
+        # Lotes por faixa de PK para não segurar locks na tabela inteira
+        while True:
+            pks = list(
+                enrollments.filter(pk__gt=last_pk).values_list("pk", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += refresh_enrollments(Enrollment.objects.filter(pk__in=pks))
+            last_pk = pks[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{updated} matrícula(s) recalculada(s).")
+        )
+
+    def check_divergences(self, enrollments):
+        live = {f"live_{name}": expr for name, expr in live_counts().items()}
+        divergent = enrollments.annotate(**live).filter(
+            ~Q(lessons_completed=F("live_lessons_completed"))
+            | ~Q(total_lessons=F("live_total_lessons"))
+        )
+        total = 0
+        for enrollment in divergent.iterator(chunk_size=2000):
+            total += 1
+            self.stdout.write(
+                f"{enrollment.public_id}: "
+                f"concluídas {enrollment.lessons_completed} "
+                f"(real {enrollment.live_lessons_completed}), "
+                f"total {enrollment.total_lessons} "
+                f"(real {enrollment.live_total_lessons})"
+            )
+        if total:
+            self.stdout.write(self.style.WARNING(f"{total} matrícula(s) divergente(s)."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Nenhuma divergência encontrada."))
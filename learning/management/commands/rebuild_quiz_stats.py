@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from learning.models import Lesson
+from learning.quiz_stats import rebuild_quiz_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula do zero as estatísticas das questões dos quizzes "
+        "(dificuldade e discriminação) a partir das tentativas. Feito para "
+        "rodar toda noite; durante o dia elas são atualizadas a cada tentativa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lesson",
+            action="append",
+            default=[],
+            metavar="PUBLIC_ID",
+            help="Limita às lições informadas (pode ser repetido).",
+        )
+
+    def handle(self, *args, **options):
+        lessons = Lesson.objects.all()
+        if options["lesson"]:
+            lessons = lessons.filter(public_id__in=options["lesson"])
+        total = rebuild_quiz_stats(lessons)
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} questão(ões) recalculada(s).")
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from learning.reports import refresh_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza as views materializadas dos relatórios de cursos "
+        "(REFRESH MATERIALIZED VIEW CONCURRENTLY)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--blocking",
+            action="store_true",
+            help="Refresh sem CONCURRENTLY: mais rápido, mas bloqueia as leituras.",
+        )
+
+    def handle(self, *args, **options):
+        for view, seconds in refresh_reports(concurrently=not options["blocking"]):
+            self.stdout.write(f"{view}: {seconds:.2f}s")
+        self.stdout.write(self.style.SUCCESS("Relatórios atualizados."))
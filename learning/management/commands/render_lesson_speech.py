@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.models import Lesson, LessonTypeChoices
+from learning.tts import prune_chunks, render_lesson_speech
+
+
+class Command(BaseCommand):
+    help = (
+        "Pré-renderiza o áudio (TTS) das lições de texto. Só as frases que "
+        "ainda não têm áudio são sintetizadas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lesson",
+            action="append",
+            default=[],
+            metavar="PUBLIC_ID",
+            help="Limita às lições informadas (pode ser repetido).",
+        )
+        parser.add_argument(
+            "--voice",
+            action="append",
+            default=[],
+            help="Vozes a gerar (padrão: a voz padrão).",
+        )
+        parser.add_argument(
+            "--rate",
+            action="append",
+            type=float,
+            default=[],
+            help="Velocidades a gerar (padrão: 1.0).",
+        )
+        parser.add_argument("--workers", type=int, default=settings.TTS_WORKERS)
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Remove também os trechos que nenhuma lição usa mais.",
+        )
+
+    def handle(self, *args, **options):
+        lessons = Lesson.objects.filter(lesson_type=LessonTypeChoices.TEXT).order_by("pk")
+        if options["lesson"]:
+            lessons = lessons.filter(public_id__in=options["lesson"])
+        voices = options["voice"] or [settings.TTS_VOICES[0]]
+        rates = options["rate"] or [1.0]
+
+        synthesized = 0
+        for lesson in lessons.iterator():
+            for voice in voices:
+                for rate in rates:
+                    try:
+                        _, count = render_lesson_speech(
+                            lesson, voice, rate, workers=options["workers"]
+                        )
+                    except ValueError as exc:
+                        raise CommandError(exc)
+                    synthesized += count
+        self.stdout.write(
+            self.style.SUCCESS(f"{synthesized} trecho(s) sintetizado(s).")
+        )
+        if options["prune"]:
+            removed = prune_chunks()
+            self.stdout.write(self.style.SUCCESS(f"{removed} trecho(s) removido(s)."))
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:29
+
+from django.db import migrations, models
+
+
+# Preenche os contadores das matrículas já existentes
+BACKFILL_SQL = """
+UPDATE learning_enrollment e SET
+    lessons_completed = COALESCE(p.done, 0),
+    last_activity_at = p.last_at,
+    total_lessons = COALESCE(l.total, 0)
+FROM learning_enrollment e2
+LEFT JOIN (
+    SELECT lp.student_id, m.course_id, COUNT(*) AS done, MAX(lp.completed_at) AS last_at
+    FROM learning_lessonprogress lp
+    JOIN learning_lesson ls ON ls.id = lp.lesson_id
+    JOIN learning_module m ON m.id = ls.module_id
+    GROUP BY lp.student_id, m.course_id
+) p ON p.student_id = e2.student_id AND p.course_id = e2.course_id
+LEFT JOIN (
+    SELECT m.course_id, COUNT(*) AS total
+    FROM learning_lesson ls
+    JOIN learning_module m ON m.id = ls.module_id
+    GROUP BY m.course_id
+) l ON l.course_id = e2.course_id
+WHERE e.id = e2.id;
+
+UPDATE learning_enrollment SET
+    progress_percent = CASE WHEN total_lessons > 0
+        THEN LEAST(lessons_completed * 100 / total_lessons, 100) ELSE 0 END,
+    completed_at = CASE WHEN total_lessons > 0 AND lessons_completed >= total_lessons
+        THEN COALESCE(completed_at, last_activity_at, NOW()) ELSE NULL END;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0002_remove_course_audience_remove_course_published_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, help_text='Data da última lição concluída no curso.', null=True),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='lessons_completed',
+            field=models.PositiveIntegerField(default=0, help_text='Quantidade de lições do curso já concluídas pelo aluno.'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='progress_percent',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Percentual de conclusão do curso (0 a 100).'),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0, help_text='Quantidade total de lições do curso.'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
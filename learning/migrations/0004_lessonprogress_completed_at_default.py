@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0003_enrollment_progress_counters'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='lessonprogress',
+            name='completed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Data em que o aluno completou a lição.'),
+        ),
+    ]
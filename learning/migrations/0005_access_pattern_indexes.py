@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:36
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Tabelas grandes e quentes: os índices são criados com CONCURRENTLY (sem
+# bloquear as escritas), o que exige rodar fora de transação. O índice único
+# novo fica pronto antes de o unique_together antigo sair, para a tabela
+# nunca ficar sem a garantia de unicidade.
+# Com INCLUDE, o Django grava o UniqueConstraint como um índice único (e não
+# como constraint), então o SQL abaixo é o mesmo que o AddConstraint geraria.
+CREATE_PROGRESS_UNIQUE = (
+    "CREATE UNIQUE INDEX CONCURRENTLY progress_student_lesson_uniq "
+    "ON learning_lessonprogress (student_id, lesson_id) INCLUDE (completed_at)"
+)
+DROP_PROGRESS_UNIQUE = "DROP INDEX CONCURRENTLY IF EXISTS progress_student_lesson_uniq"
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_adminuser_guardianuser_superuseruser_and_more'),
+        ('learning', '0004_lessonprogress_completed_at_default'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_PROGRESS_UNIQUE, DROP_PROGRESS_UNIQUE),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='lessonprogress',
+                    constraint=models.UniqueConstraint(fields=('student', 'lesson'), include=('completed_at',), name='progress_student_lesson_uniq'),
+                ),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='lessonprogress',
+            unique_together=set(),
+        ),
+        AddIndexConcurrently(
+            model_name='enrollment',
+            index=models.Index(fields=['student', '-enrolled_at'], name='enrollment_student_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lessonprogress',
+            index=models.Index(fields=['student', '-completed_at'], name='progress_student_recent_idx'),
+        ),
+    ]
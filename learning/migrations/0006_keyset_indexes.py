@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:43
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY não bloqueia as escritas, mas não roda em transação
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0002_adminuser_guardianuser_superuseruser_and_more'),
+        ('learning', '0005_access_pattern_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='enrollment',
+            index=models.Index(fields=['-enrolled_at', '-id'], name='enrollment_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lessonprogress',
+            index=models.Index(fields=['-completed_at', '-id'], name='progress_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:46
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_adminuser_guardianuser_superuseruser_and_more'),
+        ('learning', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizQuestion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('public_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, help_text='ID público para ser usado em URLs e APIs.', unique=True)),
+                ('question_order', models.IntegerField(help_text='Ordem da questão dentro do quiz (1, 2, 3...).')),
+                ('kind', models.CharField(choices=[('single', 'Escolha única'), ('multiple', 'Múltipla escolha')], default='single', max_length=10)),
+                ('prompt', models.TextField(help_text='Enunciado da questão.')),
+                ('points', models.PositiveSmallIntegerField(default=1, help_text='Pontos atribuídos a quem acertar a questão.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('lesson', models.ForeignKey(help_text='Lição (do tipo Quiz) à qual esta questão pertence.', limit_choices_to={'lesson_type': 'quiz'}, on_delete=django.db.models.deletion.CASCADE, related_name='quiz_questions', to='learning.lesson')),
+            ],
+            options={
+                'verbose_name': 'Questão',
+                'verbose_name_plural': 'Questões',
+                'ordering': ['lesson', 'question_order'],
+                'unique_together': {('lesson', 'question_order')},
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizRevision',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('digest', models.CharField(help_text='Hash das questões, alternativas e gabarito.', max_length=40)),
+                ('question_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), help_text='IDs das questões, na ordem do quiz.', size=None)),
+                ('answer_key', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), help_text='Gabarito: bitmask das alternativas corretas de cada questão.', size=None)),
+                ('points', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveSmallIntegerField(), help_text='Pontos de cada questão.', size=None)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_revisions', to='learning.lesson')),
+            ],
+            options={
+                'verbose_name': 'Revisão de Quiz',
+                'verbose_name_plural': 'Revisões de Quiz',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('public_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, help_text='ID público para ser usado em URLs e APIs.', unique=True)),
+                ('answers', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), help_text='Alternativas marcadas em cada questão.', size=None)),
+                ('score', models.PositiveIntegerField(help_text='Pontos obtidos.')),
+                ('max_score', models.PositiveIntegerField(help_text='Pontos possíveis.')),
+                ('submitted_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Data de envio da tentativa.')),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to='learning.lesson')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to='accounts.student')),
+                ('revision', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attempts', to='learning.quizrevision')),
+            ],
+            options={
+                'verbose_name': 'Tentativa de Quiz',
+                'verbose_name_plural': 'Tentativas de Quiz',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizChoice',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('public_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, help_text='ID público para ser usado em URLs e APIs.', unique=True)),
+                ('choice_order', models.IntegerField(help_text='Ordem da alternativa dentro da questão (1, 2, 3...).')),
+                ('text', models.CharField(help_text='Texto da alternativa.', max_length=500)),
+                ('is_correct', models.BooleanField(default=False, help_text='Marca a alternativa como correta (gabarito).')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='choices', to='learning.quizquestion')),
+            ],
+            options={
+                'verbose_name': 'Alternativa',
+                'verbose_name_plural': 'Alternativas',
+                'ordering': ['question', 'choice_order'],
+                'unique_together': {('question', 'choice_order')},
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='quizrevision',
+            constraint=models.UniqueConstraint(fields=('lesson', 'digest'), name='quiz_revision_lesson_digest_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['lesson', 'revision'], name='quiz_attempt_lesson_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['student', 'lesson', '-submitted_at'], name='quiz_attempt_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['-submitted_at', '-id'], name='quiz_attempt_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:49
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0007_quiz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizItemStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='learning.quizquestion')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Tentativas que incluíam a questão.')),
+                ('answered', models.PositiveIntegerField(default=0, help_text='Tentativas em que a questão foi respondida.')),
+                ('correct', models.PositiveIntegerField(default=0, help_text='Tentativas em que a questão foi acertada.')),
+                ('score_sum', models.FloatField(default=0, help_text='Soma das notas.')),
+                ('score_sq_sum', models.FloatField(default=0, help_text='Soma dos quadrados das notas.')),
+                ('correct_score_sum', models.FloatField(default=0, help_text='Soma das notas das tentativas que acertaram a questão.')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_item_stats', to='learning.lesson')),
+            ],
+            options={
+                'verbose_name': 'Estatística de Questão',
+                'verbose_name_plural': 'Estatísticas de Questões',
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:51
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0008_quiz_item_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpeechChunk',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('text', models.TextField(help_text='Trecho (frase) sintetizado.')),
+                ('voice', models.CharField(max_length=50)),
+                ('rate', models.FloatField(help_text='Velocidade da fala (1.0 = normal).')),
+                ('audio', models.FileField(help_text='Arquivo de áudio no storage.', max_length=255, upload_to='')),
+                ('content_type', models.CharField(max_length=50)),
+                ('size', models.PositiveIntegerField(help_text='Tamanho do arquivo em bytes.')),
+                ('duration_ms', models.PositiveIntegerField(blank=True, help_text='Duração do áudio em milissegundos.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Trecho de Áudio',
+                'verbose_name_plural': 'Trechos de Áudio',
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonSpeech',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('voice', models.CharField(max_length=50)),
+                ('rate', models.FloatField()),
+                ('content_digest', models.CharField(help_text='Hash do conteúdo da lição usado na geração.', max_length=64)),
+                ('chunks', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), help_text='Digests dos trechos, em ordem.', size=None)),
+                ('rendered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='speech_tracks', to='learning.lesson')),
+            ],
+            options={
+                'verbose_name': 'Áudio de Lição',
+                'verbose_name_plural': 'Áudios de Lições',
+                'unique_together': {('lesson', 'voice', 'rate')},
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:52
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0009_lesson_speech'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubtitleCues',
+            fields=[
+                ('subtitle', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cues', serialize=False, to='learning.subtitle')),
+                ('source_url', models.URLField(help_text='URL do arquivo de onde as falas foram extraídas.', max_length=255)),
+                ('source_digest', models.CharField(help_text='Hash do arquivo processado.', max_length=64)),
+                ('starts_ms', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), help_text='Início de cada fala (ms), em ordem.', size=None)),
+                ('ends_ms', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), help_text='Fim de cada fala (ms).', size=None)),
+                ('texts', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), help_text='Texto de cada fala.', size=None)),
+                ('parsed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Falas da Legenda',
+                'verbose_name_plural': 'Falas das Legendas',
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Índices de trigramas (tolerância a erros de digitação nos títulos). O pg_trgm
+# é opcional: sem o pacote contrib no servidor, a busca funciona só com o
+# full-text e estes índices não são criados.
+TRIGRAM_INDEXES = {
+    "course_title_trgm_idx": "learning_course",
+    "lesson_title_trgm_idx": "learning_lesson",
+    "material_title_trgm_idx": "learning_material",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin (title gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0010_subtitle_cues'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='portuguese', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='portuguese', weight='A'), '||', django.contrib.postgres.search.SearchVector('content', config='portuguese', weight='B'), django.contrib.postgres.search.SearchConfig('portuguese')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='material',
+            name='search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('title', config='portuguese', weight='A'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='subtitlecues',
+            name='search',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search'], name='course_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search'], name='lesson_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='material',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search'], name='material_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subtitlecues',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search'], name='subtitle_cues_search_idx'),
+        ),
+        # Falas já processadas antes desta migração (o mesmo que a ingestão faz)
+        migrations.RunSQL(
+            "UPDATE learning_subtitlecues SET search = to_tsvector('portuguese', "
+            "regexp_replace(array_to_string(texts, ' '), '<[^>]+>', '', 'g'))",
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
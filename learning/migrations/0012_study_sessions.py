@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_adminuser_guardianuser_superuseruser_and_more'),
+        ('learning', '0011_full_text_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudySession',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('public_id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, help_text='ID público para ser usado em URLs e APIs.', unique=True)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ended_at', models.DateTimeField(blank=True, help_text='Vazio enquanto a sessão está aberta.', null=True)),
+                ('focus_seconds', models.PositiveIntegerField(default=0, help_text='Tempo em foco já gravado (s).')),
+                ('break_seconds', models.PositiveIntegerField(default=0, help_text='Tempo em pausa já gravado (s).')),
+                ('break_count', models.PositiveIntegerField(default=0, help_text='Número de pausas.')),
+                ('lesson', models.ForeignKey(blank=True, help_text='Lição estudada, se a sessão começou em uma.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='study_sessions', to='learning.lesson')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='study_sessions', to='accounts.student')),
+            ],
+            options={
+                'verbose_name': 'Sessão de Estudo',
+                'verbose_name_plural': 'Sessões de Estudo',
+            },
+        ),
+        migrations.CreateModel(
+            name='StudySegment',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('state', models.CharField(choices=[('focus', 'Foco'), ('break', 'Pausa')], max_length=10)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('heartbeats', models.PositiveIntegerField(default=1, help_text='Heartbeats agrupados neste trecho.')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segments', to='learning.studysession')),
+            ],
+            options={
+                'verbose_name': 'Trecho de Estudo',
+                'verbose_name_plural': 'Trechos de Estudo',
+                'ordering': ['session', 'started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudyDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField(help_text='Dia (no fuso do projeto).')),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('focus_seconds', models.PositiveIntegerField(default=0)),
+                ('break_seconds', models.PositiveIntegerField(default=0)),
+                ('break_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='study_days', to='accounts.student')),
+            ],
+            options={
+                'verbose_name': 'Tempo de Estudo Diário',
+                'verbose_name_plural': 'Tempos de Estudo Diários',
+                'constraints': [models.UniqueConstraint(fields=('student', 'day'), name='study_day_uniq')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['student', '-started_at'], name='study_student_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(fields=['-started_at', '-id'], name='study_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studysession',
+            index=models.Index(condition=models.Q(('ended_at__isnull', True)), fields=['started_at'], name='study_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studysegment',
+            index=models.Index(fields=['session', 'started_at'], name='study_segment_idx'),
+        ),
+    ]
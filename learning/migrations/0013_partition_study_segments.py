@@ -0,0 +1,65 @@
+# Troca learning_studysegment por uma tabela particionada por mês em
+# started_at (ver core/partitions.py). O estado do Django não muda: o modelo
+# continua o mesmo e o ORM não percebe a diferença.
+
+from django.db import migrations
+
+from core import partitions
+
+TABLE = "learning_studysegment"
+
+PARTITION_TABLE = """
+ALTER TABLE learning_studysegment RENAME TO learning_studysegment_old;
+ALTER TABLE learning_studysegment_old
+    DROP CONSTRAINT learning_studysegment_heartbeats_check;
+DROP INDEX study_segment_idx;
+
+CREATE TABLE learning_studysegment (
+    id bigint GENERATED BY DEFAULT AS IDENTITY,
+    state varchar(10) NOT NULL,
+    started_at timestamp with time zone NOT NULL,
+    ended_at timestamp with time zone NOT NULL,
+    heartbeats integer NOT NULL
+        CONSTRAINT learning_studysegment_heartbeats_check CHECK (heartbeats >= 0),
+    session_id bigint NOT NULL
+        REFERENCES learning_studysession (id) DEFERRABLE INITIALLY DEFERRED,
+    -- O PostgreSQL exige a coluna da partição em toda constraint única
+    PRIMARY KEY (id, started_at)
+) PARTITION BY RANGE (started_at);
+CREATE INDEX study_segment_idx ON learning_studysegment (session_id, started_at);
+CREATE TABLE learning_studysegment_default PARTITION OF learning_studysegment DEFAULT;
+
+INSERT INTO learning_studysegment (id, state, started_at, ended_at, heartbeats, session_id)
+    SELECT id, state, started_at, ended_at, heartbeats, session_id
+    FROM learning_studysegment_old;
+SELECT setval(
+    pg_get_serial_sequence('learning_studysegment', 'id'),
+    COALESCE((SELECT max(id) FROM learning_studysegment), 0) + 1,
+    false
+);
+DROP TABLE learning_studysegment_old;
+"""
+
+
+def create_partitions(apps, schema_editor):
+    # Mês anterior, atual e os 3 próximos; o comando "manage_partitions"
+    # mantém a janela andando. Linhas mais antigas ficam na partição default.
+    partitions.ensure_partitions(
+        TABLE,
+        "started_at",
+        months_ahead=3,
+        months_back=1,
+        using=schema_editor.connection.alias,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("learning", "0012_study_sessions"),
+    ]
+
+    operations = [
+        # Sem volta automática: a tabela particionada atende ao mesmo modelo
+        migrations.RunSQL(PARTITION_TABLE, migrations.RunSQL.noop),
+        migrations.RunPython(create_partitions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Views materializadas dos relatórios (learning/reports.py). O índice único
+# de cada uma é o que permite o REFRESH ... CONCURRENTLY. Atenção: enquanto
+# as views existirem, o PostgreSQL não deixa alterar o tipo das colunas que
+# elas leem; uma migração que precise disso deve recriá-las.
+COURSE_STATS = """
+CREATE MATERIALIZED VIEW learning_course_stats_mv AS
+SELECT
+    course.id AS course_id,
+    count(enrollment.id) AS enrollments,
+    count(enrollment.completed_at) AS completions,
+    coalesce(avg(enrollment.progress_percent), 0)::double precision AS average_progress,
+    percentile_cont(0.5) WITHIN GROUP (
+        ORDER BY extract(epoch FROM enrollment.completed_at - enrollment.enrolled_at)
+    ) AS median_seconds_to_complete,
+    max(enrollment.last_activity_at) AS last_activity_at,
+    now() AS refreshed_at
+FROM learning_course course
+LEFT JOIN learning_enrollment enrollment ON enrollment.course_id = course.id
+GROUP BY course.id;
+
+CREATE UNIQUE INDEX learning_course_stats_mv_pk ON learning_course_stats_mv (course_id);
+"""
+
+LESSON_FUNNEL = """
+CREATE MATERIALIZED VIEW learning_lesson_funnel_mv AS
+WITH enrolled AS (
+    SELECT course_id, count(*) AS total
+    FROM learning_enrollment
+    GROUP BY course_id
+), completions AS (
+    -- Só conta quem está matriculado no curso da lição
+    SELECT progress.lesson_id, count(*) AS total
+    FROM learning_lessonprogress progress
+    JOIN learning_lesson lesson ON lesson.id = progress.lesson_id
+    JOIN learning_module module ON module.id = lesson.module_id
+    JOIN learning_enrollment enrollment
+        ON enrollment.student_id = progress.student_id
+        AND enrollment.course_id = module.course_id
+    GROUP BY progress.lesson_id
+), ordered AS (
+    SELECT
+        lesson.id AS lesson_id,
+        module.course_id,
+        row_number() OVER (
+            PARTITION BY module.course_id
+            ORDER BY module.module_order, lesson.lesson_order
+        ) AS position,
+        coalesce(enrolled.total, 0) AS enrolled,
+        coalesce(completions.total, 0) AS completed
+    FROM learning_lesson lesson
+    JOIN learning_module module ON module.id = lesson.module_id
+    LEFT JOIN enrolled ON enrolled.course_id = module.course_id
+    LEFT JOIN completions ON completions.lesson_id = lesson.id
+)
+SELECT
+    lesson_id,
+    course_id,
+    position,
+    enrolled,
+    completed,
+    greatest(
+        coalesce(
+            lag(completed) OVER (PARTITION BY course_id ORDER BY position), enrolled
+        ) - completed,
+        0
+    ) AS drop_off,
+    now() AS refreshed_at
+FROM ordered;
+
+CREATE UNIQUE INDEX learning_lesson_funnel_mv_pk ON learning_lesson_funnel_mv (lesson_id);
+CREATE INDEX learning_lesson_funnel_mv_course ON learning_lesson_funnel_mv (course_id, position);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0013_partition_study_segments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseStats',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='stats', serialize=False, to='learning.course')),
+                ('enrollments', models.PositiveIntegerField(help_text='Matrículas.')),
+                ('completions', models.PositiveIntegerField(help_text='Matrículas concluídas.')),
+                ('average_progress', models.FloatField(help_text='Progresso médio (%).')),
+                ('median_seconds_to_complete', models.FloatField(help_text='Mediana do tempo entre matrícula e conclusão (s).', null=True)),
+                ('last_activity_at', models.DateTimeField(null=True)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Indicadores do Curso',
+                'verbose_name_plural': 'Indicadores dos Cursos',
+                'db_table': 'learning_course_stats_mv',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='LessonFunnel',
+            fields=[
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='funnel', serialize=False, to='learning.lesson')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='lesson_funnel', to='learning.course')),
+                ('position', models.PositiveIntegerField(help_text='Posição da lição no curso.')),
+                ('enrolled', models.PositiveIntegerField(help_text='Matrículas no curso.')),
+                ('completed', models.PositiveIntegerField(help_text='Matriculados que concluíram a lição.')),
+                ('drop_off', models.PositiveIntegerField(help_text='Concluíram a lição anterior (ou se matricularam) e não esta.')),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Funil de Lições',
+                'verbose_name_plural': 'Funis de Lições',
+                'db_table': 'learning_lesson_funnel_mv',
+                'ordering': ['course', 'position'],
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(
+            COURSE_STATS, "DROP MATERIALIZED VIEW learning_course_stats_mv"
+        ),
+        migrations.RunSQL(
+            LESSON_FUNNEL, "DROP MATERIALIZED VIEW learning_lesson_funnel_mv"
+        ),
+    ]
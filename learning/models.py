@@ -1,8 +1,29 @@
 import uuid
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.conf import settings  # Boa prática para referenciar o AUTH_USER_MODEL
+from django.utils import timezone
 from accounts.models import Student
 
+# Configuração de idioma da busca textual do PostgreSQL (stemming e stopwords)
+SEARCH_CONFIG = "portuguese"
+
+
+def search_vector(*weighted_fields):
+    # Expressão tsvector para um GeneratedField, ex.:
+    #   search_vector(("title", "A"), ("description", "B"))
+    # O config explícito deixa to_tsvector IMMUTABLE, como a coluna gerada exige.
+    vectors = [
+        SearchVector(name, config=SEARCH_CONFIG, weight=weight)
+        for name, weight in weighted_fields
+    ]
+    expression = vectors[0]
+    for vector in vectors[1:]:
+        expression = expression + vector
+    return expression
+
 
 # ENUM tipo de aula
 class LessonTypeChoices(models.TextChoices):
@@ -31,12 +52,19 @@ class Course(models.Model):
         blank=True,
         help_text="URL para a imagem de capa (thumbnail).",
     )
+    # Mantido pelo próprio PostgreSQL (coluna gerada); ver learning/search.py
+    search = models.GeneratedField(
+        expression=search_vector(("title", "A"), ("description", "B")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Curso"
         verbose_name_plural = "Cursos"
+        indexes = [GinIndex(fields=["search"], name="course_search_idx")]
 
     def __str__(self):
         return self.title
@@ -119,6 +147,11 @@ class Lesson(models.Model):
         blank=True,
         help_text="Duração (em segundos) do vídeo ou tempo de leitura.",
     )
+    search = models.GeneratedField(
+        expression=search_vector(("title", "A"), ("content", "B")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -130,6 +163,7 @@ class Lesson(models.Model):
             "lesson_order",
         )  # Garante que a ordem (lesson_order) seja única PARA CADA módulo
         ordering = ["module", "lesson_order"]  # Ordena as lições por padrão
+        indexes = [GinIndex(fields=["search"], name="lesson_search_idx")]
 
     def __str__(self):
         return f"{self.module.title} - Aula {self.lesson_order}: {self.title}"
@@ -161,6 +195,19 @@ class Enrollment(models.Model):
     completed_at = models.DateTimeField(
         null=True, blank=True, help_text="Data em que o aluno completou o curso."
     )
+    # Contadores desnormalizados, mantidos por learning/progress.py (via signals)
+    lessons_completed = models.PositiveIntegerField(
+        default=0, help_text="Quantidade de lições do curso já concluídas pelo aluno."
+    )
+    total_lessons = models.PositiveIntegerField(
+        default=0, help_text="Quantidade total de lições do curso."
+    )
+    progress_percent = models.PositiveSmallIntegerField(
+        default=0, help_text="Percentual de conclusão do curso (0 a 100)."
+    )
+    last_activity_at = models.DateTimeField(
+        null=True, blank=True, help_text="Data da última lição concluída no curso."
+    )
 
     class Meta:
         verbose_name = "Matrícula"
@@ -169,6 +216,14 @@ class Enrollment(models.Model):
             "student",
             "course",
         )  # Garante que um aluno só possa se matricular UMA VEZ em cada curso
+        indexes = [
+            # Matrículas do aluno, da mais recente para a mais antiga (dashboards)
+            models.Index(
+                fields=["student", "-enrolled_at"], name="enrollment_student_recent_idx"
+            ),
+            # Chave da paginação do admin (keyset_ordering em learning/admin.py)
+            models.Index(fields=["-enrolled_at", "-id"], name="enrollment_recent_idx"),
+        ]
 
     def __str__(self):
         return f"Aluno {self.student.nickname} matriculado em {self.course.title}"
@@ -194,17 +249,34 @@ class LessonProgress(models.Model):
         on_delete=models.CASCADE,
         related_name="progress_records",  # Permite fazer lesson.progress_records.all()
     )
+    # default (e não auto_now_add) para aceitar o horário informado pelo player
     completed_at = models.DateTimeField(
-        auto_now_add=True, help_text="Data em que o aluno completou a lição."
+        default=timezone.now,
+        editable=False,
+        help_text="Data em que o aluno completou a lição.",
     )
 
     class Meta:
         verbose_name = "Progresso de Lição"
         verbose_name_plural = "Progressos de Lições"
-        unique_together = (
-            "student",
-            "lesson",
-        )  # Garante que um aluno só possa completar cada lição UMA VEZ
+        constraints = [
+            # Garante que um aluno só possa completar cada lição UMA VEZ.
+            # O INCLUDE torna o índice único também de cobertura: "quais lições
+            # (e quando) o aluno concluiu" sai só do índice (index-only scan).
+            models.UniqueConstraint(
+                fields=["student", "lesson"],
+                include=["completed_at"],
+                name="progress_student_lesson_uniq",
+            ),
+        ]
+        indexes = [
+            # Atividade recente do aluno (última lição concluída)
+            models.Index(
+                fields=["student", "-completed_at"], name="progress_student_recent_idx"
+            ),
+            # Chave da paginação do admin (keyset_ordering em learning/admin.py)
+            models.Index(fields=["-completed_at", "-id"], name="progress_recent_idx"),
+        ]
 
     def __str__(self):
         return f"Progresso: {self.student.nickname} completou {self.lesson.title}"
@@ -239,6 +311,11 @@ class Material(models.Model):
         blank=True,
         help_text="Tipo do arquivo (ex: 'pdf', 'zip').",
     )
+    search = models.GeneratedField(
+        expression=search_vector(("title", "A")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -246,6 +323,7 @@ class Material(models.Model):
         verbose_name = "Material de Apoio"
         verbose_name_plural = "Materiais de Apoio"
         ordering = ["created_at"]  # Ordena os materiais pelo mais antigo
+        indexes = [GinIndex(fields=["search"], name="material_search_idx")]
 
     def __str__(self):
         return f"{self.title} (Lição: {self.lesson.title})"
@@ -285,3 +363,529 @@ class Subtitle(models.Model):
 
     def __str__(self):
         return f"Legenda {self.language_code} para {self.lesson.title}"
+
+
+# --- Quiz (lições do tipo Quiz) ---
+# As questões são cadastradas de forma estruturada e compiladas em uma
+# QuizRevision (gabarito compacto e imutável); ver learning/quiz.py.
+
+
+# ENUM tipo de questão
+class QuestionKindChoices(models.TextChoices):
+    SINGLE = "single", "Escolha única"
+    MULTIPLE = "multiple", "Múltipla escolha"  # Todas as corretas devem ser marcadas
+
+
+# Modelo: questões do quiz
+class QuizQuestion(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    public_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        db_index=True,
+        help_text="ID público para ser usado em URLs e APIs.",
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name="quiz_questions",  # Permite fazer lesson.quiz_questions.all()
+        limit_choices_to={"lesson_type": LessonTypeChoices.QUIZ},
+        help_text="Lição (do tipo Quiz) à qual esta questão pertence.",
+    )
+    question_order = models.IntegerField(
+        help_text="Ordem da questão dentro do quiz (1, 2, 3...)."
+    )
+    kind = models.CharField(
+        max_length=10,
+        choices=QuestionKindChoices.choices,
+        default=QuestionKindChoices.SINGLE,
+    )
+    prompt = models.TextField(help_text="Enunciado da questão.")
+    points = models.PositiveSmallIntegerField(
+        default=1, help_text="Pontos atribuídos a quem acertar a questão."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Questão"
+        verbose_name_plural = "Questões"
+        unique_together = ("lesson", "question_order")
+        ordering = ["lesson", "question_order"]
+
+    def __str__(self):
+        return f"Questão {self.question_order}: {self.prompt[:60]}"
+
+
+# Modelo: alternativas de uma questão
+class QuizChoice(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    public_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        db_index=True,
+        help_text="ID público para ser usado em URLs e APIs.",
+    )
+    question = models.ForeignKey(
+        QuizQuestion,
+        on_delete=models.CASCADE,
+        related_name="choices",  # Permite fazer question.choices.all()
+    )
+    choice_order = models.IntegerField(
+        help_text="Ordem da alternativa dentro da questão (1, 2, 3...)."
+    )
+    text = models.CharField(max_length=500, help_text="Texto da alternativa.")
+    is_correct = models.BooleanField(
+        default=False, help_text="Marca a alternativa como correta (gabarito)."
+    )
+
+    class Meta:
+        verbose_name = "Alternativa"
+        verbose_name_plural = "Alternativas"
+        unique_together = ("question", "choice_order")
+        ordering = ["question", "choice_order"]
+
+    def __str__(self):
+        return self.text
+
+
+# Modelo: revisão compilada do quiz. Cada versão do gabarito gera uma linha
+# nova (identificada pelo digest), e as tentativas apontam para a revisão
+# com que foram corrigidas. Os arrays são paralelos: posição i = questão i.
+class QuizRevision(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name="quiz_revisions",
+    )
+    digest = models.CharField(
+        max_length=40, help_text="Hash das questões, alternativas e gabarito."
+    )
+    question_ids = ArrayField(
+        models.BigIntegerField(), help_text="IDs das questões, na ordem do quiz."
+    )
+    answer_key = ArrayField(
+        models.IntegerField(),
+        help_text="Gabarito: bitmask das alternativas corretas de cada questão.",
+    )
+    points = ArrayField(
+        models.PositiveSmallIntegerField(), help_text="Pontos de cada questão."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Revisão de Quiz"
+        verbose_name_plural = "Revisões de Quiz"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["lesson", "digest"], name="quiz_revision_lesson_digest_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Revisão {self.digest[:8]} do quiz {self.lesson.title}"
+
+
+# Modelo: tentativas de quiz dos alunos
+class QuizAttempt(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    public_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        db_index=True,
+        help_text="ID público para ser usado em URLs e APIs.",
+    )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="quiz_attempts",  # Permite fazer student.quiz_attempts.all()
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name="quiz_attempts",  # Permite fazer lesson.quiz_attempts.all()
+    )
+    revision = models.ForeignKey(
+        QuizRevision,
+        on_delete=models.PROTECT,  # Tentativas corrigidas não perdem o gabarito
+        related_name="attempts",
+    )
+    # Uma posição por questão da revisão: bitmask das alternativas marcadas
+    # (0 = em branco). Compacto e corrigido por comparação com o answer_key.
+    answers = ArrayField(
+        models.IntegerField(), help_text="Alternativas marcadas em cada questão."
+    )
+    score = models.PositiveIntegerField(help_text="Pontos obtidos.")
+    max_score = models.PositiveIntegerField(help_text="Pontos possíveis.")
+    submitted_at = models.DateTimeField(
+        default=timezone.now, editable=False, help_text="Data de envio da tentativa."
+    )
+
+    class Meta:
+        verbose_name = "Tentativa de Quiz"
+        verbose_name_plural = "Tentativas de Quiz"
+        indexes = [
+            # Tentativas da turma em um quiz (correção em lote e estatísticas)
+            models.Index(fields=["lesson", "revision"], name="quiz_attempt_lesson_idx"),
+            models.Index(
+                fields=["student", "lesson", "-submitted_at"],
+                name="quiz_attempt_student_idx",
+            ),
+            # Chave da paginação do admin (keyset_ordering em learning/admin.py)
+            models.Index(fields=["-submitted_at", "-id"], name="quiz_attempt_recent_idx"),
+        ]
+
+    def __str__(self):
+        return f"Tentativa de {self.student.nickname} em {self.lesson.title}"
+
+
+# Modelo: estatísticas acumuladas de cada questão (dificuldade e
+# discriminação). Guarda só somas, atualizadas a cada tentativa por
+# learning/quiz_stats.py e recalculadas do zero pelo comando
+# "rebuild_quiz_stats". As notas entram como fração (0 a 1) da pontuação
+# máxima, para somar tentativas de revisões diferentes.
+class QuizItemStats(models.Model):
+    question = models.OneToOneField(
+        QuizQuestion,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name="quiz_item_stats",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, help_text="Tentativas que incluíam a questão."
+    )
+    answered = models.PositiveIntegerField(
+        default=0, help_text="Tentativas em que a questão foi respondida."
+    )
+    correct = models.PositiveIntegerField(
+        default=0, help_text="Tentativas em que a questão foi acertada."
+    )
+    score_sum = models.FloatField(default=0, help_text="Soma das notas.")
+    score_sq_sum = models.FloatField(default=0, help_text="Soma dos quadrados das notas.")
+    correct_score_sum = models.FloatField(
+        default=0, help_text="Soma das notas das tentativas que acertaram a questão."
+    )
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Estatística de Questão"
+        verbose_name_plural = "Estatísticas de Questões"
+
+    def __str__(self):
+        return f"Estatísticas da questão {self.question_id}"
+
+    @property
+    def difficulty(self):
+        # Índice de dificuldade (p-value): fração de acertos. Baixo = difícil.
+        return self.correct / self.attempts if self.attempts else None
+
+    @property
+    def discrimination(self):
+        # Correlação ponto-bisserial entre acertar a questão e a nota total
+        n, c = self.attempts, self.correct
+        if not n or c in (0, n):
+            return None
+        mean = self.score_sum / n
+        variance = self.score_sq_sum / n - mean * mean
+        if variance <= 1e-12:
+            return None
+        mean_correct = self.correct_score_sum / c
+        mean_wrong = (self.score_sum - self.correct_score_sum) / (n - c)
+        p = c / n
+        return (mean_correct - mean_wrong) / variance**0.5 * (p * (1 - p)) ** 0.5
+
+
+# --- Áudio (TTS) das lições de texto (ver learning/tts.py) ---
+
+
+# Modelo: trecho de áudio sintetizado, endereçado pelo conteúdo. O digest é o
+# hash de (texto, voz, velocidade, motor): o mesmo trecho nunca é sintetizado
+# duas vezes, nem entre lições diferentes.
+class SpeechChunk(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    digest = models.CharField(max_length=64, unique=True)
+    text = models.TextField(help_text="Trecho (frase) sintetizado.")
+    voice = models.CharField(max_length=50)
+    rate = models.FloatField(help_text="Velocidade da fala (1.0 = normal).")
+    audio = models.FileField(max_length=255, help_text="Arquivo de áudio no storage.")
+    content_type = models.CharField(max_length=50)
+    size = models.PositiveIntegerField(help_text="Tamanho do arquivo em bytes.")
+    duration_ms = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Duração do áudio em milissegundos."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Trecho de Áudio"
+        verbose_name_plural = "Trechos de Áudio"
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.voice}, {self.rate}x)"
+
+
+# Modelo: áudio de uma lição de texto, como a lista ordenada dos trechos
+class LessonSpeech(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.CASCADE,
+        related_name="speech_tracks",  # Permite fazer lesson.speech_tracks.all()
+    )
+    voice = models.CharField(max_length=50)
+    rate = models.FloatField()
+    content_digest = models.CharField(
+        max_length=64, help_text="Hash do conteúdo da lição usado na geração."
+    )
+    chunks = ArrayField(
+        models.CharField(max_length=64), help_text="Digests dos trechos, em ordem."
+    )
+    rendered_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Áudio de Lição"
+        verbose_name_plural = "Áudios de Lições"
+        unique_together = ("lesson", "voice", "rate")
+
+    def __str__(self):
+        return f"Áudio de {self.lesson.title} ({self.voice}, {self.rate}x)"
+
+
+# Modelo: falas (cues) de uma legenda, extraídas uma única vez do arquivo
+# .vtt/.srt (ver learning/subtitles.py). Guardadas como arrays paralelos
+# ordenados pelo início: buscar "a fala no instante t" é uma busca binária.
+class SubtitleCues(models.Model):
+    subtitle = models.OneToOneField(
+        Subtitle,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="cues",
+    )
+    source_url = models.URLField(
+        max_length=255, help_text="URL do arquivo de onde as falas foram extraídas."
+    )
+    source_digest = models.CharField(
+        max_length=64, help_text="Hash do arquivo processado."
+    )
+    starts_ms = ArrayField(
+        models.IntegerField(), help_text="Início de cada fala (ms), em ordem."
+    )
+    ends_ms = ArrayField(models.IntegerField(), help_text="Fim de cada fala (ms).")
+    texts = ArrayField(models.TextField(), help_text="Texto de cada fala.")
+    # Preenchido por learning/subtitles.py a cada ingestão (array_to_string não
+    # é IMMUTABLE, então não dá para ser uma coluna gerada)
+    search = SearchVectorField(null=True, editable=False)
+    parsed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Falas da Legenda"
+        verbose_name_plural = "Falas das Legendas"
+        indexes = [GinIndex(fields=["search"], name="subtitle_cues_search_idx")]
+
+    def __str__(self):
+        return f"{len(self.starts_ms)} falas da legenda {self.subtitle_id}"
+
+
+# ENUM estado do aluno durante o estudo (RF026: pausas)
+class StudyStateChoices(models.TextChoices):
+    FOCUS = "focus", "Foco"
+    BREAK = "break", "Pausa"
+
+
+# Modelo: sessão de estudo, alimentada pelos heartbeats do player
+# (ver learning/study.py). Os totais são somados a cada trecho gravado.
+class StudySession(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    public_id = models.UUIDField(
+        default=uuid.uuid4,
+        editable=False,
+        unique=True,
+        db_index=True,
+        help_text="ID público para ser usado em URLs e APIs.",
+    )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name="study_sessions",  # Permite fazer student.study_sessions.all()
+    )
+    lesson = models.ForeignKey(
+        Lesson,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="study_sessions",
+        help_text="Lição estudada, se a sessão começou em uma.",
+    )
+    started_at = models.DateTimeField(default=timezone.now)
+    ended_at = models.DateTimeField(
+        null=True, blank=True, help_text="Vazio enquanto a sessão está aberta."
+    )
+    focus_seconds = models.PositiveIntegerField(
+        default=0, help_text="Tempo em foco já gravado (s)."
+    )
+    break_seconds = models.PositiveIntegerField(
+        default=0, help_text="Tempo em pausa já gravado (s)."
+    )
+    break_count = models.PositiveIntegerField(default=0, help_text="Número de pausas.")
+
+    class Meta:
+        verbose_name = "Sessão de Estudo"
+        verbose_name_plural = "Sessões de Estudo"
+        indexes = [
+            models.Index(fields=["student", "-started_at"], name="study_student_recent_idx"),
+            # Chave da paginação do admin
+            models.Index(fields=["-started_at", "-id"], name="study_recent_idx"),
+            # Sessões abertas, varridas pelo comando "flush_study_sessions"
+            models.Index(
+                fields=["started_at"],
+                condition=models.Q(ended_at__isnull=True),
+                name="study_open_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Sessão de {self.student.nickname} em {self.started_at:%d/%m/%Y %H:%M}"
+
+
+# Modelo: trecho contínuo de foco ou pausa dentro de uma sessão. Um trecho
+# junta todos os heartbeats seguidos no mesmo estado (uma linha por trecho,
+# não por heartbeat).
+class StudySegment(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    session = models.ForeignKey(
+        StudySession, on_delete=models.CASCADE, related_name="segments"
+    )
+    state = models.CharField(max_length=10, choices=StudyStateChoices.choices)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    heartbeats = models.PositiveIntegerField(
+        default=1, help_text="Heartbeats agrupados neste trecho."
+    )
+
+    class Meta:
+        verbose_name = "Trecho de Estudo"
+        verbose_name_plural = "Trechos de Estudo"
+        ordering = ["session", "started_at"]
+        indexes = [
+            models.Index(fields=["session", "started_at"], name="study_segment_idx"),
+        ]
+
+    @property
+    def seconds(self):
+        return int((self.ended_at - self.started_at).total_seconds())
+
+    def __str__(self):
+        return f"{self.get_state_display()} de {self.seconds}s"
+
+
+# Modelo: tempo de estudo do aluno por dia (pré-agregado a partir dos
+# trechos), lido pelos relatórios dos responsáveis
+class StudyDailyRollup(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="study_days"
+    )
+    day = models.DateField(help_text="Dia (no fuso do projeto).")
+    sessions = models.PositiveIntegerField(default=0)
+    focus_seconds = models.PositiveIntegerField(default=0)
+    break_seconds = models.PositiveIntegerField(default=0)
+    break_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Tempo de Estudo Diário"
+        verbose_name_plural = "Tempos de Estudo Diários"
+        constraints = [
+            models.UniqueConstraint(fields=["student", "day"], name="study_day_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.student.nickname} em {self.day:%d/%m/%Y}"
+
+
+# --- Relatórios (views materializadas; ver learning/reports.py) ---
+# Modelos só de leitura: as views são criadas pelas migrações e atualizadas
+# pelo comando "refresh_reports". Os dados ficam tão atuais quanto o último
+# refresh (refreshed_at).
+
+
+# Modelo: indicadores por curso
+class CourseStats(models.Model):
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        related_name="stats",
+    )
+    enrollments = models.PositiveIntegerField(help_text="Matrículas.")
+    completions = models.PositiveIntegerField(help_text="Matrículas concluídas.")
+    average_progress = models.FloatField(help_text="Progresso médio (%).")
+    median_seconds_to_complete = models.FloatField(
+        null=True, help_text="Mediana do tempo entre matrícula e conclusão (s)."
+    )
+    last_activity_at = models.DateTimeField(null=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "learning_course_stats_mv"
+        verbose_name = "Indicadores do Curso"
+        verbose_name_plural = "Indicadores dos Cursos"
+
+    @property
+    def completion_rate(self):
+        return self.completions / self.enrollments if self.enrollments else None
+
+    @property
+    def median_days_to_complete(self):
+        if self.median_seconds_to_complete is None:
+            return None
+        return self.median_seconds_to_complete / 86400
+
+    def __str__(self):
+        return f"Indicadores de {self.course.title}"
+
+
+# Modelo: funil de lições do curso (quantos matriculados concluíram cada
+# lição e quantos se perderam desde a anterior)
+class LessonFunnel(models.Model):
+    lesson = models.OneToOneField(
+        Lesson,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        related_name="funnel",
+    )
+    course = models.ForeignKey(
+        Course, on_delete=models.DO_NOTHING, related_name="lesson_funnel"
+    )
+    position = models.PositiveIntegerField(help_text="Posição da lição no curso.")
+    enrolled = models.PositiveIntegerField(help_text="Matrículas no curso.")
+    completed = models.PositiveIntegerField(
+        help_text="Matriculados que concluíram a lição."
+    )
+    drop_off = models.PositiveIntegerField(
+        help_text="Concluíram a lição anterior (ou se matricularam) e não esta."
+    )
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "learning_lesson_funnel_mv"
+        ordering = ["course", "position"]
+        verbose_name = "Funil de Lições"
+        verbose_name_plural = "Funis de Lições"
+
+    @property
+    def completion_rate(self):
+        return self.completed / self.enrolled if self.enrolled else None
+
+    def __str__(self):
+        return f"Funil da lição {self.lesson_id}"
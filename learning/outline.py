@@ -0,0 +1,165 @@
+# Em /learning/outline.py
+#
+# Árvore ordenada Curso -> Módulos -> Lições (com materiais e legendas),
+# carregada em número constante de queries e guardada no cache compartilhado
+# (core/caching.py). A entrada depende da tag do curso, que é invalidada a cada
+# edição (ver learning/signals.py). Num curso popular, só um worker recalcula
+# a árvore quando ela fica velha; os outros servem a anterior enquanto isso.
+
+from collections import defaultdict
+
+from core.caching import aget_or_compute, get_or_compute, invalidate_tags
+from core.routers import primary
+
+from .models import Course, Lesson, Material, Module, Subtitle
+
+# Mude quando o formato serializado mudar, para descartar o cache antigo
+OUTLINE_FORMAT = 1
+OUTLINE_TIMEOUT = 60 * 60 * 24  # A invalidação é explícita; o timeout é só um teto
+
+
+def _outline_key(public_id):
+    return f"learning:outline:{OUTLINE_FORMAT}:{public_id}"
+
+
+def _outline_tag(public_id):
+    return f"learning:outline:{public_id}"
+
+
+def _outline_querysets(course):
+    # As 4 queries da árvore: módulos, lições, materiais e legendas
+    return (
+        Module.objects.filter(course=course)
+        .order_by("module_order")
+        .values("id", "public_id", "title", "module_order"),
+        Lesson.objects.filter(module__course=course)
+        .order_by("module__module_order", "lesson_order")
+        .values(
+            "id",
+            "module_id",
+            "public_id",
+            "title",
+            "lesson_order",
+            "lesson_type",
+            "duration_in_seconds",
+            "video_url",
+        ),
+        Material.objects.filter(lesson__module__course=course)
+        .order_by("created_at")
+        .values("lesson_id", "public_id", "title", "file_url", "file_type"),
+        Subtitle.objects.filter(lesson__module__course=course)
+        .order_by("language_code")
+        .values("lesson_id", "public_id", "language_code", "file_url"),
+    )
+
+
+def _assemble_outline(course, modules, lessons, materials, subtitles):
+    materials_by_lesson = defaultdict(list)
+    for material in materials:
+        materials_by_lesson[material.pop("lesson_id")].append(
+            {**material, "public_id": str(material["public_id"])}
+        )
+    subtitles_by_lesson = defaultdict(list)
+    for subtitle in subtitles:
+        subtitles_by_lesson[subtitle.pop("lesson_id")].append(
+            {**subtitle, "public_id": str(subtitle["public_id"])}
+        )
+
+    lessons_by_module = defaultdict(list)
+    for lesson in lessons:
+        lesson_id = lesson.pop("id")
+        lessons_by_module[lesson.pop("module_id")].append(
+            {
+                "public_id": str(lesson["public_id"]),
+                "title": lesson["title"],
+                "order": lesson["lesson_order"],
+                "type": lesson["lesson_type"],
+                "duration": lesson["duration_in_seconds"],
+                "video_url": lesson["video_url"],
+                "materials": materials_by_lesson.get(lesson_id, []),
+                "subtitles": subtitles_by_lesson.get(lesson_id, []),
+            }
+        )
+
+    return {
+        "public_id": str(course.public_id),
+        "title": course.title,
+        "description": course.description,
+        "thumbnail_url": course.thumbnail_url,
+        "total_lessons": len(lessons),
+        "modules": [
+            {
+                "public_id": str(module["public_id"]),
+                "title": module["title"],
+                "order": module["module_order"],
+                "lessons": lessons_by_module.get(module["id"], []),
+            }
+            for module in modules
+        ],
+    }
+
+
+def build_course_outline(course):
+    # 4 queries, independente do tamanho do curso (+1 se vier um public_id)
+    if not isinstance(course, Course):
+        course = Course.objects.get(public_id=course)
+    return _assemble_outline(
+        course, *(list(queryset) for queryset in _outline_querysets(course))
+    )
+
+
+async def abuild_course_outline(course):
+    # Versão assíncrona (mesmas queries), para as views de learning/api.py
+    if not isinstance(course, Course):
+        course = await Course.objects.aget(public_id=course)
+    rows = []
+    for queryset in _outline_querysets(course):
+        rows.append([row async for row in queryset.aiterator()])
+    return _assemble_outline(course, *rows)
+
+
+def get_course_outline(public_id):
+    # Levanta Course.DoesNotExist se o curso não existir
+    public_id = str(public_id)
+
+    def compute():
+        # Do primário: uma réplica atrasada recolocaria a versão antiga
+        with primary():
+            return build_course_outline(public_id)
+
+    return get_or_compute(
+        _outline_key(public_id),
+        compute,
+        OUTLINE_TIMEOUT,
+        tags=(_outline_tag(public_id),),
+    )
+
+
+async def aget_course_outline(public_id):
+    # Como get_course_outline, mas sem bloquear o event loop
+    public_id = str(public_id)
+
+    async def compute():
+        with primary():
+            return await abuild_course_outline(public_id)
+
+    return await aget_or_compute(
+        _outline_key(public_id),
+        compute,
+        OUTLINE_TIMEOUT,
+        tags=(_outline_tag(public_id),),
+    )
+
+
+def invalidate_course_outline(public_id):
+    # Vale depois do commit (ver core.caching.invalidate_tags)
+    invalidate_tags(_outline_tag(str(public_id)))
+
+
+def invalidate_outline_for(**lookup):
+    # Ex.: invalidate_outline_for(modules=module_id) ou
+    # invalidate_outline_for(modules__lessons=lesson_id)
+    for public_id in Course.objects.filter(**lookup).values_list(
+        "public_id", flat=True
+    ):
+        invalidate_course_outline(public_id)
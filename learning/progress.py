@@ -0,0 +1,221 @@
+# Em /learning/progress.py
+#
+# Mantém os contadores desnormalizados de progresso em Enrollment
+# (lessons_completed, total_lessons, progress_percent, last_activity_at e
+# completed_at). As atualizações incrementais são feitas com expressões F()
+# direto no banco, então não dependem da instância carregada em memória.
+
+from django.db.models import (
+    Case,
+    Count,
+    DateTimeField,
+    Exists,
+    F,
+    Max,
+    OuterRef,
+    PositiveSmallIntegerField,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, JSONObject, Least, Now
+
+from .models import Enrollment, Lesson, LessonProgress
+
+# Campos de Enrollment mantidos por este módulo
+PROGRESS_FIELDS = (
+    "lessons_completed",
+    "total_lessons",
+    "progress_percent",
+    "last_activity_at",
+    "completed_at",
+)
+
+
+def live_counts():
+    # Expressões que recalculam os contadores a partir das tabelas reais.
+    # Podem ser usadas tanto em .update() quanto em .annotate().
+    progress = (
+        LessonProgress.objects.filter(
+            student_id=OuterRef("student_id"),
+            lesson__module__course_id=OuterRef("course_id"),
+        )
+        .order_by()
+        .values("student_id")
+    )
+    lessons = (
+        Lesson.objects.filter(module__course_id=OuterRef("course_id"))
+        .order_by()
+        .values("module__course_id")
+    )
+    return {
+        "lessons_completed": Coalesce(
+            Subquery(progress.annotate(n=Count("id")).values("n")), 0
+        ),
+        "total_lessons": Coalesce(
+            Subquery(lessons.annotate(n=Count("id")).values("n")), 0
+        ),
+        "last_activity_at": Subquery(
+            progress.annotate(last=Max("completed_at")).values("last")
+        ),
+    }
+
+
+def _derived_fields():
+    # Percentual e data de conclusão dependem apenas dos contadores já gravados
+    return {
+        "progress_percent": Case(
+            When(
+                total_lessons__gt=0,
+                then=Least(F("lessons_completed") * 100 / F("total_lessons"), 100),
+            ),
+            default=Value(0),
+            output_field=PositiveSmallIntegerField(),
+        ),
+        "completed_at": Case(
+            When(
+                total_lessons__gt=0,
+                lessons_completed__gte=F("total_lessons"),
+                then=Coalesce(F("completed_at"), F("last_activity_at"), Now()),
+            ),
+            default=Value(None),
+            output_field=DateTimeField(),
+        ),
+    }
+
+
+def refresh_enrollments(queryset):
+    # Recalcula do zero os contadores das matrículas do queryset.
+    # São dois UPDATEs porque o percentual depende dos contadores novos.
+    queryset.update(**live_counts())
+    return queryset.update(**_derived_fields())
+
+
+async def arefresh_enrollments(queryset):
+    await queryset.aupdate(**live_counts())
+    return await queryset.aupdate(**_derived_fields())
+
+
+def enrollments_for_lesson(student_id, lesson_id):
+    return Enrollment.objects.filter(
+        student_id=student_id, course__modules__lessons=lesson_id
+    )
+
+
+def lesson_completed(student_id, lesson_id, completed_at):
+    # Uma nova LessonProgress: +1 lição concluída na matrícula correspondente
+    enrollments = enrollments_for_lesson(student_id, lesson_id)
+    enrollments.update(
+        lessons_completed=F("lessons_completed") + 1,
+        last_activity_at=Greatest(F("last_activity_at"), Value(completed_at)),
+    )
+    enrollments.update(**_derived_fields())
+
+
+def lesson_uncompleted(student_id, lesson_id):
+    # Remoções são raras; recalcular garante também o last_activity_at
+    refresh_enrollments(enrollments_for_lesson(student_id, lesson_id))
+
+
+def lessons_added(module_id, count=1):
+    enrollments = Enrollment.objects.filter(course__modules=module_id)
+    enrollments.update(total_lessons=F("total_lessons") + count)
+    enrollments.update(**_derived_fields())
+
+
+def lessons_removed(module_id, count=1):
+    enrollments = Enrollment.objects.filter(course__modules=module_id)
+    enrollments.update(total_lessons=Greatest(F("total_lessons") - count, 0))
+    enrollments.update(**_derived_fields())
+
+
+def lesson_moved(old_module_id, new_module_id):
+    # Lição trocou de módulo (possivelmente de curso): recalcula os dois cursos
+    refresh_enrollments(
+        Enrollment.objects.filter(course__modules__in=[old_module_id, new_module_id])
+    )
+
+
+# --- "Continuar de onde parou" ---
+
+
+def next_lesson_subquery():
+    # Para cada matrícula (OuterRef), a primeira lição do curso, na ordem de
+    # módulos e lições, que o aluno ainda não concluiu, como um objeto JSON
+    # {"public_id", "title"}. É uma subquery correlacionada (um SubPlan no
+    # EXPLAIN) com LIMIT 1, executada uma vez por matrícula e percorrendo os
+    # índices únicos (course, module_order), (module, lesson_order) e
+    # (student, lesson). None quando o curso está concluído (ou vazio).
+    completed = LessonProgress.objects.filter(
+        student_id=OuterRef(OuterRef("student_id")), lesson_id=OuterRef("pk")
+    )
+    return Subquery(
+        Lesson.objects.filter(module__course_id=OuterRef("course_id"))
+        .exclude(Exists(completed))
+        .order_by("module__module_order", "lesson_order")
+        .values(next_lesson=JSONObject(public_id="public_id", title="title"))[:1]
+    )
+
+
+def with_next_lesson(enrollments):
+    # Anota next_lesson ({"public_id", "title"} ou None) nas matrículas. Uma
+    # única query, qualquer que seja o número de matrículas ou alunos; id e
+    # título saem da mesma subquery, para não procurar a lição duas vezes.
+    return enrollments.annotate(next_lesson=next_lesson_subquery())
+
+
+def next_lessons(student):
+    # [{course, course_title, lesson, lesson_title}] de todas as matrículas do
+    # aluno, das mais recentes para as mais antigas. 1 query.
+    enrollments = with_next_lesson(
+        Enrollment.objects.filter(student=student).order_by("-enrolled_at", "-id")
+    )
+    return [
+        {
+            "course": str(course_id),
+            "course_title": course_title,
+            "lesson": (next_lesson or {}).get("public_id"),
+            "lesson_title": (next_lesson or {}).get("title"),
+        }
+        for course_id, course_title, next_lesson in enrollments.values_list(
+            "course__public_id", "course__title", "next_lesson"
+        )
+    ]
+
+
+# --- Progresso do aluno (API) ---
+
+
+def _progress_rows(student):
+    return with_next_lesson(
+        Enrollment.objects.filter(student=student).order_by("-enrolled_at", "-id")
+    ).values(
+        "course__public_id",
+        "course__title",
+        "next_lesson",
+        *PROGRESS_FIELDS,
+    )
+
+
+def _progress_entry(row):
+    next_lesson = row["next_lesson"] or {}
+    return {
+        "course": str(row["course__public_id"]),
+        "course_title": row["course__title"],
+        "lessons_completed": row["lessons_completed"],
+        "total_lessons": row["total_lessons"],
+        "progress_percent": row["progress_percent"],
+        "last_activity_at": row["last_activity_at"],
+        "completed_at": row["completed_at"],
+        "next_lesson": next_lesson.get("public_id"),
+        "next_lesson_title": next_lesson.get("title"),
+    }
+
+
+def student_progress(student):
+    # Contadores e próxima lição de cada matrícula do aluno. 1 query.
+    return [_progress_entry(row) for row in _progress_rows(student)]
+
+
+async def astudent_progress(student):
+    return [_progress_entry(row) async for row in _progress_rows(student).aiterator()]
@@ -0,0 +1,357 @@
+# Em /learning/quiz.py
+#
+# Motor de quiz. As questões (QuizQuestion/QuizChoice) são compiladas uma vez
+# em uma forma compacta: para cada questão, o bitmask das alternativas
+# corretas (bit i = i-ésima alternativa) e os pontos. A forma compilada é
+# persistida como QuizRevision e guardada no cache (mesmo esquema de versões
+# de learning/outline.py), então corrigir uma tentativa não toca nas tabelas
+# de questões: é só comparar inteiros, posição a posição.
+#
+# A correção em lote trabalha por colunas (uma coluna por questão), o que dá
+# as estatísticas por questão de graça, e lê as tentativas do banco em blocos.
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.routers import primary
+
+from . import quiz_stats
+from .models import (
+    Lesson,
+    LessonProgress,
+    LessonTypeChoices,
+    QuestionKindChoices,
+    QuizAttempt,
+    QuizChoice,
+    QuizQuestion,
+    QuizRevision,
+)
+
+# Mude quando o formato compilado mudar, para descartar o cache antigo
+QUIZ_FORMAT = 1
+QUIZ_TIMEOUT = 60 * 60 * 24
+# Cada questão vira um bitmask em um IntegerField (31 bits úteis)
+MAX_CHOICES = 30
+GRADING_CHUNK_SIZE = 2000
+
+
+class QuizError(ValueError):
+    pass
+
+
+@dataclass
+class CompiledQuiz:
+    lesson_id: int
+    revision_id: int
+    question_ids: tuple  # IDs das questões, na ordem do quiz
+    answer_key: tuple  # Bitmask das alternativas corretas de cada questão
+    points: tuple
+    kinds: tuple
+    # public_id da questão -> posição; public_id da alternativa -> (posição, bit)
+    question_index: dict
+    choice_bits: dict
+    # Questões e alternativas para o aluno (sem o gabarito)
+    questions: list
+
+    @property
+    def max_score(self):
+        return sum(self.points)
+
+
+def _version_key(public_id):
+    return f"learning:quiz-version:{public_id}"
+
+
+def _quiz_key(public_id, version):
+    return f"learning:quiz:{QUIZ_FORMAT}:{public_id}:{version}"
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def get_quiz_version(public_id):
+    version_key = _version_key(public_id)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, _new_version(), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def compile_quiz(lesson):
+    # 4 queries (+3 ao criar a revisão). Levanta Lesson.DoesNotExist se a
+    # lição não existir ou não for do tipo Quiz.
+    if not isinstance(lesson, Lesson):
+        lesson = Lesson.objects.get(public_id=lesson, lesson_type=LessonTypeChoices.QUIZ)
+    elif lesson.lesson_type != LessonTypeChoices.QUIZ:
+        raise Lesson.DoesNotExist("A lição não é um quiz.")
+
+    questions = list(
+        QuizQuestion.objects.filter(lesson=lesson)
+        .order_by("question_order")
+        .values("id", "public_id", "kind", "prompt", "points")
+    )
+    choices = {}
+    for choice in (
+        QuizChoice.objects.filter(question__lesson=lesson)
+        .order_by("choice_order")
+        .values("question_id", "public_id", "text", "is_correct")
+    ):
+        choices.setdefault(choice["question_id"], []).append(choice)
+
+    answer_key, question_index, choice_bits, payload = [], {}, {}, []
+    digest = hashlib.sha1()
+    for position, question in enumerate(questions):
+        question_choices = choices.get(question["id"], [])
+        if len(question_choices) > MAX_CHOICES:
+            raise QuizError(
+                f"Questão {question['public_id']} tem mais de {MAX_CHOICES} alternativas."
+            )
+        key = 0
+        for bit, choice in enumerate(question_choices):
+            if choice["is_correct"]:
+                key |= 1 << bit
+            choice_bits[str(choice["public_id"])] = (position, bit)
+            digest.update(f"{choice['public_id']}:{choice['is_correct']};".encode())
+        answer_key.append(key)
+        question_index[str(question["public_id"])] = position
+        digest.update(f"{question['id']}:{question['kind']}:{question['points']}|".encode())
+        payload.append(
+            {
+                "public_id": str(question["public_id"]),
+                "kind": question["kind"],
+                "prompt": question["prompt"],
+                "points": question["points"],
+                "choices": [
+                    {"public_id": str(choice["public_id"]), "text": choice["text"]}
+                    for choice in question_choices
+                ],
+            }
+        )
+
+    question_ids = [question["id"] for question in questions]
+    points = [question["points"] for question in questions]
+    # get_or_create já trata a corrida de dois processos compilando juntos
+    revision, _ = QuizRevision.objects.get_or_create(
+        lesson=lesson,
+        digest=digest.hexdigest(),
+        defaults={"question_ids": question_ids, "answer_key": answer_key, "points": points},
+    )
+    return CompiledQuiz(
+        lesson_id=lesson.pk,
+        revision_id=revision.pk,
+        question_ids=tuple(question_ids),
+        answer_key=tuple(answer_key),
+        points=tuple(points),
+        kinds=tuple(question["kind"] for question in questions),
+        question_index=question_index,
+        choice_bits=choice_bits,
+        questions=payload,
+    )
+
+
+def get_compiled_quiz(public_id):
+    # Forma compilada do quiz da lição, do cache quando possível
+    public_id = str(public_id)
+    key = _quiz_key(public_id, get_quiz_version(public_id))
+    compiled = cache.get(key)
+    if compiled is None:
+        with primary():
+            compiled = compile_quiz(public_id)
+        cache.set(key, compiled, QUIZ_TIMEOUT)
+    return compiled
+
+
+def invalidate_quiz(public_id):
+    public_id = str(public_id)
+
+    def bump():
+        version_key = _version_key(public_id)
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.set(version_key, _new_version(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def invalidate_quiz_for(**lookup):
+    # Ex.: invalidate_quiz_for(pk=lesson_id)
+    for public_id in Lesson.objects.filter(**lookup).values_list("public_id", flat=True):
+        invalidate_quiz(public_id)
+
+
+# --- Correção ---
+
+
+def encode_answers(compiled, answers):
+    # answers: {public_id da questão: [public_id das alternativas marcadas]}
+    # Devolve um bitmask por questão, na ordem do quiz (0 = em branco)
+    if not isinstance(answers, dict):
+        raise QuizError("As respostas devem ser um objeto {questão: [alternativas]}.")
+    encoded = [0] * len(compiled.question_ids)
+    for question_id, choice_ids in answers.items():
+        position = compiled.question_index.get(str(question_id))
+        if position is None:
+            raise QuizError(f"Questão desconhecida: {question_id}.")
+        if not isinstance(choice_ids, list):
+            choice_ids = [choice_ids]
+        for choice_id in choice_ids:
+            choice_position, bit = compiled.choice_bits.get(str(choice_id), (None, None))
+            if choice_position != position:
+                raise QuizError(f"Alternativa inválida para a questão {question_id}.")
+            encoded[position] |= 1 << bit
+        if (
+            compiled.kinds[position] == QuestionKindChoices.SINGLE
+            and encoded[position].bit_count() > 1
+        ):
+            raise QuizError(f"A questão {question_id} aceita só uma alternativa.")
+    return encoded
+
+
+def grade(answer_key, points, answers):
+    # Devolve (pontos, [acertou a questão i])
+    correct = [answer == key for answer, key in zip(answers, answer_key)]
+    return sum(p for p, ok in zip(points, correct) if ok), correct
+
+
+@dataclass
+class GradeReport:
+    # Resultado da correção em lote de uma revisão
+    revision_id: int
+    question_ids: tuple
+    max_score: int
+    attempts: int = 0
+    score_total: int = 0
+    score_sq_total: int = 0
+    # Uma posição por questão (correct_score: soma dos pontos das tentativas
+    # que acertaram a questão, usada pelo índice de discriminação)
+    answered: list = field(default_factory=list)
+    correct: list = field(default_factory=list)
+    correct_score: list = field(default_factory=list)
+    # Uma posição por tentativa, na ordem em que foram lidas
+    attempt_ids: list = field(default_factory=list)
+    scores: list = field(default_factory=list)
+
+    @property
+    def mean_score(self):
+        return self.score_total / self.attempts if self.attempts else None
+
+    def question_stats(self):
+        return [
+            {
+                "question_id": question_id,
+                "answered": answered,
+                "correct": correct,
+                "correct_rate": correct / self.attempts if self.attempts else None,
+            }
+            for question_id, answered, correct in zip(
+                self.question_ids, self.answered, self.correct
+            )
+        ]
+
+
+def grade_batch(answer_key, points, rows):
+    # Corrige várias tentativas de uma mesma revisão de uma vez. rows é uma
+    # lista de arrays de respostas; o trabalho é feito coluna a coluna
+    # (questão a questão), comparando a coluna inteira com um único inteiro.
+    # Devolve (pontos de cada tentativa, acertos por questão, respondidas por
+    # questão, soma dos pontos de quem acertou cada questão)
+    size = len(answer_key)
+    if not rows:
+        return [], [0] * size, [0] * size, [0] * size
+    columns = list(zip(*rows))
+    scores = [0] * len(rows)
+    hit_columns, correct_counts, answered_counts = [], [], []
+    for column, key, value in zip(columns, answer_key, points):
+        hits = [answer == key for answer in column]
+        hit_columns.append(hits)
+        correct_counts.append(sum(hits))
+        answered_counts.append(len(column) - column.count(0))
+        if value:
+            scores = [score + value * hit for score, hit in zip(scores, hits)]
+    correct_scores = [
+        sum(score for score, hit in zip(scores, hits) if hit) for hits in hit_columns
+    ]
+    return scores, correct_counts, answered_counts, correct_scores
+
+
+def grade_attempts(attempts, chunk_size=GRADING_CHUNK_SIZE, keep_scores=True):
+    # Corrige em lote um queryset de QuizAttempt (ex.: a turma inteira em um
+    # quiz), recalculando tudo a partir do gabarito de cada revisão.
+    # Devolve {revision_id: GradeReport}. Lê só (id, revision_id, answers), em
+    # blocos de chunk_size tentativas; com keep_scores=False só os totais são
+    # guardados e a memória não cresce com o número de tentativas.
+    reports = {}
+    revisions = {}
+    pending = {}
+
+    def flush(revision_id):
+        ids, rows = zip(*pending.pop(revision_id))
+        revision = revisions[revision_id]
+        report = reports[revision_id]
+        scores, correct, answered, correct_score = grade_batch(
+            revision.answer_key, revision.points, rows
+        )
+        report.attempts += len(rows)
+        report.score_total += sum(scores)
+        report.score_sq_total += sum(score * score for score in scores)
+        report.correct = [a + b for a, b in zip(report.correct, correct)]
+        report.answered = [a + b for a, b in zip(report.answered, answered)]
+        report.correct_score = [
+            a + b for a, b in zip(report.correct_score, correct_score)
+        ]
+        if keep_scores:
+            report.attempt_ids.extend(ids)
+            report.scores.extend(scores)
+
+    for attempt_id, revision_id, answers in attempts.order_by().values_list(
+        "id", "revision_id", "answers"
+    ).iterator(chunk_size=chunk_size):
+        if revision_id not in revisions:
+            revision = revisions[revision_id] = QuizRevision.objects.get(pk=revision_id)
+            size = len(revision.question_ids)
+            reports[revision_id] = GradeReport(
+                revision_id=revision_id,
+                question_ids=tuple(revision.question_ids),
+                max_score=sum(revision.points),
+                answered=[0] * size,
+                correct=[0] * size,
+                correct_score=[0] * size,
+            )
+        batch = pending.setdefault(revision_id, [])
+        batch.append((attempt_id, answers))
+        if len(batch) >= chunk_size:
+            flush(revision_id)
+    for revision_id in list(pending):
+        flush(revision_id)
+    return reports
+
+
+def submit_attempt(student, lesson_public_id, answers):
+    # Corrige e grava a tentativa; a lição conta como concluída na primeira
+    # tentativa enviada. Levanta Lesson.DoesNotExist e QuizError.
+    compiled = get_compiled_quiz(lesson_public_id)
+    if not compiled.question_ids:
+        raise QuizError("Este quiz ainda não tem questões.")
+    encoded = encode_answers(compiled, answers)
+    score, correct = grade(compiled.answer_key, compiled.points, encoded)
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(
+            student=student,
+            lesson_id=compiled.lesson_id,
+            revision_id=compiled.revision_id,
+            answers=encoded,
+            score=score,
+            max_score=compiled.max_score,
+        )
+        LessonProgress.objects.get_or_create(
+            student=student, lesson_id=compiled.lesson_id
+        )
+        quiz_stats.record_attempt(compiled, encoded, correct, score)
+    return attempt, correct
@@ -0,0 +1,116 @@
+# Em /learning/quiz_stats.py
+#
+# Estatísticas por questão dos quizzes (QuizItemStats), para saber quais
+# questões estão difíceis demais ou não separam quem domina o conteúdo.
+# Cada tentativa soma seus valores às linhas das questões em um único UPDATE
+# com F(), então ler as estatísticas custa O(questões), não O(tentativas).
+# O comando "rebuild_quiz_stats" recalcula tudo a partir das tentativas.
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, FloatField, IntegerField, Value, When
+from django.utils import timezone
+
+from . import quiz
+from .models import Lesson, LessonTypeChoices, QuizAttempt, QuizItemStats, QuizQuestion
+
+SUM_FIELDS = (
+    "attempts",
+    "answered",
+    "correct",
+    "score_sum",
+    "score_sq_sum",
+    "correct_score_sum",
+)
+
+
+def _when_in(question_ids, value, output_field):
+    return Case(
+        When(question_id__in=question_ids, then=Value(value)),
+        default=Value(0),
+        output_field=output_field,
+    )
+
+
+def record_attempt(compiled, answers, correct, score):
+    # Soma uma tentativa já corrigida às estatísticas das questões (2 queries)
+    question_ids = compiled.question_ids
+    fraction = score / compiled.max_score if compiled.max_score else 0.0
+    answered_ids = [q for q, answer in zip(question_ids, answers) if answer]
+    correct_ids = [q for q, ok in zip(question_ids, correct) if ok]
+
+    # Linhas que ainda não existem (questão nova) nascem zeradas
+    QuizItemStats.objects.bulk_create(
+        [QuizItemStats(question_id=q, lesson_id=compiled.lesson_id) for q in question_ids],
+        ignore_conflicts=True,
+    )
+    QuizItemStats.objects.filter(question_id__in=question_ids).update(
+        attempts=F("attempts") + 1,
+        answered=F("answered") + _when_in(answered_ids, 1, IntegerField()),
+        correct=F("correct") + _when_in(correct_ids, 1, IntegerField()),
+        score_sum=F("score_sum") + fraction,
+        score_sq_sum=F("score_sq_sum") + fraction * fraction,
+        correct_score_sum=F("correct_score_sum")
+        + _when_in(correct_ids, fraction, FloatField()),
+        updated_at=timezone.now(),
+    )
+
+
+def rebuild_lesson_stats(lesson_id):
+    # Recalcula do zero as estatísticas das questões de um quiz
+    with transaction.atomic():
+        # Trava as linhas antes de ler as tentativas: uma tentativa gravada
+        # durante o recálculo espera o commit e soma por cima do valor novo
+        list(
+            QuizItemStats.objects.select_for_update()
+            .filter(lesson_id=lesson_id)
+            .values_list("pk", flat=True)
+        )
+        totals = defaultdict(lambda: dict.fromkeys(SUM_FIELDS, 0))
+        reports = quiz.grade_attempts(
+            QuizAttempt.objects.filter(lesson_id=lesson_id), keep_scores=False
+        )
+        for report in reports.values():
+            scale = report.max_score or 1
+            for i, question_id in enumerate(report.question_ids):
+                sums = totals[question_id]
+                sums["attempts"] += report.attempts
+                sums["answered"] += report.answered[i]
+                sums["correct"] += report.correct[i]
+                sums["score_sum"] += report.score_total / scale
+                sums["score_sq_sum"] += report.score_sq_total / scale**2
+                sums["correct_score_sum"] += report.correct_score[i] / scale
+
+        # Questões já removidas podem aparecer em revisões antigas: ficam de fora
+        now = timezone.now()
+        question_ids = QuizQuestion.objects.filter(lesson_id=lesson_id).values_list(
+            "pk", flat=True
+        )
+        QuizItemStats.objects.bulk_create(
+            [
+                QuizItemStats(
+                    question_id=question_id,
+                    lesson_id=lesson_id,
+                    updated_at=now,
+                    **totals.get(question_id, {}),
+                )
+                for question_id in question_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["question"],
+            update_fields=[*SUM_FIELDS, "updated_at"],
+        )
+    return len(question_ids)
+
+
+def rebuild_quiz_stats(lessons=None):
+    # Recalcula todos os quizzes (ou os do queryset de Lesson informado), um
+    # por transação. Devolve a quantidade de questões recalculadas.
+    if lessons is None:
+        lessons = Lesson.objects.all()
+    lessons = lessons.filter(lesson_type=LessonTypeChoices.QUIZ)
+    return sum(
+        rebuild_lesson_stats(lesson_id)
+        for lesson_id in lessons.values_list("pk", flat=True).iterator()
+    )
@@ -0,0 +1,43 @@
+# Em /learning/reports.py
+#
+# Relatórios de cursos lidos de views materializadas do PostgreSQL
+# (criadas em learning/migrations/0014_reporting_views.py): CourseStats
+# (matrículas, conclusão, mediana do tempo até concluir) e LessonFunnel
+# (abandono lição a lição). Os agregados pesados rodam só no refresh; o admin
+# lê as views prontas.
+#
+# O refresh é CONCURRENTLY: as leituras continuam durante a atualização (a
+# view antiga fica visível até o fim). Agende o comando "refresh_reports".
+
+import time
+
+from django.db import connections
+from django.db.models import Max
+
+from .models import CourseStats, LessonFunnel
+
+REPORT_MODELS = (CourseStats, LessonFunnel)
+
+
+def refresh_reports(concurrently=True, using="default"):
+    # Devolve [(view, segundos)]
+    timings = []
+    keyword = "CONCURRENTLY " if concurrently else ""
+    with connections[using].cursor() as cursor:
+        for model in REPORT_MODELS:
+            started = time.perf_counter()
+            cursor.execute(f"REFRESH MATERIALIZED VIEW {keyword}{model._meta.db_table}")
+            timings.append((model._meta.db_table, time.perf_counter() - started))
+    return timings
+
+
+def last_refreshed_at():
+    return CourseStats.objects.aggregate(last=Max("refreshed_at"))["last"]
+
+
+def course_funnel(course_id):
+    return list(
+        LessonFunnel.objects.filter(course_id=course_id)
+        .select_related("lesson")
+        .order_by("position")
+    )
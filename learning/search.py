@@ -0,0 +1,238 @@
+# Em /learning/search.py
+#
+# Busca textual (PostgreSQL full-text, em português) sobre cursos, lições,
+# materiais e falas das legendas. Cada modelo tem uma coluna "search"
+# (tsvector) com índice GIN: as de Course/Lesson/Material são colunas geradas
+# pelo próprio banco; a de SubtitleCues é preenchida na ingestão
+# (learning/subtitles.py). O título pesa mais que o corpo (pesos A e B).
+#
+# Quando a extensão pg_trgm está instalada, títulos curtos também casam por
+# similaridade de trigramas, o que tolera erros de digitação ("fraçoes",
+# "geografai"). Sem a extensão, a busca continua só com o full-text.
+
+import html
+from dataclasses import dataclass
+from functools import cache
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db import connections
+from django.db.models import F, Func, Q, TextField, Value
+from django.db.models.functions import Greatest
+
+from .models import SEARCH_CONFIG, Course, Lesson, Material, SubtitleCues
+
+SEARCH_KINDS = ("course", "lesson", "material", "subtitle")
+MAX_QUERY_LENGTH = 200
+MAX_RESULTS = 50
+# Trechos destacados: até 2 fragmentos com os termos entre <mark></mark>. O
+# ts_headline devolve o texto original sem escapar: marca os termos com
+# sentinelas, escapa o HTML em Python e só então troca por <mark>.
+HEADLINE_START = "⟦"
+HEADLINE_STOP = "⟧"
+HEADLINE_OPTIONS = {
+    "config": SEARCH_CONFIG,
+    "start_sel": HEADLINE_START,
+    "stop_sel": HEADLINE_STOP,
+    "max_words": 25,
+    "min_words": 10,
+    "max_fragments": 2,
+}
+
+
+@dataclass
+class SearchResult:
+    kind: str
+    public_id: str
+    title: str
+    rank: float
+    headline: str
+    # Onde abrir o resultado: o curso (para cursos) ou a lição
+    course_id: str = None
+    lesson_id: str = None
+
+
+@cache
+def trigram_available(alias="default"):
+    # A extensão é opcional (a migração só a instala se o servidor tiver o
+    # pacote contrib). Verificado uma vez por processo.
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def build_query(text):
+    # Sintaxe de buscador: "frase exata", -excluir, OR
+    return SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def match(queryset, text, query=None, title_field=None, prefix=False):
+    # Filtra e anota "rank". Com title_field e pg_trgm, também casa títulos
+    # parecidos, com a similaridade como rank mínimo. Com prefix, também casa
+    # títulos que começam pelo texto ("Fraç" -> "Frações"), o que o full-text
+    # não faz; serve para o autocomplete do admin.
+    query = query or build_query(text)
+    condition = Q(search=query)
+    rank = SearchRank(F("search"), query)
+    if title_field and prefix:
+        condition |= Q(**{f"{title_field}__istartswith": text})
+    if title_field and trigram_available(queryset.db):
+        condition |= Q(**{f"{title_field}__trigram_similar": text})
+        rank = Greatest(rank, TrigramSimilarity(title_field, text))
+    return queryset.filter(condition).annotate(rank=rank)
+
+
+def _headline(field, query):
+    return SearchHeadline(field, query, **HEADLINE_OPTIONS)
+
+
+def render_headline(headline):
+    # Texto do ts_headline -> HTML seguro, só com as marcações <mark>
+    if headline is None:
+        return None
+    return (
+        html.escape(headline)
+        .replace(HEADLINE_START, "<mark>")
+        .replace(HEADLINE_STOP, "</mark>")
+    )
+
+
+def _search_courses(text, query, limit):
+    rows = (
+        match(Course.objects.all(), text, query, "title")
+        .annotate(headline=_headline("description", query))
+        .order_by("-rank", "pk")
+        .values("public_id", "title", "rank", "headline")[:limit]
+    )
+    return [
+        SearchResult(
+            "course",
+            str(row["public_id"]),
+            row["title"],
+            row["rank"],
+            render_headline(row["headline"]),
+            course_id=str(row["public_id"]),
+        )
+        for row in rows
+    ]
+
+
+def _search_lessons(text, query, limit):
+    rows = (
+        match(Lesson.objects.all(), text, query, "title")
+        .annotate(headline=_headline("content", query))
+        .order_by("-rank", "pk")
+        .values("public_id", "title", "rank", "headline", "module__course__public_id")[
+            :limit
+        ]
+    )
+    return [
+        SearchResult(
+            "lesson",
+            str(row["public_id"]),
+            row["title"],
+            row["rank"],
+            render_headline(row["headline"]),
+            course_id=str(row["module__course__public_id"]),
+            lesson_id=str(row["public_id"]),
+        )
+        for row in rows
+    ]
+
+
+def _search_materials(text, query, limit):
+    rows = (
+        match(Material.objects.all(), text, query, "title")
+        .annotate(headline=_headline("title", query))
+        .order_by("-rank", "pk")
+        .values(
+            "public_id",
+            "title",
+            "rank",
+            "headline",
+            "lesson__public_id",
+            "lesson__module__course__public_id",
+        )[:limit]
+    )
+    return [
+        SearchResult(
+            "material",
+            str(row["public_id"]),
+            row["title"],
+            row["rank"],
+            render_headline(row["headline"]),
+            course_id=str(row["lesson__module__course__public_id"]),
+            lesson_id=str(row["lesson__public_id"]),
+        )
+        for row in rows
+    ]
+
+
+def _search_subtitles(text, query, limit):
+    # Sem as tags das falas (<v Professor>, <i>), como na ingestão
+    spoken = Func(
+        Func(
+            F("texts"),
+            Value(" "),
+            function="array_to_string",
+            output_field=TextField(),
+        ),
+        Value("<[^>]+>"),
+        Value(""),
+        Value("g"),
+        function="regexp_replace",
+        output_field=TextField(),
+    )
+    rows = (
+        match(SubtitleCues.objects.all(), text, query)
+        .annotate(headline=_headline(spoken, query))
+        .order_by("-rank", "pk")
+        .values(
+            "subtitle__public_id",
+            "subtitle__lesson__public_id",
+            "subtitle__lesson__title",
+            "subtitle__lesson__module__course__public_id",
+            "rank",
+            "headline",
+        )[:limit]
+    )
+    return [
+        SearchResult(
+            "subtitle",
+            str(row["subtitle__public_id"]),
+            row["subtitle__lesson__title"],
+            row["rank"],
+            render_headline(row["headline"]),
+            course_id=str(row["subtitle__lesson__module__course__public_id"]),
+            lesson_id=str(row["subtitle__lesson__public_id"]),
+        )
+        for row in rows
+    ]
+
+
+_SEARCHERS = {
+    "course": _search_courses,
+    "lesson": _search_lessons,
+    "material": _search_materials,
+    "subtitle": _search_subtitles,
+}
+
+
+def search(text, kinds=SEARCH_KINDS, limit=20):
+    # Resultados de todos os tipos pedidos, do mais para o menos relevante.
+    # Uma query por tipo; o PostgreSQL calcula o destaque (ts_headline, caro)
+    # só para as linhas que sobram depois do ORDER BY ... LIMIT.
+    text = (text or "").strip()[:MAX_QUERY_LENGTH]
+    if not text:
+        return []
+    limit = min(limit, MAX_RESULTS)
+    query = build_query(text)
+    results = []
+    for kind in kinds:
+        results.extend(_SEARCHERS[kind](text, query, limit))
+    results.sort(key=lambda result: -result.rank)
+    return results[:limit]
@@ -0,0 +1,181 @@
+# Em /learning/signals.py
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import Student
+
+from . import dashboard, outline, progress, quiz, subtitles, tts
+from .models import (
+    Course,
+    Enrollment,
+    Lesson,
+    LessonProgress,
+    LessonTypeChoices,
+    Material,
+    Module,
+    QuizChoice,
+    QuizQuestion,
+    Subtitle,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# --- Contadores de progresso das matrículas ---
+
+
+@receiver(post_save, sender=LessonProgress)
+def lesson_progress_saved(sender, instance, created, **kwargs):
+    if created:
+        progress.lesson_completed(
+            instance.student_id, instance.lesson_id, instance.completed_at
+        )
+
+
+@receiver(post_delete, sender=LessonProgress)
+def lesson_progress_deleted(sender, instance, **kwargs):
+    progress.lesson_uncompleted(instance.student_id, instance.lesson_id)
+
+
+@receiver(pre_save, sender=Lesson)
+def lesson_pre_save(sender, instance, **kwargs):
+    # Guarda o módulo anterior para detectar lições movidas de curso
+    instance._previous_module_id = None
+    if not instance._state.adding:
+        instance._previous_module_id = (
+            Lesson.objects.filter(pk=instance.pk)
+            .values_list("module_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_saved(sender, instance, created, **kwargs):
+    previous_module_id = getattr(instance, "_previous_module_id", None)
+    if created:
+        progress.lessons_added(instance.module_id)
+    elif previous_module_id and previous_module_id != instance.module_id:
+        progress.lesson_moved(previous_module_id, instance.module_id)
+
+
+@receiver(post_delete, sender=Lesson)
+def lesson_deleted(sender, instance, **kwargs):
+    progress.lessons_removed(instance.module_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def enrollment_saved(sender, instance, created, **kwargs):
+    # Matrícula nova já nasce com os contadores corretos (o aluno pode ter
+    # concluído lições antes de se matricular)
+    if created:
+        progress.refresh_enrollments(Enrollment.objects.filter(pk=instance.pk))
+        instance.refresh_from_db(fields=progress.PROGRESS_FIELDS)
+
+
+# --- Cache do painel do responsável (learning/dashboard.py) ---
+
+
+@receiver(pre_save, sender=Student)
+def student_pre_save(sender, instance, **kwargs):
+    # Guarda o responsável anterior para detectar alunos transferidos
+    instance._previous_user_id = None
+    if not instance._state.adding:
+        instance._previous_user_id = (
+            Student.objects.filter(pk=instance.pk)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def student_changed(sender, instance, **kwargs):
+    dashboard.invalidate_dashboard(instance.user_id)
+    previous = getattr(instance, "_previous_user_id", None)
+    if previous is not None and previous != instance.user_id:
+        dashboard.invalidate_dashboard(previous)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=LessonProgress)
+@receiver(post_delete, sender=LessonProgress)
+def student_activity_changed(sender, instance, **kwargs):
+    dashboard.invalidate_dashboard_for_students([instance.student_id])
+
+
+# --- Cache da árvore do curso (learning/outline.py) ---
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    outline.invalidate_course_outline(instance.public_id)
+
+
+@receiver(post_save, sender=Module)
+@receiver(post_delete, sender=Module)
+def module_changed(sender, instance, **kwargs):
+    outline.invalidate_outline_for(pk=instance.course_id)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def lesson_changed(sender, instance, **kwargs):
+    module_ids = {instance.module_id, getattr(instance, "_previous_module_id", None)}
+    outline.invalidate_outline_for(modules__in=module_ids - {None})
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_delete, sender=Material)
+@receiver(post_save, sender=Subtitle)
+@receiver(post_delete, sender=Subtitle)
+def lesson_attachment_changed(sender, instance, **kwargs):
+    outline.invalidate_outline_for(modules__lessons=instance.lesson_id)
+
+
+# --- Cache do quiz compilado (learning/quiz.py) ---
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def quiz_lesson_changed(sender, instance, **kwargs):
+    # O tipo da lição pode ter mudado de/para Quiz
+    quiz.invalidate_quiz(instance.public_id)
+
+
+@receiver(post_save, sender=QuizQuestion)
+@receiver(post_delete, sender=QuizQuestion)
+def quiz_question_changed(sender, instance, **kwargs):
+    quiz.invalidate_quiz_for(pk=instance.lesson_id)
+
+
+@receiver(post_save, sender=QuizChoice)
+@receiver(post_delete, sender=QuizChoice)
+def quiz_choice_changed(sender, instance, **kwargs):
+    quiz.invalidate_quiz_for(quiz_questions=instance.question_id)
+
+
+# --- Áudio (TTS) das lições de texto (learning/tts.py) ---
+
+
+@receiver(post_save, sender=Lesson)
+def text_lesson_saved(sender, instance, **kwargs):
+    if not settings.TTS_RENDER_ON_SAVE or instance.lesson_type != LessonTypeChoices.TEXT:
+        return
+    # Em segundo plano: salvar a lição não espera a síntese
+    transaction.on_commit(lambda: tts.render_in_background([instance.pk]))
+
+
+# --- Falas das legendas (learning/subtitles.py) ---
+
+
+@receiver(post_save, sender=Subtitle)
+def subtitle_saved(sender, instance, **kwargs):
+    if settings.SUBTITLE_INGEST_ON_SAVE:
+        subtitles.ingest_on_commit([instance])
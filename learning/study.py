@@ -0,0 +1,278 @@
+# Em /learning/study.py
+#
+# Sessões de estudo e pausas (RF026), alimentadas por heartbeats do player
+# (um a cada ~30s, dizendo se o aluno está em foco ou em pausa).
+#
+# Os heartbeats não vão para o banco: o trecho aberto de cada sessão fica no
+# cache (estado, início, último heartbeat) e só vira uma linha de StudySegment
+# quando termina: o estado muda, os heartbeats param por mais de
+# HEARTBEAT_GAP segundos, o trecho passa de MAX_SEGMENT segundos ou a sessão
+# é encerrada. Cada trecho gravado soma nos totais da sessão e no
+# StudyDailyRollup do dia, que é o que os relatórios leem. Um trecho emendado
+# no seguinte termina no heartbeat que o fechou; um trecho interrompido
+# conta ainda o intervalo do seu último heartbeat.
+#
+# Sessões abandonadas (o app fechou sem avisar) são encerradas pelo comando
+# "flush_study_sessions", que deve rodar periodicamente.
+#
+# O buffer precisa estar num cache compartilhado (CACHE_BACKEND=redis): com a
+# memória local, cada worker e o comando teriam o seu, e trechos seriam
+# perdidos ou contados duas vezes. Toda alteração do buffer (heartbeat,
+# encerramento, flush) acontece sob um lock por sessão (cache.add) e relê o
+# buffer do cache, para que um trecho nunca seja gravado duas vezes.
+
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .models import StudyDailyRollup, StudySegment, StudySession, StudyStateChoices
+
+HEARTBEAT_INTERVAL = 30  # Intervalo nominal entre heartbeats do player
+HEARTBEAT_GAP = 90  # Segundos sem heartbeat que fecham o trecho
+MAX_SEGMENT = 15 * 60  # Teto do trecho: limita o atraso dos relatórios
+SESSION_IDLE = 30 * 60  # Segundos sem heartbeat que encerram a sessão
+BUFFER_TIMEOUT = 60 * 60 * 12
+LOCK_TIMEOUT = 10  # O lock some sozinho se o worker morrer segurando-o
+LOCK_WAIT = 2.0
+LOCK_INTERVAL = 0.02
+
+
+class StudyError(ValueError):
+    pass
+
+
+def _buffer_key(public_id):
+    return f"learning:study:{public_id}"
+
+
+def _new_buffer(session):
+    return {
+        "id": session.pk,
+        "public_id": str(session.public_id),
+        "student_id": session.student_id,
+        "user_id": session.student.user_id,
+        "last_seen": session.started_at.timestamp(),
+        "segment": None,
+    }
+
+
+def _save_buffer(buffer):
+    cache.set(_buffer_key(buffer["public_id"]), buffer, BUFFER_TIMEOUT)
+
+
+@contextmanager
+def _locked(buffer, wait=True):
+    # Segura o lock da sessão e atualiza "buffer" (no lugar) com a versão do
+    # cache, que outro worker pode ter mudado. Sem wait, devolve False se o
+    # lock estiver ocupado.
+    key = f"{_buffer_key(buffer['public_id'])}:lock"
+    deadline = time.monotonic() + (LOCK_WAIT if wait else 0)
+    while not cache.add(key, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            if not wait:
+                yield False
+                return
+            raise StudyError("Sessão ocupada, tente de novo.")
+        time.sleep(LOCK_INTERVAL)
+    try:
+        current = cache.get(_buffer_key(buffer["public_id"]))
+        if current is None:
+            # Sem buffer no cache: a sessão pode ter sido encerrada depois de
+            # o chamador ler o buffer. A cópia dele não pode ressuscitá-la.
+            session = (
+                StudySession.objects.select_related("student")
+                .filter(pk=buffer["id"])
+                .first()
+            )
+            if session is None or session.ended_at is not None:
+                raise StudyError("Esta sessão já foi encerrada.")
+            current = _new_buffer(session)
+        buffer.clear()
+        buffer.update(current)
+        yield True
+    finally:
+        cache.delete(key)
+
+
+def add_to_rollup(student_id, day, **increments):
+    # Soma os incrementos no dia do aluno, criando a linha se preciso
+    # (2 queries; o UPDATE com F() não perde somas concorrentes)
+    StudyDailyRollup.objects.bulk_create(
+        [StudyDailyRollup(student_id=student_id, day=day)], ignore_conflicts=True
+    )
+    StudyDailyRollup.objects.filter(student_id=student_id, day=day).update(
+        updated_at=Now(),
+        **{name: F(name) + value for name, value in increments.items()},
+    )
+
+
+def start_session(student, lesson=None, now=None):
+    now = now or timezone.now()
+    with transaction.atomic():
+        session = StudySession.objects.create(
+            student=student, lesson=lesson, started_at=now
+        )
+        add_to_rollup(student.pk, timezone.localdate(now), sessions=1)
+    _save_buffer(_new_buffer(session))
+    return session
+
+
+def get_buffer(public_id):
+    # Estado em memória da sessão aberta (recriado do banco se o cache o
+    # perdeu). Levanta StudySession.DoesNotExist e StudyError.
+    buffer = cache.get(_buffer_key(public_id))
+    if buffer is None:
+        session = StudySession.objects.select_related("student").get(
+            public_id=public_id
+        )
+        if session.ended_at is not None:
+            raise StudyError("Esta sessão já foi encerrada.")
+        buffer = _new_buffer(session)
+    return buffer
+
+
+def _segment_end(segment, until=None):
+    # Fim do trecho. Emendado no próximo heartbeat (until), vai até ele; senão
+    # (os heartbeats pararam ou a sessão acabou) conta o intervalo do último
+    # heartbeat, que também foi de estudo.
+    if until is not None:
+        return until
+    return segment["last"] + min(HEARTBEAT_INTERVAL, HEARTBEAT_GAP)
+
+
+def write_segment(buffer, until=None, ended_at=None):
+    # Grava o trecho aberto (se houver) e soma nos totais. 5 queries. Chame
+    # com o lock da sessão (_locked). until: timestamp do heartbeat que emenda
+    # neste trecho; ended_at: fim da sessão, que o trecho não passa.
+    segment = buffer["segment"]
+    buffer["segment"] = None
+    if segment is None:
+        return None
+    end = _segment_end(segment, until)
+    if ended_at is not None:
+        end = max(segment["last"], min(end, ended_at.timestamp()))
+    started_at = datetime.fromtimestamp(segment["started"], tz=UTC)
+    ended_at = datetime.fromtimestamp(end, tz=UTC)
+    seconds = int(end - segment["started"])
+    is_break = segment["state"] == StudyStateChoices.BREAK
+    field = "break_seconds" if is_break else "focus_seconds"
+    increments = {field: seconds, "break_count": int(is_break)}
+    with transaction.atomic():
+        row = StudySegment.objects.create(
+            session_id=buffer["id"],
+            state=segment["state"],
+            started_at=started_at,
+            ended_at=ended_at,
+            heartbeats=segment["beats"],
+        )
+        StudySession.objects.filter(pk=buffer["id"]).update(
+            **{name: F(name) + value for name, value in increments.items()}
+        )
+        # O trecho conta no dia em que começou
+        add_to_rollup(
+            buffer["student_id"], timezone.localdate(started_at), **increments
+        )
+    return row
+
+
+def heartbeat(buffer, state, now=None):
+    # Registra um heartbeat na sessão. Normalmente não toca no banco: só
+    # quando fecha o trecho anterior.
+    if state not in StudyStateChoices.values:
+        raise StudyError(f"Estado inválido: {state}.")
+    now = (now or timezone.now()).timestamp()
+    with _locked(buffer):
+        segment = buffer["segment"]
+        if segment:
+            continuous = now - segment["last"] <= HEARTBEAT_GAP
+            if not continuous:
+                write_segment(buffer)
+                segment = None
+            elif (
+                segment["state"] != state
+                or now - segment["started"] >= MAX_SEGMENT
+            ):
+                write_segment(buffer, until=now)
+                segment = None
+        if segment is None:
+            buffer["segment"] = {
+                "state": state,
+                "started": now,
+                "last": now,
+                "beats": 1,
+            }
+        else:
+            segment["last"] = max(segment["last"], now)
+            segment["beats"] += 1
+        buffer["last_seen"] = max(buffer["last_seen"], now)
+        _save_buffer(buffer)
+    return buffer
+
+
+def end_session(buffer, ended_at=None):
+    with _locked(buffer):
+        _end_session(buffer, ended_at)
+
+
+def _end_session(buffer, ended_at=None):
+    ended_at = ended_at or timezone.now()
+    write_segment(buffer, ended_at=ended_at)
+    StudySession.objects.filter(pk=buffer["id"], ended_at__isnull=True).update(
+        ended_at=ended_at
+    )
+    cache.delete(_buffer_key(buffer["public_id"]))
+
+
+def flush_idle_sessions(now=None):
+    # Fecha trechos parados há mais de HEARTBEAT_GAP e encerra as sessões sem
+    # heartbeat há mais de SESSION_IDLE (no fim do intervalo do último
+    # heartbeat, como o trecho). Sessões com o lock ocupado estão recebendo
+    # heartbeats: ficam para a próxima rodada. Devolve (trechos gravados,
+    # sessões encerradas).
+    now = now or timezone.now()
+    written = closed = 0
+    open_sessions = StudySession.objects.filter(ended_at__isnull=True).select_related(
+        "student"
+    )
+    for session in open_sessions.iterator():
+        # Sem buffer no cache (expulso), a sessão conta como parada desde o início
+        buffer = _new_buffer(session)
+        try:
+            with _locked(buffer, wait=False) as acquired:
+                if not acquired:
+                    continue
+                idle = now.timestamp() - buffer["last_seen"]
+                if idle > HEARTBEAT_GAP and buffer["segment"]:
+                    written += write_segment(buffer) is not None
+                    _save_buffer(buffer)
+                if idle > SESSION_IDLE:
+                    last_seen = buffer["last_seen"] + HEARTBEAT_INTERVAL
+                    _end_session(buffer, datetime.fromtimestamp(last_seen, tz=UTC))
+                    closed += 1
+        except StudyError:
+            continue  # Encerrada por outro worker enquanto a lista era lida
+    return written, closed
+
+
+def study_report(student, days=7):
+    # Tempo de estudo por dia (só dias com atividade), do mais recente para o
+    # mais antigo. Lê apenas StudyDailyRollup: 1 query.
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return [
+        {
+            "day": rollup.day,
+            "sessions": rollup.sessions,
+            "focus_seconds": rollup.focus_seconds,
+            "break_seconds": rollup.break_seconds,
+            "break_count": rollup.break_count,
+        }
+        for rollup in StudyDailyRollup.objects.filter(
+            student=student, day__gte=since
+        ).order_by("-day")
+    ]
@@ -0,0 +1,228 @@
+# Em /learning/subtitles.py
+#
+# Ingestão de legendas (.vtt/.srt). O arquivo apontado por Subtitle.file_url
+# é baixado e interpretado uma única vez (depois do commit que salvou ou
+# importou a legenda, ou pelo comando "ingest_subtitles"); as falas ficam em SubtitleCues como arrays ordenados.
+# A partir daí:
+#   - "qual fala está no instante t" e "falas entre a e b" são buscas
+#     binárias (CueIndex), sem baixar nem interpretar o arquivo de novo;
+#   - o WebVTT é servido direto dos arrays, em streaming (iter_webvtt).
+
+import hashlib
+import logging
+import re
+import urllib.parse
+import urllib.request
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+
+from django.contrib.postgres.search import SearchVector
+from django.db import transaction
+from django.db.models import Value
+from django.utils import timezone
+
+from .models import SEARCH_CONFIG, SubtitleCues
+
+logger = logging.getLogger(__name__)
+
+# Teto para o download: uma legenda de 2h tem poucas centenas de KB
+MAX_SUBTITLE_BYTES = 5 * 1024 * 1024
+FETCH_TIMEOUT = 10
+
+_TIMING = re.compile(
+    r"^\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{1,3})"
+)
+_TAGS = re.compile(r"<[^>]+>")
+
+
+class SubtitleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Cue:
+    start_ms: int
+    end_ms: int
+    text: str
+
+
+def parse_timestamp(value):
+    # "01:02:03.456", "02:03.456" (WebVTT) ou "01:02:03,456" (SRT) -> ms
+    clock, millis = re.split(r"[.,]", value)
+    seconds = 0
+    for part in clock.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds * 1000 + int(millis.ljust(3, "0"))
+
+
+def format_timestamp(ms):
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02}:{minutes:02}:{seconds:02}.{ms:03}"
+
+
+def parse_cues(text):
+    # Interpreta WebVTT ou SRT (os blocos têm a mesma estrutura: um
+    # identificador opcional, a linha de tempo e o texto). Blocos sem linha
+    # de tempo (cabeçalho WEBVTT, NOTE, STYLE, REGION) são ignorados.
+    cues = []
+    text = text.lstrip("﻿").replace("\r\n", "\n").replace("\r", "\n")
+    for block in re.split(r"\n{2,}", text):
+        lines = block.strip("\n").split("\n")
+        for position, line in enumerate(lines[:2]):
+            match = _TIMING.match(line)
+            if match:
+                break
+        else:
+            continue
+        start, end = (parse_timestamp(value) for value in match.groups())
+        if end < start:
+            raise SubtitleError(f"Fala termina antes de começar: {line.strip()}")
+        body = "\n".join(lines[position + 1 :]).strip()
+        if body:
+            cues.append(Cue(start, end, body))
+    cues.sort(key=lambda cue: (cue.start_ms, cue.end_ms))
+    return cues
+
+
+FETCH_SCHEMES = ("http", "https")
+
+
+def _check_scheme(url):
+    # O urllib também abriria file:// e ftp://, e as falas são servidas
+    # publicamente: só aceita endereços web
+    if urllib.parse.urlsplit(url).scheme.lower() not in FETCH_SCHEMES:
+        raise SubtitleError(f"URL de legenda não permitida: {url}")
+
+
+class _RedirectHandler(urllib.request.HTTPRedirectHandler):
+    # Um redirecionamento não pode levar a outro esquema (ex.: ftp://)
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        _check_scheme(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_RedirectHandler)
+
+
+def fetch_subtitle(url):
+    # Baixa o arquivo de legenda (com limite de tamanho) e devolve os bytes
+    _check_scheme(url)
+    with _opener.open(url, timeout=FETCH_TIMEOUT) as response:
+        data = response.read(MAX_SUBTITLE_BYTES + 1)
+    if len(data) > MAX_SUBTITLE_BYTES:
+        raise SubtitleError("Arquivo de legenda grande demais.")
+    return data
+
+
+def ingest_subtitle(subtitle, data=None, force=False):
+    # Extrai e grava as falas da legenda. data: conteúdo já baixado (senão,
+    # baixa de subtitle.file_url). Não faz nada se a URL e o conteúdo forem
+    # os mesmos da última ingestão. Devolve o SubtitleCues.
+    current = SubtitleCues.objects.filter(subtitle=subtitle).first()
+    if data is None:
+        if current and current.source_url == subtitle.file_url and not force:
+            return current
+        data = fetch_subtitle(subtitle.file_url)
+    digest = hashlib.sha256(data).hexdigest()
+    if current and current.source_digest == digest and not force:
+        if current.source_url != subtitle.file_url:
+            current.source_url = subtitle.file_url
+            current.save(update_fields=["source_url"])
+        return current
+
+    try:
+        cues = parse_cues(data.decode("utf-8-sig"))
+    except UnicodeDecodeError:
+        cues = parse_cues(data.decode("latin-1"))
+    stored, _ = SubtitleCues.objects.update_or_create(
+        subtitle=subtitle,
+        defaults={
+            "source_url": subtitle.file_url,
+            "source_digest": digest,
+            "starts_ms": [cue.start_ms for cue in cues],
+            "ends_ms": [cue.end_ms for cue in cues],
+            "texts": [cue.text for cue in cues],
+            "search": SearchVector(
+                Value(" ".join(plain_text(cue.text) for cue in cues)),
+                config=SEARCH_CONFIG,
+            ),
+            "parsed_at": timezone.now(),
+        },
+    )
+    return stored
+
+
+def ingest_on_commit(subtitles):
+    # Agenda a ingestão das legendas para depois do commit. O arquivo é
+    # externo: se o download falhar, o comando "ingest_subtitles" tenta de
+    # novo depois
+    subtitles = list(subtitles)
+
+    def ingest():
+        for subtitle in subtitles:
+            try:
+                ingest_subtitle(subtitle)
+            except Exception:
+                logger.exception("Falha ao processar a legenda %s", subtitle.pk)
+
+    if subtitles:
+        transaction.on_commit(ingest)
+
+
+class CueIndex:
+    # Índice em memória sobre os arrays de um SubtitleCues.
+    # As falas estão ordenadas pelo início, mas podem se sobrepor (o fim não é
+    # ordenado). Por isso o índice guarda também o maior fim visto até cada
+    # posição (max_ends, crescente): as falas que ainda não acabaram no
+    # instante t começam no primeiro i com max_ends[i] > t.
+
+    def __init__(self, starts_ms, ends_ms, texts):
+        self.starts = starts_ms
+        self.ends = ends_ms
+        self.texts = texts
+        self.max_ends = list(accumulate(ends_ms, max))
+
+    @classmethod
+    def for_cues(cls, cues):
+        return cls(cues.starts_ms, cues.ends_ms, cues.texts)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def cue(self, i):
+        return Cue(self.starts[i], self.ends[i], self.texts[i])
+
+    def between(self, start_ms, end_ms):
+        # Falas que se sobrepõem a [start_ms, end_ms), em ordem de início.
+        # O(log n + k), exceto quando há falas longas sobrepostas às do intervalo.
+        first = bisect_right(self.max_ends, start_ms)
+        last = bisect_left(self.starts, end_ms)
+        return [
+            self.cue(i) for i in range(first, last) if self.ends[i] > start_ms
+        ]
+
+    def at(self, ms):
+        # Falas em exibição no instante ms (normalmente zero ou uma)
+        return self.between(ms, ms + 1)
+
+
+def iter_webvtt(cues, chunk_size=200):
+    # Serializa as falas como WebVTT, em blocos de chunk_size falas, para
+    # StreamingHttpResponse
+    yield "WEBVTT\n\n"
+    block = []
+    for start, end, text in zip(cues.starts_ms, cues.ends_ms, cues.texts):
+        block.append(f"{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n\n")
+        if len(block) >= chunk_size:
+            yield "".join(block)
+            block = []
+    if block:
+        yield "".join(block)
+
+
+def plain_text(cue_text):
+    # Texto da fala sem as tags de formatação do WebVTT (<i>, <b>, <v Nome>...)
+    return _TAGS.sub("", cue_text)
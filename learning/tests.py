@@ -1,3 +1,1155 @@
-from django.test import TestCase
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Student, User
+from core.caching import _lock_key
+
+from . import search, study, subtitles, tts
+from .dashboard import build_dashboard
+from .exports import iter_export
+from .importer import ManifestError, import_course, import_manifest
+from .models import (
+    Course,
+    CourseStats,
+    Enrollment,
+    Lesson,
+    LessonFunnel,
+    LessonProgress,
+    LessonSpeech,
+    LessonTypeChoices,
+    Material,
+    Module,
+    QuestionKindChoices,
+    QuizAttempt,
+    QuizChoice,
+    QuizItemStats,
+    QuizQuestion,
+    SpeechChunk,
+    StudyDailyRollup,
+    StudySegment,
+    StudySession,
+    Subtitle,
+    SubtitleCues,
+)
+from .outline import _outline_key, build_course_outline, get_course_outline
+from .progress import next_lessons
+from .quiz import QuizError, get_compiled_quiz, grade_attempts, submit_attempt
+from .quiz_stats import SUM_FIELDS
+from .reports import refresh_reports
+
+
+class StudentCourseMixin:
+    # Um aluno matriculado em um curso de 1 módulo com 4 lições
+    def setUp(self):
+        guardian = User.objects.create_user("resp@example.com", "Responsável", "senha")
+        self.student = Student.objects.create(
+            user=guardian, nickname="Aluno", school_year="ano_5"
+        )
+        self.course = Course.objects.create(title="Frações")
+        self.module = Module.objects.create(
+            course=self.course, title="Introdução", module_order=1
+        )
+        self.lessons = [
+            Lesson.objects.create(module=self.module, title=f"Aula {i}", lesson_order=i)
+            for i in range(1, 5)
+        ]
+        self.enrollment = Enrollment.objects.create(
+            student=self.student, course=self.course
+        )
+
+    def reload(self):
+        self.enrollment.refresh_from_db()
+        return self.enrollment
+
+
+class EnrollmentProgressTests(StudentCourseMixin, TestCase):
+    def test_new_enrollment_counts_existing_lessons(self):
+        self.assertEqual(self.enrollment.total_lessons, 4)
+        self.assertEqual(self.enrollment.lessons_completed, 0)
+        self.assertEqual(self.enrollment.progress_percent, 0)
+
+    def test_completions_update_counters_and_completed_at(self):
+        for lesson in self.lessons[:3]:
+            LessonProgress.objects.create(student=self.student, lesson=lesson)
+        enrollment = self.reload()
+        self.assertEqual(enrollment.lessons_completed, 3)
+        self.assertEqual(enrollment.progress_percent, 75)
+        self.assertIsNotNone(enrollment.last_activity_at)
+        self.assertIsNone(enrollment.completed_at)
+
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[3])
+        enrollment = self.reload()
+        self.assertEqual(enrollment.progress_percent, 100)
+        self.assertIsNotNone(enrollment.completed_at)
+
+        # Uma lição nova reabre o curso
+        Lesson.objects.create(module=self.module, title="Extra", lesson_order=5)
+        enrollment = self.reload()
+        self.assertEqual(enrollment.total_lessons, 5)
+        self.assertEqual(enrollment.progress_percent, 80)
+        self.assertIsNone(enrollment.completed_at)
+
+    def test_deletes_keep_counters_consistent(self):
+        for lesson in self.lessons:
+            LessonProgress.objects.create(student=self.student, lesson=lesson)
+        LessonProgress.objects.filter(lesson=self.lessons[0]).delete()
+        self.assertEqual(self.reload().lessons_completed, 3)
+
+        self.lessons[1].delete()  # Apaga a lição e o progresso em cascata
+        enrollment = self.reload()
+        self.assertEqual(enrollment.total_lessons, 3)
+        self.assertEqual(enrollment.lessons_completed, 2)
+
+    def test_rebuild_command_fixes_drift(self):
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[0])
+        Enrollment.objects.update(lessons_completed=0, total_lessons=0)
+        call_command("rebuild_enrollment_progress", stdout=StringIO())
+        enrollment = self.reload()
+        self.assertEqual(enrollment.lessons_completed, 1)
+        self.assertEqual(enrollment.total_lessons, 4)
+        self.assertEqual(enrollment.progress_percent, 25)
+
+
+class NextLessonTests(StudentCourseMixin, TestCase):
+    def test_resolves_first_uncompleted_lesson_per_course(self):
+        # Um segundo módulo que vem antes do primeiro na ordem do curso
+        first = Module.objects.create(course=self.course, title="Antes", module_order=0)
+        intro = Lesson.objects.create(module=first, title="Abertura", lesson_order=1)
+        other = Course.objects.create(title="Vazio")
+        Enrollment.objects.create(student=self.student, course=other)
+
+        LessonProgress.objects.create(student=self.student, lesson=intro)
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[0])
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[2])
+        with CaptureQueriesContext(connection) as queries:
+            courses = {c["course"]: c for c in next_lessons(self.student)}
+        # Uma query, e id e título saem da mesma subquery
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0]["sql"].count('FROM "learning_lesson"'), 1)
+        resolved = courses[str(self.course.public_id)]
+        self.assertEqual(resolved["lesson"], str(self.lessons[1].public_id))
+        self.assertEqual(resolved["lesson_title"], "Aula 2")
+        self.assertIsNone(courses[str(other.public_id)]["lesson"])
+
+    def test_api_checks_guardian(self):
+        url = reverse("learning:next-lessons", args=[self.student.public_id])
+        self.client.force_login(self.student.user)
+        data = self.client.get(url).json()
+        self.assertEqual(data["courses"][0]["lesson"], str(self.lessons[0].public_id))
+
+        stranger = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(stranger)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class GuardianDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guardian = User.objects.create_user("resp@example.com", "Responsável", "senha")
+        self.students = [
+            Student.objects.create(
+                user=self.guardian, nickname=f"Aluno {i}", school_year="ano_5"
+            )
+            for i in range(10)
+        ]
+        self.lessons = []
+        for i in range(10):
+            course = Course.objects.create(title=f"Curso {i}")
+            module = Module.objects.create(course=course, title="Único", module_order=1)
+            self.lessons.append(
+                [
+                    Lesson.objects.create(
+                        module=module, title=f"Aula {j}", lesson_order=j
+                    )
+                    for j in (1, 2)
+                ]
+            )
+            for student in self.students:
+                Enrollment.objects.create(student=student, course=course)
+        for student in self.students:
+            LessonProgress.objects.create(student=student, lesson=self.lessons[0][0])
+
+    def test_fixed_query_count_for_10_students_by_10_courses(self):
+        with self.assertNumQueries(3):
+            data = build_dashboard(self.guardian.pk)
+        self.assertEqual(len(data["students"]), 10)
+        student = data["students"][0]
+        self.assertEqual(len(student["enrollments"]), 10)
+        self.assertEqual(student["lessons_completed"], 1)
+        self.assertEqual(student["lessons_this_week"], 1)
+        # A matrícula com atividade vem primeiro, apontando para a 2ª aula
+        self.assertEqual(
+            student["enrollments"][0]["next_lesson"], str(self.lessons[0][1].public_id)
+        )
+        self.assertEqual(
+            student["recent_activity"][0]["lesson"], str(self.lessons[0][0].public_id)
+        )
+
+    def test_cached_per_guardian_and_invalidated_by_progress(self):
+        url = reverse("learning:dashboard")
+        self.client.force_login(self.guardian)
+        self.client.get(url)
+        with self.assertNumQueries(2):  # Só sessão e usuário
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            LessonProgress.objects.create(
+                student=self.students[0], lesson=self.lessons[0][1]
+            )
+        first = self.client.get(url).json()["students"][0]
+        self.assertEqual(first["lessons_completed"], 2)
+        self.assertEqual(first["courses_completed"], 1)
+
+        # Outro responsável não vê estes alunos
+        other = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).json()["students"], [])
+
+    def test_transferred_student_leaves_previous_guardian_dashboard(self):
+        url = reverse("learning:dashboard")
+        other = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(other)
+        self.client.get(url)
+        self.client.force_login(self.guardian)
+        self.assertEqual(len(self.client.get(url).json()["students"]), 10)
+
+        student = self.students[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            student.user = other
+            student.save()
+        self.assertEqual(len(self.client.get(url).json()["students"]), 9)
+        self.client.force_login(other)
+        self.assertEqual(len(self.client.get(url).json()["students"]), 1)
+
+
+class ProgressExportTests(StudentCourseMixin, TestCase):
+    def test_csv_export_runs_single_query(self):
+        for lesson in self.lessons:
+            LessonProgress.objects.create(student=self.student, lesson=lesson)
+        with self.assertNumQueries(1):
+            lines = list(iter_export("progress", "csv"))
+        self.assertEqual(len(lines), 5)  # cabeçalho + 4 lições
+        self.assertIn("Frações / Módulo 1: Introdução / Aula 2: Aula 2", lines[2])
+
+    def test_guardian_export_only_sees_own_students(self):
+        other = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(other)
+        response = self.client.get(
+            reverse("learning:export", args=["enrollments"]), {"format": "jsonl"}
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+        self.client.force_login(self.student.user)
+        response = self.client.get(
+            reverse("learning:export", args=["enrollments"]), {"format": "jsonl"}
+        )
+        self.assertIn(b'"student_nickname": "Aluno"', b"".join(response.streaming_content))
+
+
+class CompletionIngestionTests(StudentCourseMixin, TestCase):
+    def post(self, events):
+        return self.client.post(
+            reverse("learning:completions"),
+            data={"events": events},
+            content_type="application/json",
+        )
+
+    def test_batch_is_deduplicated_and_counted(self):
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[0])
+        self.client.force_login(self.student.user)
+        student = str(self.student.public_id)
+        events = [
+            {"student": student, "lesson": str(self.lessons[0].public_id)},
+            {"student": student, "lesson": str(self.lessons[1].public_id),
+             "completed_at": "2026-01-02T10:00:00Z"},
+            {"student": student, "lesson": str(self.lessons[1].public_id),
+             "completed_at": "2026-01-01T10:00:00Z"},
+            {"student": student, "lesson": str(uuid.uuid4())},
+            {"student": "x", "lesson": "y"},
+        ]
+        response = self.post(events)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [r["status"] for r in response.json()["results"]],
+            ["duplicate", "duplicate", "created", "not_found", "invalid"],
+        )
+        progress = LessonProgress.objects.get(lesson=self.lessons[1])
+        self.assertEqual(progress.completed_at.day, 1)
+        self.assertEqual(self.reload().lessons_completed, 2)
+
+    def test_impossible_date_rejects_only_its_event(self):
+        self.client.force_login(self.student.user)
+        student = str(self.student.public_id)
+        response = self.post(
+            [
+                {"student": student, "lesson": str(self.lessons[0].public_id),
+                 "completed_at": "2024-02-30T10:00:00Z"},
+                {"student": student, "lesson": str(self.lessons[1].public_id)},
+            ]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [r["status"] for r in response.json()["results"]], ["invalid", "created"]
+        )
+
+    def test_other_guardians_students_are_rejected(self):
+        other = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(other)
+        response = self.post(
+            [{"student": str(self.student.public_id),
+              "lesson": str(self.lessons[0].public_id)}]
+        )
+        self.assertEqual(response.json()["results"][0]["status"], "forbidden")
+        self.assertFalse(LessonProgress.objects.exists())
+
+
+class StudentApiTests(StudentCourseMixin, TestCase):
+    # Views assíncronas de learning/api.py, servidas pelo AsyncClient (ASGI)
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    async def test_outline_matches_sync_view(self):
+        response = await self.async_client.get(
+            reverse("student-api:course-outline", args=[self.course.public_id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(), await sync_to_async(build_course_outline)(self.course)
+        )
+        missing = reverse("student-api:course-outline", args=[uuid.uuid4()])
+        self.assertEqual((await self.async_client.get(missing)).status_code, 404)
+
+    async def test_progress_checks_guardian(self):
+        await LessonProgress.objects.acreate(
+            student=self.student, lesson=self.lessons[0]
+        )
+        url = reverse("student-api:student-progress", args=[self.student.public_id])
+        await self.async_client.aforce_login(self.student.user)
+        data = (await self.async_client.get(url)).json()["courses"][0]
+        self.assertEqual(data["lessons_completed"], 1)
+        self.assertEqual(data["progress_percent"], 25)
+        self.assertEqual(data["next_lesson"], str(self.lessons[1].public_id))
+
+        stranger = await sync_to_async(User.objects.create_user)(
+            "outro@example.com", "Outro", "senha"
+        )
+        await self.async_client.aforce_login(stranger)
+        self.assertEqual((await self.async_client.get(url)).status_code, 403)
+
+    async def test_completions_write_and_refresh_counters(self):
+        await self.async_client.aforce_login(self.student.user)
+        student = str(self.student.public_id)
+        response = await self.async_client.post(
+            reverse("student-api:completions"),
+            data={
+                "events": [
+                    {"student": student, "lesson": str(lesson.public_id)}
+                    for lesson in self.lessons[:2]
+                ]
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["created"], 2)
+        enrollment = await Enrollment.objects.aget(pk=self.enrollment.pk)
+        self.assertEqual(enrollment.lessons_completed, 2)
+        self.assertEqual(enrollment.progress_percent, 50)
+
+
+class CourseOutlineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(title="Geometria")
+        for m in range(1, 4):
+            module = Module.objects.create(
+                course=self.course, title=f"Módulo {m}", module_order=m
+            )
+            for i in (2, 1, 3):
+                lesson = Lesson.objects.create(
+                    module=module, title=f"Aula {m}.{i}", lesson_order=i
+                )
+                Material.objects.create(
+                    lesson=lesson, title="Slides", file_url="https://example.com/s.pdf"
+                )
+
+    def test_outline_is_ordered_and_cached(self):
+        with self.assertNumQueries(5):
+            outline = get_course_outline(self.course.public_id)
+        self.assertEqual(outline["total_lessons"], 9)
+        self.assertEqual([m["order"] for m in outline["modules"]], [1, 2, 3])
+        self.assertEqual(
+            [lesson["order"] for lesson in outline["modules"][0]["lessons"]], [1, 2, 3]
+        )
+        self.assertEqual(len(outline["modules"][0]["lessons"][0]["materials"]), 1)
+        with self.assertNumQueries(0):
+            get_course_outline(self.course.public_id)
+
+    def test_edits_invalidate_outline(self):
+        get_course_outline(self.course.public_id)
+        lesson = Lesson.objects.filter(module__course=self.course).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson.title = "Renomeada"
+            lesson.save()
+        outline = get_course_outline(self.course.public_id)
+        titles = [les["title"] for m in outline["modules"] for les in m["lessons"]]
+        self.assertIn("Renomeada", titles)
+
+    def test_stale_outline_served_while_another_worker_recomputes(self):
+        get_course_outline(self.course.public_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = "Geometria plana"
+            self.course.save()
+        key = _outline_key(self.course.public_id)
+        cache.add(_lock_key(key), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_course_outline(self.course.public_id)["title"], "Geometria"
+            )
+        cache.delete(_lock_key(key))
+        self.assertEqual(
+            get_course_outline(self.course.public_id)["title"], "Geometria plana"
+        )
+
+    def test_outline_view(self):
+        response = self.client.get(
+            reverse("learning:course-outline", args=[self.course.public_id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Geometria")
+
+
+class CourseImportTests(TestCase):
+    def manifest(self, lessons_per_module=3):
+        return {
+            "public_id": "2b7c8f0e-4d1a-4f4e-9a4e-0c6f3f1b9d21",
+            "title": "Leitura",
+            "modules": [
+                {
+                    "title": f"Módulo {m}",
+                    "module_order": m,
+                    "lessons": [
+                        {
+                            "title": f"Aula {m}.{i}",
+                            "lesson_order": i,
+                            "lesson_type": "text",
+                            "materials": [
+                                {"title": "PDF", "file_url": "https://example.com/a.pdf"}
+                            ],
+                            "subtitles": [
+                                {"language_code": "pt-BR", "file_url": "https://example.com/a.vtt"}
+                            ],
+                        }
+                        for i in range(1, lessons_per_module + 1)
+                    ],
+                }
+                for m in (1, 2)
+            ],
+        }
+
+    def test_import_is_idempotent_and_keeps_progress(self):
+        result = import_course(self.manifest())
+        self.assertTrue(result.created)
+        self.assertEqual(result.lessons, 6)
+        lesson_ids = set(Lesson.objects.values_list("public_id", flat=True))
+
+        guardian = User.objects.create_user("r@example.com", "R", "senha")
+        student = Student.objects.create(user=guardian, nickname="A", school_year="ano_3")
+        course = Course.objects.get(public_id=result.public_id)
+        Enrollment.objects.create(student=student, course=course)
+        LessonProgress.objects.create(student=student, lesson=Lesson.objects.first())
+
+        # Reimportar com as ordens trocadas não duplica nem apaga nada
+        manifest = self.manifest()
+        manifest["modules"][0]["lessons"].reverse()
+        for i, lesson in enumerate(manifest["modules"][0]["lessons"], start=1):
+            lesson["lesson_order"] = i
+        with self.assertNumQueries(23):
+            result = import_course(manifest)
+        self.assertFalse(result.created)
+        self.assertEqual(set(Lesson.objects.values_list("public_id", flat=True)), lesson_ids)
+        self.assertEqual(Material.objects.count(), 6)
+        self.assertEqual(LessonProgress.objects.count(), 1)
+
+        # Lições fora do manifesto são removidas e os contadores acompanham
+        result = import_course(self.manifest(lessons_per_module=2))
+        self.assertEqual(result.removed_lessons, 2)
+        self.assertEqual(Enrollment.objects.get().total_lessons, 4)
+
+    def test_imported_subtitles_are_ingested_after_commit(self):
+        fetch = mock.patch.object(
+            subtitles, "fetch_subtitle", return_value=SAMPLE_SRT.encode()
+        )
+        with fetch as fetched, self.captureOnCommitCallbacks(execute=True):
+            import_course(self.manifest())
+        self.assertEqual((fetched.call_count, SubtitleCues.objects.count()), (6, 6))
+
+        # Só as legendas novas ou com outro arquivo são baixadas de novo
+        manifest = self.manifest()
+        subtitle = manifest["modules"][0]["lessons"][0]["subtitles"][0]
+        subtitle["file_url"] = "https://example.com/b.vtt"
+        with fetch as fetched, self.captureOnCommitCallbacks(execute=True):
+            import_course(manifest)
+        self.assertEqual(fetched.call_count, 1)
+
+    def test_invalid_manifest_writes_nothing(self):
+        manifest = self.manifest()
+        manifest["modules"][1]["lessons"][1]["lesson_order"] = 1
+        with self.assertRaises(ManifestError):
+            import_course(manifest)
+        manifest["public_id"] = str(uuid.uuid4())
+        manifest["modules"][1]["module_order"] = 1
+        with self.assertRaises(ManifestError):
+            import_course(manifest)
+        self.assertFalse(Course.objects.exists())
+
+        manifest = self.manifest()
+        manifest["modules"][0]["title"] = "M" * 256
+        with self.assertRaisesMessage(ManifestError, "255 caracteres"):
+            import_course(manifest)
+
+    def test_repeated_course_in_manifest_is_rejected(self):
+        # C, D, C no CSV: a segunda passada de C apagaria a Aula 1 e o progresso
+        other = str(uuid.uuid4())
+        course = self.manifest()["public_id"]
+        rows = [
+            ("Aula 1", course, 1),
+            ("Aula 1", other, 1),
+            ("Aula 2", course, 2),
+        ]
+        manifest = StringIO(
+            "course_public_id,course_title,module_order,module_title,"
+            "lesson_order,lesson_title\n"
+            + "".join(f"{c},Curso,1,Módulo,{order},{title}\n" for title, c, order in rows)
+        )
+        results = import_manifest(manifest, "csv")
+        next(results)
+        next(results)
+        with self.assertRaisesMessage(ManifestError, "mais de uma vez"):
+            next(results)
+        lessons = Lesson.objects.filter(module__course__public_id=course)
+        self.assertEqual(list(lessons.values_list("title", flat=True)), ["Aula 1"])
+
+
+class QuizMixin(StudentCourseMixin):
+    # A última lição vira um quiz de 2 questões com 3 alternativas cada
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.quiz = self.lessons[3]
+        self.quiz.lesson_type = LessonTypeChoices.QUIZ
+        self.quiz.save()
+        self.questions = []
+        # Questão 1: escolha única (B); questão 2: múltipla escolha (A e C), 2 pontos
+        for order, kind, points, correct in (
+            (1, QuestionKindChoices.SINGLE, 1, {2}),
+            (2, QuestionKindChoices.MULTIPLE, 2, {1, 3}),
+        ):
+            question = QuizQuestion.objects.create(
+                lesson=self.quiz, question_order=order, kind=kind,
+                prompt=f"Pergunta {order}", points=points,
+            )
+            question.choice_list = [
+                QuizChoice.objects.create(
+                    question=question, choice_order=n, text=f"Alternativa {n}",
+                    is_correct=n in correct,
+                )
+                for n in (1, 2, 3)
+            ]
+            self.questions.append(question)
+
+    def answers(self, first, second):
+        q1, q2 = self.questions
+        return {
+            str(q1.public_id): [str(q1.choice_list[n - 1].public_id) for n in first],
+            str(q2.public_id): [str(q2.choice_list[n - 1].public_id) for n in second],
+        }
+
+
+class QuizTests(QuizMixin, TestCase):
+    def test_compiled_quiz_is_cached_and_hides_the_key(self):
+        compiled = get_compiled_quiz(self.quiz.public_id)
+        self.assertEqual(compiled.answer_key, (0b010, 0b101))
+        self.assertEqual(compiled.max_score, 3)
+        self.assertNotIn("is_correct", compiled.questions[0]["choices"][0])
+        with self.assertNumQueries(0):
+            get_compiled_quiz(self.quiz.public_id)
+
+    def test_submit_grades_and_completes_the_lesson(self):
+        attempt, correct = submit_attempt(
+            self.student, self.quiz.public_id, self.answers([2], [1])
+        )
+        self.assertEqual((attempt.score, attempt.max_score), (1, 3))
+        self.assertEqual(correct, [True, False])
+        self.assertEqual(attempt.answers, [0b010, 0b001])
+        self.assertEqual(self.reload().lessons_completed, 1)
+
+        with self.assertRaises(QuizError):
+            submit_attempt(self.student, self.quiz.public_id, self.answers([1, 2], []))
+
+    def test_key_change_creates_new_revision(self):
+        first, _ = submit_attempt(self.student, self.quiz.public_id, self.answers([2], [1, 3]))
+        with self.captureOnCommitCallbacks(execute=True):
+            choice = self.questions[0].choice_list[0]
+            choice.is_correct = True
+            choice.save()
+            self.questions[0].choice_list[1].is_correct = False
+            self.questions[0].choice_list[1].save()
+        second, _ = submit_attempt(self.student, self.quiz.public_id, self.answers([2], [1, 3]))
+        self.assertNotEqual(first.revision_id, second.revision_id)
+        self.assertEqual((first.score, second.score), (3, 2))
+
+    def test_batch_grading_matches_individual_grading(self):
+        for first, second in ([2], [1, 3]), ([1], [1, 3]), ([2], []), ([], [3]):
+            submit_attempt(self.student, self.quiz.public_id, self.answers(first, second))
+        with self.assertNumQueries(2):
+            reports = grade_attempts(QuizAttempt.objects.filter(lesson=self.quiz), chunk_size=3)
+        (report,) = reports.values()
+        scores = dict(QuizAttempt.objects.values_list("id", "score"))
+        self.assertEqual(dict(zip(report.attempt_ids, report.scores)), scores)
+        self.assertEqual(report.correct, [2, 2])
+        self.assertEqual(report.answered, [3, 3])
+        self.assertEqual(report.mean_score, 6 / 4)
+
+    def test_quiz_views(self):
+        response = self.client.get(reverse("learning:lesson-quiz", args=[self.quiz.public_id]))
+        self.assertEqual(len(response.json()["questions"]), 2)
+        self.assertEqual(
+            self.client.get(
+                reverse("learning:lesson-quiz", args=[self.lessons[0].public_id])
+            ).status_code,
+            404,
+        )
+
+        url = reverse("learning:quiz-attempt", args=[self.quiz.public_id])
+        body = {"student": str(self.student.public_id), "answers": self.answers([2], [1, 3])}
+        self.client.force_login(self.student.user)
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["score"], 3)
+        response = self.client.post(
+            url, {**body, "student": "abc"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        other = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(other)
+        response = self.client.post(url, body, content_type="application/json")
+        self.assertEqual(response.status_code, 403)
+
+
+class QuizItemStatsTests(QuizMixin, TestCase):
+    def submit_all(self):
+        for first, second in ([2], [1, 3]), ([2], [1]), ([1], [1, 3]), ([1], []):
+            submit_attempt(self.student, self.quiz.public_id, self.answers(first, second))
+
+    def stats(self):
+        return {
+            s.question_id: s
+            for s in QuizItemStats.objects.filter(lesson=self.quiz).order_by("question_id")
+        }
+
+    def test_incremental_stats_match_full_rebuild(self):
+        self.submit_all()
+        incremental = {
+            pk: [getattr(s, name) for name in SUM_FIELDS] for pk, s in self.stats().items()
+        }
+        QuizItemStats.objects.update(attempts=0, correct=0, score_sum=0)
+        call_command("rebuild_quiz_stats", stdout=StringIO())
+        rebuilt = {pk: [getattr(s, name) for name in SUM_FIELDS] for pk, s in self.stats().items()}
+        self.assertEqual(rebuilt.keys(), incremental.keys())
+        for pk in rebuilt:
+            for a, b in zip(rebuilt[pk], incremental[pk]):
+                self.assertAlmostEqual(a, b)
+
+    def test_difficulty_and_discrimination(self):
+        self.submit_all()
+        q1, q2 = (self.stats()[q.pk] for q in self.questions)
+        # Notas: 3/3, 1/3, 2/3, 0 -> quem acerta a questão 1 tem notas 1 e 1/3
+        self.assertEqual((q1.attempts, q1.correct, q1.answered), (4, 2, 4))
+        self.assertEqual(q1.difficulty, 0.5)
+        self.assertEqual(q2.answered, 3)
+        self.assertAlmostEqual(q1.discrimination, 0.4472136, places=6)
+        self.assertGreater(q2.discrimination, q1.discrimination)
+
+    def test_lesson_admin_reads_stats_without_scanning_attempts(self):
+        self.submit_all()
+        admin_user = User.objects.create_superuser("admin@example.com", "Admin", "senha")
+        self.client.force_login(admin_user)
+        url = reverse("admin:learning_lesson_change", args=[self.quiz.pk])
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertContains(response, "Estatísticas do quiz")
+        self.assertFalse(
+            any("learning_quizattempt" in q["sql"] for q in captured.captured_queries)
+        )
+
+
+class LessonSpeechTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        course = Course.objects.create(title="Leitura")
+        module = Module.objects.create(course=course, title="Textos", module_order=1)
+        self.lesson = Lesson.objects.create(
+            module=module,
+            title="O ciclo da água",
+            lesson_order=1,
+            lesson_type=LessonTypeChoices.TEXT,
+            content="A água evapora. Depois vira nuvem!\nE volta como chuva?",
+        )
+
+    def test_split_sentences(self):
+        self.assertEqual(
+            tts.split_sentences(self.lesson.content),
+            ["A água evapora.", "Depois vira nuvem!", "E volta como chuva?"],
+        )
+        long = tts.split_sentences("palavra " * 50, max_chars=40)
+        self.assertTrue(all(len(chunk) <= 40 for chunk in long))
+        self.assertEqual(" ".join(long), ("palavra " * 50).strip())
+
+    def test_edit_only_renders_changed_sentences(self):
+        speech, synthesized = tts.render_lesson_speech(self.lesson)
+        self.assertEqual((len(speech.chunks), synthesized), (3, 3))
+        self.assertEqual(tts.render_lesson_speech(self.lesson)[1], 0)
+
+        self.lesson.content = "A água evapora. Depois vira nuvem!\nE cai como granizo."
+        self.lesson.save()
+        speech, synthesized = tts.render_lesson_speech(self.lesson)
+        self.assertEqual(synthesized, 1)
+        self.assertEqual(SpeechChunk.objects.count(), 4)
+        self.assertEqual(LessonSpeech.objects.get().chunks, speech.chunks)
+
+        # Outra velocidade é outro áudio
+        self.assertEqual(tts.render_lesson_speech(self.lesson, rate=1.25)[1], 3)
+        with self.assertRaises(ValueError):
+            tts.render_lesson_speech(self.lesson, rate=3)
+
+    def test_save_renders_only_changed_lessons_after_commit(self):
+        render = mock.patch.object(
+            tts, "render_in_background", side_effect=tts.render_changed_lessons
+        )
+        with render as rendered, self.captureOnCommitCallbacks(execute=True):
+            self.lesson.save()
+        rendered.assert_called_once_with([self.lesson.pk])
+        self.assertEqual(SpeechChunk.objects.count(), 3)
+
+        # Mesmo conteúdo: nada a sintetizar
+        with mock.patch.object(tts, "render_lesson_speech") as render_lesson:
+            tts.render_changed_lessons([self.lesson.pk])
+        render_lesson.assert_not_called()
+
+    def test_playlist_renders_on_first_read(self):
+        url = reverse("learning:lesson-speech", args=[self.lesson.public_id])
+        chunks = self.client.get(url).json()["chunks"]
+        self.assertEqual([c["text"] for c in chunks][0], "A água evapora.")
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+    def test_chunk_is_served_with_byte_ranges(self):
+        speech, _ = tts.render_lesson_speech(self.lesson)
+        chunk = SpeechChunk.objects.get(digest=speech.chunks[0])
+        url = reverse("learning:speech-chunk", args=[chunk.digest])
+
+        response = self.client.get(url)
+        audio = b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(audio), chunk.size)
+        self.assertTrue(audio.startswith(b"RIFF"))
+
+        response = self.client.get(url, headers={"Range": "bytes=10-19"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{chunk.size}")
+        self.assertEqual(b"".join(response.streaming_content), audio[10:20])
+
+        response = self.client.get(url, headers={"Range": "bytes=-4"})
+        self.assertEqual(b"".join(response.streaming_content), audio[-4:])
+
+        response = self.client.get(url, headers={"Range": f"bytes={chunk.size}-"})
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(url, headers={"If-None-Match": f'"{chunk.digest}"'})
+        self.assertEqual(response.status_code, 304)
+
+
+SAMPLE_VTT = """WEBVTT
+
+NOTE comentário ignorado
+
+1
+00:00:01.000 --> 00:00:04.000
+Olá, turma!
+
+00:00:03.500 --> 00:00:10.000 line:0
+<v Professora>Hoje: <i>frações</i>
+
+00:12.000 --> 00:14.250
+Vamos começar.
+"""
+
+SAMPLE_SRT = """1\r\n00:00:01,000 --> 00:00:02,500\r\nPrimeira fala\r\n\r\n2\r\n00:01:00,000 --> 00:01:02,000\r\nSegunda\r\nem duas linhas\r\n"""
+
+
+class SubtitleTests(TestCase):
+    def setUp(self):
+        course = Course.objects.create(title="Ciências")
+        module = Module.objects.create(course=course, title="Água", module_order=1)
+        lesson = Lesson.objects.create(module=module, title="Vídeo", lesson_order=1)
+        with mock.patch.object(subtitles, "fetch_subtitle", return_value=b""):
+            self.subtitle = Subtitle.objects.create(
+                lesson=lesson, language_code="pt-BR", file_url="https://cdn/a.vtt"
+            )
+
+    def test_parses_webvtt_and_srt(self):
+        cues = subtitles.parse_cues(SAMPLE_VTT)
+        self.assertEqual(
+            [(c.start_ms, c.end_ms) for c in cues],
+            [(1000, 4000), (3500, 10000), (12000, 14250)],
+        )
+        self.assertEqual(subtitles.plain_text(cues[1].text), "Hoje: frações")
+
+        cues = subtitles.parse_cues(SAMPLE_SRT)
+        self.assertEqual(cues[1].start_ms, 60000)
+        self.assertEqual(cues[1].text, "Segunda\nem duas linhas")
+
+    def test_index_finds_overlapping_cues(self):
+        index = subtitles.CueIndex(
+            [0, 1000, 2000, 9000], [20000, 1500, 3000, 9500], ["a", "b", "c", "d"]
+        )
+        self.assertEqual([c.text for c in index.at(1200)], ["a", "b"])
+        self.assertEqual([c.text for c in index.at(1500)], ["a"])
+        self.assertEqual([c.text for c in index.between(2500, 9001)], ["a", "c", "d"])
+        self.assertEqual(index.at(25000), [])
+
+    def test_ingest_runs_once_per_source(self):
+        with mock.patch.object(
+            subtitles, "fetch_subtitle", return_value=SAMPLE_VTT.encode()
+        ) as fetch:
+            cues = subtitles.ingest_subtitle(self.subtitle, force=True)
+            self.assertEqual(cues.starts_ms, [1000, 3500, 12000])
+            subtitles.ingest_subtitle(self.subtitle)
+            self.assertEqual(fetch.call_count, 1)
+
+            # URL nova com o mesmo conteúdo: baixa, mas não reprocessa
+            self.subtitle.file_url = "https://cdn/b.vtt"
+            self.subtitle.save()
+            subtitles.ingest_subtitle(self.subtitle)
+            self.assertEqual(fetch.call_count, 2)
+        cues.refresh_from_db()
+        self.assertEqual(cues.source_url, "https://cdn/b.vtt")
+
+    def test_only_web_urls_are_fetched(self):
+        for url in ("file:///etc/passwd", "ftp://cdn/a.vtt"):
+            with self.assertRaises(subtitles.SubtitleError):
+                subtitles.fetch_subtitle(url)
+
+    def test_ingest_on_save(self):
+        with (
+            mock.patch.object(
+                subtitles, "fetch_subtitle", return_value=SAMPLE_SRT.encode()
+            ),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.subtitle.file_url = "https://cdn/a.srt"
+            self.subtitle.save()
+        self.assertEqual(SubtitleCues.objects.get().texts[0], "Primeira fala")
+
+    def test_webvtt_and_cues_views(self):
+        vtt_url = reverse("learning:subtitle-webvtt", args=[self.subtitle.public_id])
+        self.assertRedirects(
+            self.client.get(vtt_url), "https://cdn/a.vtt", fetch_redirect_response=False
+        )
+
+        subtitles.ingest_subtitle(self.subtitle, data=SAMPLE_VTT.encode())
+        response = self.client.get(vtt_url)
+        self.assertEqual(response["Content-Type"], "text/vtt; charset=utf-8")
+        served = b"".join(response.streaming_content).decode()
+        self.assertTrue(served.startswith("WEBVTT\n\n00:00:01.000 --> 00:00:04.000"))
+        self.assertEqual(subtitles.parse_cues(served), subtitles.parse_cues(SAMPLE_VTT))
+
+        cues_url = reverse("learning:subtitle-cues", args=[self.subtitle.public_id])
+        data = self.client.get(cues_url, {"at": 3600}).json()
+        self.assertEqual([c["start_ms"] for c in data["cues"]], [1000, 3500])
+        data = self.client.get(cues_url, {"start": 11000, "end": 20000}).json()
+        self.assertEqual(data["cues"][0]["text"], "Vamos começar.")
+        self.assertEqual(self.client.get(cues_url).status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(
+            title="Botânica", description="Como as plantas crescem e se alimentam."
+        )
+        module = Module.objects.create(course=self.course, title="Raízes", module_order=1)
+        self.lesson = Lesson.objects.create(
+            module=module,
+            title="Fotossíntese das plantas",
+            lesson_type=LessonTypeChoices.TEXT,
+            content="A luz do sol vira alimento.",
+            lesson_order=1,
+        )
+        self.other = Lesson.objects.create(
+            module=module,
+            title="Revisão",
+            lesson_type=LessonTypeChoices.TEXT,
+            content="Hoje revisamos o que a planta precisa: água e luz.",
+            lesson_order=2,
+        )
+        Material.objects.create(
+            lesson=self.lesson, title="Mapa das plantas", file_url="https://cdn/m.pdf"
+        )
+        with mock.patch.object(subtitles, "fetch_subtitle", return_value=b""):
+            subtitle = Subtitle.objects.create(
+                lesson=self.lesson, language_code="pt-BR", file_url="https://cdn/s.vtt"
+            )
+        subtitles.ingest_subtitle(
+            subtitle,
+            data=b"WEBVTT\n\n00:01.000 --> 00:02.000\n<i>As folhas captam luz</i>\n",
+        )
+
+    def test_ranks_titles_above_bodies_with_stemming(self):
+        results = search.search("planta", kinds=["lesson"])
+        # "plantas" no título (peso A) vem antes de "planta" no conteúdo
+        self.assertEqual(
+            [r.lesson_id for r in results],
+            [str(self.lesson.public_id), str(self.other.public_id)],
+        )
+        self.assertIn("<mark>planta</mark>", results[1].headline)
+
+    def test_searches_every_kind(self):
+        kinds = {r.kind for r in search.search("plantas")}
+        self.assertEqual(kinds, {"course", "lesson", "material"})
+
+        (result,) = search.search("folha")
+        self.assertEqual(result.kind, "subtitle")
+        self.assertEqual(result.lesson_id, str(self.lesson.public_id))
+        self.assertIn("<mark>folhas</mark>", result.headline)
+        self.assertNotIn("<i>", result.headline)
+        self.assertEqual(search.search("   "), [])
+
+    def test_headlines_escape_html(self):
+        self.other.content = "Cuidado com <script>alert(1)</script> na planta."
+        self.other.save()
+        (result,) = search.search("cuidado", kinds=["lesson"])
+        self.assertIn("&lt;script&gt;", result.headline)
+        self.assertIn("<mark>Cuidado</mark>", result.headline)
+        self.assertNotIn("<script>", result.headline)
+
+    def test_typos_in_titles_need_trigrams(self):
+        if not search.trigram_available():
+            self.skipTest("Extensão pg_trgm não instalada.")
+        (result,) = search.search("botanica", kinds=["course"])
+        self.assertEqual(result.course_id, str(self.course.public_id))
+
+    def test_search_api(self):
+        url = reverse("learning:search")
+        search.trigram_available()
+        with self.assertNumQueries(2):
+            data = self.client.get(url, {"q": "luz", "kind": ["lesson", "subtitle"]}).json()
+        self.assertEqual(
+            [r["kind"] for r in data["results"]], ["lesson", "lesson", "subtitle"]
+        )
+        with self.assertNumQueries(1):
+            data = self.client.get(url, {"q": "luz", "kind": ["lesson"] * 2}).json()
+        self.assertEqual([r["kind"] for r in data["results"]], ["lesson", "lesson"])
+        self.assertEqual(self.client.get(url, {"q": "luz", "kind": "x"}).status_code, 400)
+        self.assertEqual(
+            self.client.get(url, {"q": "luz", "kind": ["lesson"] * 5}).status_code, 400
+        )
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_admin_search_uses_full_text(self):
+        admin_user = User.objects.create_superuser("admin@example.com", "Admin", "senha")
+        self.client.force_login(admin_user)
+        response = self.client.get(
+            reverse("admin:learning_lesson_changelist"), {"q": "alimentos"}
+        )
+        self.assertEqual(
+            [lesson.pk for lesson in response.context["cl"].result_list], [self.lesson.pk]
+        )
+
+        # Autocomplete: o termo ainda incompleto casa pelo começo do título
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "term": "Botân",
+                "app_label": "learning",
+                "model_name": "module",
+                "field_name": "course",
+            },
+        )
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], [str(self.course.pk)]
+        )
+
+
+class StudySessionTests(StudentCourseMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.start = timezone.now() - timedelta(hours=1)
+
+    def post_json(self, url, data):
+        return self.client.post(url, data, content_type="application/json")
+
+    def beat(self, buffer, state, seconds):
+        return study.heartbeat(buffer, state, self.start + timedelta(seconds=seconds))
+
+    def test_heartbeats_are_coalesced_into_segments(self):
+        session = study.start_session(self.student, self.lessons[0], now=self.start)
+        buffer = study.get_buffer(session.public_id)
+        with self.assertNumQueries(0):
+            for second in range(0, 301, 30):  # 11 heartbeats em foco
+                self.beat(buffer, "focus", second)
+        for second in (330, 360, 390):
+            self.beat(buffer, "break", second)
+        # Heartbeats pararam: volta depois de um intervalo maior que HEARTBEAT_GAP
+        self.beat(buffer, "focus", 600)
+        self.beat(buffer, "focus", 660)
+        study.end_session(buffer, ended_at=self.start + timedelta(seconds=700))
+
+        segments = list(StudySegment.objects.values_list("state", "heartbeats"))
+        self.assertEqual(segments, [("focus", 11), ("break", 3), ("focus", 2)])
+        # Foco 0→330 (até a pausa), pausa 330→420 e foco 600→690 (cada trecho
+        # interrompido conta o intervalo do último heartbeat)
+        session.refresh_from_db()
+        self.assertEqual(
+            (session.focus_seconds, session.break_seconds, session.break_count),
+            (420, 90, 1),
+        )
+        rollup = StudyDailyRollup.objects.get()
+        self.assertEqual((rollup.sessions, rollup.focus_seconds), (1, 420))
+        with self.assertRaises(study.StudyError):
+            study.get_buffer(session.public_id)
+
+    def test_flush_closes_abandoned_sessions(self):
+        session = study.start_session(self.student, now=self.start)
+        for second in (0, 60, 120):
+            self.beat(study.get_buffer(session.public_id), "focus", second)
+        five_minutes_later = self.start + timedelta(minutes=5)
+        self.assertEqual(study.flush_idle_sessions(five_minutes_later), (1, 0))
+        self.assertEqual(study.flush_idle_sessions(), (0, 1))
+        session.refresh_from_db()
+        self.assertEqual(session.ended_at, self.start + timedelta(seconds=150))
+        self.assertEqual(session.focus_seconds, 150)
+
+    def test_heartbeat_after_end_does_not_revive_session(self):
+        session = study.start_session(self.student, now=self.start)
+        stale = study.get_buffer(session.public_id)
+        study.end_session(study.get_buffer(session.public_id))
+        with self.assertRaises(study.StudyError):
+            self.beat(stale, "focus", 30)
+        self.assertIsNone(cache.get(f"learning:study:{session.public_id}"))
+        self.assertFalse(StudySegment.objects.exists())
+
+    def test_segment_is_written_once_by_concurrent_writers(self):
+        session = study.start_session(self.student, now=self.start)
+        for second in (0, 60):
+            self.beat(study.get_buffer(session.public_id), "focus", second)
+        # Um worker leu o buffer antes de o comando gravar o trecho parado
+        stale = study.get_buffer(session.public_id)
+        study.flush_idle_sessions(self.start + timedelta(minutes=5))
+        self.beat(stale, "focus", 300)
+        self.assertEqual(StudySegment.objects.count(), 1)
+        self.assertEqual(stale["segment"]["beats"], 1)
+
+        # Sessão com o lock ocupado fica para a próxima rodada
+        cache.add(f"learning:study:{session.public_id}:lock", 1)
+        self.assertEqual(study.flush_idle_sessions(), (0, 0))
+
+    def test_flush_command_requires_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, "CACHE_BACKEND=redis"):
+            call_command("flush_study_sessions")
+
+    def test_api_flow(self):
+        self.client.force_login(self.student.user)
+        response = self.post_json(
+            reverse("learning:study-session-start"),
+            {"student": str(self.student.public_id)},
+        )
+        self.assertEqual(response.status_code, 201)
+        public_id = response.json()["public_id"]
+        url = reverse("learning:study-heartbeat", args=[public_id])
+        with self.assertNumQueries(2):  # Só sessão e usuário
+            response = self.post_json(url, {"state": "focus"})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.post_json(url, {"state": "nap"}).status_code, 400)
+
+        end_url = reverse("learning:study-session-end", args=[public_id])
+        self.assertIsNotNone(self.client.post(end_url).json()["ended_at"])
+        self.assertEqual(self.post_json(url, {"state": "focus"}).status_code, 409)
+        report = self.client.get(
+            reverse("learning:study-time", args=[self.student.public_id])
+        ).json()
+        self.assertEqual(report["days"][0]["sessions"], 1)
+
+        stranger = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.client.force_login(stranger)
+        session = StudySession.objects.get()
+        session.ended_at = None
+        session.save()
+        cache.clear()
+        self.assertEqual(self.post_json(url, {"state": "focus"}).status_code, 403)
+
+
+class CourseReportTests(StudentCourseMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        guardian = User.objects.create_user("outro@example.com", "Outro", "senha")
+        self.other = Student.objects.create(
+            user=guardian, nickname="Outro", school_year="ano_5"
+        )
+        Enrollment.objects.create(student=self.other, course=self.course)
+        # enrolled_at é auto_now_add: recua a matrícula por fora do save()
+        Enrollment.objects.filter(student=self.other).update(
+            enrolled_at=timezone.now() - timedelta(days=4)
+        )
+        for lesson in self.lessons:
+            LessonProgress.objects.create(student=self.other, lesson=lesson)
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[0])
+
+    def test_views_only_change_on_refresh(self):
+        refresh_reports()
+        stats = CourseStats.objects.get(course=self.course)
+        self.assertEqual((stats.enrollments, stats.completions), (2, 1))
+        self.assertEqual(stats.completion_rate, 0.5)
+        self.assertAlmostEqual(stats.median_days_to_complete, 4, places=2)
+        funnel = LessonFunnel.objects.filter(course=self.course)
+        self.assertEqual(
+            [(step.completed, step.drop_off) for step in funnel],
+            [(2, 0), (1, 1), (1, 0), (1, 0)],
+        )
+
+        LessonProgress.objects.create(student=self.student, lesson=self.lessons[1])
+        self.assertEqual(LessonFunnel.objects.get(lesson=self.lessons[1]).completed, 1)
+        refresh_reports()
+        self.assertEqual(LessonFunnel.objects.get(lesson=self.lessons[1]).completed, 2)
+
+    def test_admin_dashboard(self):
+        refresh_reports()
+        admin_user = User.objects.create_superuser("admin@example.com", "Admin", "senha")
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse("admin:learning_coursestats_changelist"))
+        self.assertContains(response, "50%")
+        response = self.client.get(
+            reverse("admin:learning_coursestats_change", args=[self.course.pk])
+        )
+        self.assertContains(response, "Abandono desde a anterior")
+        self.assertEqual(len(response.context["funnel"]), 4)
+        response = self.client.post(reverse("admin:learning_coursestats_refresh"))
+        self.assertRedirects(response, reverse("admin:learning_coursestats_changelist"))
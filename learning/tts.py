@@ -0,0 +1,286 @@
+# Em /learning/tts.py
+#
+# Áudio pré-renderizado (text-to-speech) das lições de texto.
+# O conteúdo é dividido em frases; cada frase vira um SpeechChunk endereçado
+# pelo hash de (texto, voz, velocidade, motor) e gravado uma única vez no
+# storage. Editar a lição só sintetiza as frases que mudaram. As frases que
+# faltam são sintetizadas em paralelo (pool de threads), já que o custo é de
+# espera pelo motor, não de CPU do Django.
+#
+# O motor é plugável: settings.TTS_SYNTHESIZER aponta para uma subclasse de
+# Synthesizer. O OfflineSynthesizer (padrão) não depende de rede e é o usado
+# nos testes.
+#
+# Lições salvas ou importadas são renderizadas depois do commit, numa fila
+# em segundo plano de cada processo (render_in_background): quem salvou não
+# espera a síntese. Ao sair, o processo termina a fila antes; se ele cair, o
+# áudio sai na primeira leitura ou pelo comando "render_lesson_speech".
+
+import hashlib
+import io
+import logging
+import math
+import re
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Lesson, LessonSpeech, LessonTypeChoices, SpeechChunk
+
+logger = logging.getLogger(__name__)
+
+# Fim de frase: pontuação seguida de espaço, ou quebra de linha
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+|\n+")
+_SPACES = re.compile(r"\s+")
+
+
+class Synthesizer:
+    # Interface dos motores de TTS
+    name = "base"  # Entra no digest: trocar de motor re-renderiza tudo
+    content_type = "audio/wav"
+    extension = "wav"
+
+    def synthesize(self, text, voice, rate):
+        # Devolve (bytes do áudio, duração em ms ou None)
+        raise NotImplementedError
+
+
+class OfflineSynthesizer(Synthesizer):
+    # Motor local e determinístico, sem rede: um tom curto por palavra
+    # (WAV PCM de 8 bits, 8 kHz, mono). Serve para desenvolvimento e testes.
+    name = "offline-1"
+    sample_rate = 8000
+
+    def synthesize(self, text, voice, rate):
+        frames = bytearray()
+        word_samples = int(self.sample_rate * 0.12 / rate)
+        pause = bytes([128]) * int(self.sample_rate * 0.05 / rate)
+        for word in text.split():
+            frequency = 300 + int(hashlib.md5(f"{voice}:{word}".encode()).hexdigest()[:2], 16)
+            step = 2 * math.pi * frequency / self.sample_rate
+            frames.extend(
+                128 + int(60 * math.sin(step * n)) for n in range(word_samples)
+            )
+            frames.extend(pause)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as audio:
+            audio.setnchannels(1)
+            audio.setsampwidth(1)
+            audio.setframerate(self.sample_rate)
+            audio.writeframes(bytes(frames))
+        return buffer.getvalue(), len(frames) * 1000 // self.sample_rate
+
+
+@cache
+def _load_synthesizer(path):
+    return import_string(path)()
+
+
+def get_synthesizer():
+    return _load_synthesizer(settings.TTS_SYNTHESIZER)
+
+
+def split_sentences(text, max_chars=None):
+    # Divide o texto em frases; frases longas demais são quebradas entre
+    # palavras para nenhum trecho passar de max_chars
+    max_chars = max_chars or settings.TTS_MAX_CHUNK_CHARS
+    chunks = []
+    for sentence in _SENTENCE_END.split(text or ""):
+        sentence = _SPACES.sub(" ", sentence).strip()
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+def chunk_digest(synthesizer, text, voice, rate):
+    key = f"{synthesizer.name}\0{voice}\0{rate:g}\0{text}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def content_digest(text):
+    return hashlib.sha256((text or "").encode()).hexdigest()
+
+
+def chunk_path(digest, extension):
+    return f"tts/{digest[:2]}/{digest}.{extension}"
+
+
+def validate_voice(voice=None, rate=None):
+    # Só vozes e velocidades configuradas: cada combinação nova é um áudio
+    # inteiro a mais para sintetizar e guardar
+    voice = voice or settings.TTS_VOICES[0]
+    rate = float(rate) if rate not in (None, "") else 1.0
+    if voice not in settings.TTS_VOICES:
+        raise ValueError(f"Voz não disponível: {voice}.")
+    if rate not in settings.TTS_RATES:
+        raise ValueError(f"Velocidade não disponível: {rate:g}.")
+    return voice, rate
+
+
+def _synthesize_chunk(synthesizer, digest, text, voice, rate):
+    # Roda nas threads do pool: sintetiza e grava no storage (sem tocar no banco)
+    path = chunk_path(digest, synthesizer.extension)
+    audio, duration_ms = synthesizer.synthesize(text, voice, rate)
+    if not default_storage.exists(path):
+        path = default_storage.save(path, ContentFile(audio))
+    return SpeechChunk(
+        digest=digest,
+        text=text,
+        voice=voice,
+        rate=rate,
+        audio=path,
+        content_type=synthesizer.content_type,
+        size=len(audio),
+        duration_ms=duration_ms,
+    )
+
+
+def render_lesson_speech(lesson, voice=None, rate=None, workers=None):
+    # Gera (ou atualiza) o áudio da lição. Devolve (LessonSpeech, quantidade
+    # de trechos sintetizados agora). Trechos já existentes são reaproveitados.
+    voice, rate = validate_voice(voice, rate)
+    if lesson.lesson_type != LessonTypeChoices.TEXT:
+        raise ValueError("Só lições de texto têm áudio.")
+    synthesizer = get_synthesizer()
+    sentences = split_sentences(lesson.content)
+    digests = [chunk_digest(synthesizer, text, voice, rate) for text in sentences]
+
+    existing = set(
+        SpeechChunk.objects.filter(digest__in=digests).values_list("digest", flat=True)
+    )
+    missing = {}
+    for digest, text in zip(digests, sentences):
+        if digest not in existing:
+            missing[digest] = text
+    if missing:
+        with ThreadPoolExecutor(max_workers=workers or settings.TTS_WORKERS) as pool:
+            created = list(
+                pool.map(
+                    lambda item: _synthesize_chunk(synthesizer, *item, voice, rate),
+                    missing.items(),
+                )
+            )
+        SpeechChunk.objects.bulk_create(created, ignore_conflicts=True)
+
+    speech, _ = LessonSpeech.objects.update_or_create(
+        lesson=lesson,
+        voice=voice,
+        rate=rate,
+        defaults={
+            "content_digest": content_digest(lesson.content),
+            "chunks": digests,
+            "rendered_at": timezone.now(),
+        },
+    )
+    return speech, len(missing)
+
+
+def get_lesson_speech(lesson, voice=None, rate=None):
+    # Áudio atual da lição; renderiza na hora só se ainda não existir ou se o
+    # conteúdo mudou desde a última geração
+    voice, rate = validate_voice(voice, rate)
+    speech = LessonSpeech.objects.filter(lesson=lesson, voice=voice, rate=rate).first()
+    if speech is None or speech.content_digest != content_digest(lesson.content):
+        speech, _ = render_lesson_speech(lesson, voice, rate)
+    return speech
+
+
+# Uma thread por processo: as lições entram em fila, e cada uma já sintetiza
+# seus trechos em paralelo (TTS_WORKERS)
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-render")
+
+
+def render_in_background(lesson_ids):
+    # Fora da thread da requisição; chame depois do commit
+    _background.submit(_render_in_thread, list(lesson_ids))
+
+
+def _render_in_thread(lesson_ids):
+    # A thread tem conexão própria com o banco: fecha ao terminar
+    close_old_connections()
+    try:
+        render_changed_lessons(lesson_ids)
+    finally:
+        connection.close()
+
+
+def render_changed_lessons(lesson_ids):
+    # Gera (voz e velocidade padrão) o áudio das lições de texto que ainda não
+    # têm áudio do conteúdo atual. Uma falha do motor não impede as outras
+    # lições (o áudio que faltar é gerado na primeira leitura).
+    voice, rate = validate_voice()
+    rendered = dict(
+        LessonSpeech.objects.filter(
+            lesson_id__in=lesson_ids, voice=voice, rate=rate
+        ).values_list("lesson_id", "content_digest")
+    )
+    lessons = Lesson.objects.filter(pk__in=lesson_ids, lesson_type=LessonTypeChoices.TEXT)
+    for lesson in lessons:
+        if rendered.get(lesson.pk) == content_digest(lesson.content):
+            continue
+        try:
+            render_lesson_speech(lesson, voice, rate)
+        except Exception:
+            logger.exception("Falha ao gerar o áudio da lição %s", lesson.pk)
+
+
+def playlist(lesson, voice=None, rate=None):
+    # Trechos na ordem de leitura, com texto e duração (para sincronizar o
+    # destaque da frase no player). 2 queries quando o áudio já existe.
+    speech = get_lesson_speech(lesson, voice, rate)
+    chunks = SpeechChunk.objects.in_bulk(speech.chunks, field_name="digest")
+    if len(chunks) < len(set(speech.chunks)):
+        # Algum trecho foi removido por prune_chunks(): gera de novo
+        speech, _ = render_lesson_speech(lesson, speech.voice, speech.rate)
+        chunks = SpeechChunk.objects.in_bulk(speech.chunks, field_name="digest")
+    return speech, [
+        {
+            "digest": digest,
+            "text": chunks[digest].text,
+            "duration_ms": chunks[digest].duration_ms,
+        }
+        for digest in speech.chunks
+    ]
+
+
+def prune_chunks(older_than=timedelta(days=1), batch_size=1000):
+    # Remove trechos (e arquivos) que nenhuma lição usa mais. Trechos recentes
+    # ficam: podem ser de uma geração ainda em andamento. Devolve a quantidade.
+    in_use = set()
+    for chunks in LessonSpeech.objects.values_list("chunks", flat=True).iterator():
+        in_use.update(chunks)
+    candidates = SpeechChunk.objects.filter(created_at__lt=timezone.now() - older_than)
+    removed = 0
+    batch = []
+    for pk, digest, path in candidates.values_list("pk", "digest", "audio").iterator(
+        chunk_size=batch_size
+    ):
+        if digest in in_use:
+            continue
+        batch.append((pk, path))
+        if len(batch) >= batch_size:
+            removed += _delete_chunks(batch)
+            batch = []
+    if batch:
+        removed += _delete_chunks(batch)
+    return removed
+
+
+def _delete_chunks(batch):
+    for _, path in batch:
+        default_storage.delete(path)
+    SpeechChunk.objects.filter(pk__in=[pk for pk, _ in batch]).delete()
+    return len(batch)
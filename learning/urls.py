@@ -0,0 +1,61 @@
+from django.urls import path
+
+from . import views
+
+app_name = "learning"
+
+urlpatterns = [
+    path(
+        "courses/<uuid:public_id>/outline/",
+        views.course_outline,
+        name="course-outline",
+    ),
+    path("lessons/<uuid:public_id>/quiz/", views.lesson_quiz, name="lesson-quiz"),
+    path(
+        "lessons/<uuid:public_id>/quiz/attempts/",
+        views.quiz_attempt,
+        name="quiz-attempt",
+    ),
+    path("lessons/<uuid:public_id>/speech/", views.lesson_speech, name="lesson-speech"),
+    path("speech/<str:digest>/", views.speech_chunk, name="speech-chunk"),
+    path(
+        "subtitles/<uuid:public_id>.vtt",
+        views.subtitle_webvtt,
+        name="subtitle-webvtt",
+    ),
+    path(
+        "subtitles/<uuid:public_id>/cues/",
+        views.subtitle_cues,
+        name="subtitle-cues",
+    ),
+    path("dashboard/", views.guardian_dashboard, name="dashboard"),
+    path(
+        "students/<uuid:public_id>/next-lessons/",
+        views.student_next_lessons,
+        name="next-lessons",
+    ),
+    path(
+        "students/<uuid:public_id>/progress/",
+        views.student_progress_view,
+        name="student-progress",
+    ),
+    path(
+        "students/<uuid:public_id>/study-time/",
+        views.student_study_time,
+        name="study-time",
+    ),
+    path("study/sessions/", views.study_session_start, name="study-session-start"),
+    path(
+        "study/sessions/<uuid:public_id>/heartbeat/",
+        views.study_heartbeat,
+        name="study-heartbeat",
+    ),
+    path(
+        "study/sessions/<uuid:public_id>/end/",
+        views.study_session_end,
+        name="study-session-end",
+    ),
+    path("search/", views.search_view, name="search"),
+    path("completions/", views.lesson_completions, name="completions"),
+    path("exports/<str:kind>/", views.export_my_students, name="export"),
+]
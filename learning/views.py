@@ -1,3 +1,417 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.http import (
+    Http404,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_POST
+
+from core.http import ranged_file_response
+from core.instrumentation import query_budget
+
+from .dashboard import get_dashboard
+from .exports import EXPORT_FORMATS, EXPORTS, export_response
+from .ingestion import CompletionStatus, ingest_completions
+from accounts.models import Student
+
+from . import subtitles, tts
+from .models import (
+    Course,
+    Lesson,
+    LessonTypeChoices,
+    SpeechChunk,
+    StudySession,
+    Subtitle,
+    SubtitleCues,
+)
+from .outline import get_course_outline
+from .progress import next_lessons, student_progress
+from .quiz import QuizError, get_compiled_quiz, submit_attempt
+from .search import MAX_RESULTS, SEARCH_KINDS, search
+from .study import (
+    StudyError,
+    end_session,
+    get_buffer,
+    heartbeat,
+    start_session,
+    study_report,
+)
+
+
+# API: árvore completa do curso (módulos, lições, materiais e legendas)
+@require_GET
+@query_budget(6)
+def course_outline(request, public_id):
+    try:
+        outline = get_course_outline(public_id)
+    except Course.DoesNotExist:
+        raise Http404("Curso não encontrado.")
+    return JsonResponse(outline)
+
+
+# Exportação (CSV/JSONL) do progresso dos alunos do responsável logado
+@require_GET
+@login_required
+def export_my_students(request, kind):
+    fmt = request.GET.get("format", "csv")
+    if kind not in EXPORTS or fmt not in EXPORT_FORMATS:
+        raise Http404("Exportação não encontrada.")
+    model = EXPORTS[kind][0]
+    queryset = model.objects.filter(student__user=request.user)
+    return export_response(kind, fmt, queryset)
+
+
+# Compartilhados com a versão assíncrona (learning/api.py)
+INVALID_EVENTS = {"error": "O corpo deve ser um JSON com a lista 'events'."}
+
+
+def completion_events(body):
+    try:
+        events = json.loads(body)["events"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return events if isinstance(events, list) else None
+
+
+def completions_response(results):
+    return JsonResponse(
+        {
+            "created": sum(e.status == CompletionStatus.CREATED for e in results),
+            "results": [event.as_result() for event in results],
+        }
+    )
+
+
+# API: lote de conclusões de lição enviado pelos players
+# Corpo: {"events": [{"student": uuid, "lesson": uuid, "completed_at": iso8601}]}
+@require_POST
+@login_required
+@query_budget(12, max_duplicates=2)
+def lesson_completions(request):
+    events = completion_events(request.body)
+    if events is None:
+        return JsonResponse(INVALID_EVENTS, status=400)
+    try:
+        results = ingest_completions(events, user=request.user)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return completions_response(results)
+
+
+# API: questões do quiz de uma lição (sem o gabarito)
+@require_GET
+@query_budget(8)
+def lesson_quiz(request, public_id):
+    try:
+        compiled = get_compiled_quiz(public_id)
+    except Lesson.DoesNotExist:
+        raise Http404("Quiz não encontrado.")
+    return JsonResponse(
+        {
+            "lesson": str(public_id),
+            "max_score": compiled.max_score,
+            "questions": compiled.questions,
+        }
+    )
+
+
+# API: envio de uma tentativa de quiz, corrigida na hora
+# Corpo: {"student": uuid, "answers": {questão: [alternativas]}}
+@require_POST
+@login_required
+@query_budget(14)  # Inclui compilar o quiz (cache frio) e atualizar as estatísticas
+def quiz_attempt(request, public_id):
+    try:
+        data = json.loads(request.body)
+        student = Student.objects.get(public_id=data["student"])
+    except (ValueError, KeyError, TypeError, ValidationError):
+        return JsonResponse({"error": "Corpo inválido."}, status=400)
+    except Student.DoesNotExist:
+        raise Http404("Aluno não encontrado.")
+    if not request.user.is_staff and student.user_id != request.user.pk:
+        return JsonResponse({"error": "Aluno não pertence ao usuário."}, status=403)
+    try:
+        attempt, correct = submit_attempt(student, public_id, data.get("answers"))
+    except Lesson.DoesNotExist:
+        raise Http404("Quiz não encontrado.")
+    except QuizError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse(
+        {
+            "public_id": str(attempt.public_id),
+            "score": attempt.score,
+            "max_score": attempt.max_score,
+            "correct": correct,
+        },
+        status=201,
+    )
+
+
+# API: áudio (TTS) de uma lição de texto, como lista de trechos em ordem
+@require_GET
+@query_budget(12)  # 3 com o áudio já gerado; o resto é a primeira geração
+def lesson_speech(request, public_id):
+    try:
+        lesson = Lesson.objects.get(public_id=public_id, lesson_type=LessonTypeChoices.TEXT)
+    except Lesson.DoesNotExist:
+        raise Http404("Lição de texto não encontrada.")
+    try:
+        speech, chunks = tts.playlist(
+            lesson, request.GET.get("voice"), request.GET.get("rate")
+        )
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    for chunk in chunks:
+        chunk["url"] = reverse("learning:speech-chunk", args=[chunk.pop("digest")])
+    return JsonResponse(
+        {
+            "lesson": str(lesson.public_id),
+            "voice": speech.voice,
+            "rate": speech.rate,
+            "chunks": chunks,
+        }
+    )
+
+
+# Arquivo de áudio de um trecho, com suporte a Range (os players pedem por
+# faixas de bytes). O conteúdo nunca muda para o mesmo digest: cache longo.
+@require_GET
+@query_budget(1)
+def speech_chunk(request, digest):
+    chunk = SpeechChunk.objects.filter(digest=digest).first()
+    if chunk is None:
+        raise Http404("Trecho não encontrado.")
+    return ranged_file_response(
+        request,
+        default_storage.open(chunk.audio.name, "rb"),
+        chunk.size,
+        chunk.content_type,
+        etag=chunk.digest,
+        max_age=60 * 60 * 24 * 365,
+    )
+
+
+# Legenda em WebVTT servida direto das falas já indexadas (sem baixar nem
+# interpretar o arquivo original). Antes da indexação, redireciona para ele.
+@require_GET
+@query_budget(2)
+def subtitle_webvtt(request, public_id):
+    cues = SubtitleCues.objects.filter(subtitle__public_id=public_id).first()
+    if cues is None:
+        subtitle = Subtitle.objects.filter(public_id=public_id).first()
+        if subtitle is None:
+            raise Http404("Legenda não encontrada.")
+        return HttpResponseRedirect(subtitle.file_url)
+    response = StreamingHttpResponse(
+        subtitles.iter_webvtt(cues), content_type="text/vtt; charset=utf-8"
+    )
+    response["Cache-Control"] = "public, max-age=3600"
+    return response
+
+
+# API: falas de uma legenda em um instante (?at=ms) ou intervalo (?start=&end=)
+@require_GET
+@query_budget(1)
+def subtitle_cues(request, public_id):
+    try:
+        if "at" in request.GET:
+            start = int(request.GET["at"])
+            end = start + 1
+        else:
+            start, end = int(request.GET["start"]), int(request.GET["end"])
+    except (KeyError, ValueError):
+        return JsonResponse(
+            {"error": "Informe 'at' ou 'start' e 'end' (em milissegundos)."}, status=400
+        )
+    cues = SubtitleCues.objects.filter(subtitle__public_id=public_id).first()
+    if cues is None:
+        raise Http404("Legenda não encontrada ou ainda não processada.")
+    index = subtitles.CueIndex.for_cues(cues)
+    return JsonResponse(
+        {
+            "cues": [
+                {
+                    "start_ms": cue.start_ms,
+                    "end_ms": cue.end_ms,
+                    "text": subtitles.plain_text(cue.text),
+                }
+                for cue in index.between(start, end)
+            ]
+        }
+    )
+
+
+# API: busca em cursos, lições, materiais e legendas.
+# ?q=texto [&kind=lesson&kind=subtitle] [&limit=20]
+@require_GET
+@query_budget(5)  # Uma query por tipo (+1 na primeira busca do processo)
+def search_view(request):
+    text = request.GET.get("q", "").strip()
+    kinds = request.GET.getlist("kind") or SEARCH_KINDS
+    if (
+        not text
+        or len(kinds) > len(SEARCH_KINDS)
+        or any(kind not in SEARCH_KINDS for kind in kinds)
+    ):
+        kinds = ", ".join(SEARCH_KINDS)
+        return JsonResponse(
+            {"error": f"Informe 'q' e, opcionalmente, 'kind' em {kinds}."}, status=400
+        )
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 20)), MAX_RESULTS))
+    except ValueError:
+        return JsonResponse({"error": "'limit' deve ser um número."}, status=400)
+    kinds = list(dict.fromkeys(kinds))  # Cada tipo repetido seria outra query
+    return JsonResponse(
+        {
+            "results": [
+                {
+                    "kind": result.kind,
+                    "public_id": result.public_id,
+                    "title": result.title,
+                    "headline": result.headline,
+                    "course": result.course_id,
+                    "lesson": result.lesson_id,
+                    "rank": round(result.rank, 4),
+                }
+                for result in search(text, kinds, limit)
+            ]
+        }
+    )
+
+
+# API: "continuar de onde parou" — a próxima lição de cada curso do aluno
+@require_GET
+@login_required
+@query_budget(4)
+def student_next_lessons(request, public_id):
+    try:
+        student = Student.objects.get(public_id=public_id)
+    except Student.DoesNotExist:
+        raise Http404("Aluno não encontrado.")
+    if not request.user.is_staff and student.user_id != request.user.pk:
+        return JsonResponse({"error": "Aluno não pertence ao usuário."}, status=403)
+    return JsonResponse({"courses": next_lessons(student)})
+
+
+# API: contadores de progresso e próxima lição de cada matrícula do aluno
+@require_GET
+@login_required
+@query_budget(4)
+def student_progress_view(request, public_id):
+    try:
+        student = Student.objects.get(public_id=public_id)
+    except Student.DoesNotExist:
+        raise Http404("Aluno não encontrado.")
+    if not request.user.is_staff and student.user_id != request.user.pk:
+        return JsonResponse({"error": "Aluno não pertence ao usuário."}, status=403)
+    return JsonResponse({"courses": student_progress(student)})
+
+
+# API: painel do responsável logado (alunos, matrículas e atividade recente)
+@require_GET
+@login_required
+@query_budget(5)  # Sessão e usuário + 3 para montar o painel (0 com cache)
+def guardian_dashboard(request):
+    return JsonResponse(get_dashboard(request.user.pk))
+
+
+# --- Sessões de estudo e pausas (learning/study.py) ---
+
+
+def _study_buffer(request, public_id):
+    # Sessão aberta do aluno, se pertencer ao usuário. Devolve (buffer, erro)
+    try:
+        buffer = get_buffer(public_id)
+    except StudySession.DoesNotExist:
+        raise Http404("Sessão não encontrada.")
+    except StudyError as exc:
+        return None, JsonResponse({"error": str(exc)}, status=409)
+    if not request.user.is_staff and buffer["user_id"] != request.user.pk:
+        return None, JsonResponse({"error": "Sessão não pertence ao usuário."}, status=403)
+    return buffer, None
+
+
+# Corpo: {"student": uuid, "lesson": uuid (opcional)}
+@require_POST
+@login_required
+@query_budget(8)
+def study_session_start(request):
+    try:
+        data = json.loads(request.body)
+        student = Student.objects.get(public_id=data["student"])
+        lesson = data.get("lesson") and Lesson.objects.get(public_id=data["lesson"])
+    except (ValueError, KeyError, TypeError, ValidationError):
+        return JsonResponse({"error": "Corpo inválido."}, status=400)
+    except (Student.DoesNotExist, Lesson.DoesNotExist):
+        raise Http404("Aluno ou lição não encontrado.")
+    if not request.user.is_staff and student.user_id != request.user.pk:
+        return JsonResponse({"error": "Aluno não pertence ao usuário."}, status=403)
+    session = start_session(student, lesson or None)
+    return JsonResponse({"public_id": str(session.public_id)}, status=201)
+
+
+# Corpo: {"state": "focus" | "break"}. Sem escrita no banco na maioria das vezes.
+@require_POST
+@login_required
+@query_budget(9)  # Sessão e usuário; +7 ao fechar um trecho sem o buffer no cache
+def study_heartbeat(request, public_id):
+    buffer, error = _study_buffer(request, public_id)
+    if error:
+        return error
+    try:
+        state = json.loads(request.body)["state"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Corpo inválido."}, status=400)
+    try:
+        heartbeat(buffer, state)
+    except StudyError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    return JsonResponse({"state": buffer["segment"]["state"]}, status=202)
+
+
+@require_POST
+@login_required
+@query_budget(9)
+def study_session_end(request, public_id):
+    buffer, error = _study_buffer(request, public_id)
+    if error:
+        return error
+    try:
+        end_session(buffer)
+    except StudyError as exc:
+        return JsonResponse({"error": str(exc)}, status=409)
+    session = StudySession.objects.get(pk=buffer["id"])
+    return JsonResponse(
+        {
+            "public_id": str(session.public_id),
+            "started_at": session.started_at,
+            "ended_at": session.ended_at,
+            "focus_seconds": session.focus_seconds,
+            "break_seconds": session.break_seconds,
+            "break_count": session.break_count,
+        }
+    )
+
+
+# API: tempo de estudo por dia do aluno (?days=7), lido dos totais diários
+@require_GET
+@login_required
+@query_budget(4)
+def student_study_time(request, public_id):
+    try:
+        student = Student.objects.get(public_id=public_id)
+        days = max(1, min(int(request.GET.get("days", 7)), 366))
+    except Student.DoesNotExist:
+        raise Http404("Aluno não encontrado.")
+    except ValueError:
+        return JsonResponse({"error": "'days' deve ser um número."}, status=400)
+    if not request.user.is_staff and student.user_id != request.user.pk:
+        return JsonResponse({"error": "Aluno não pertence ao usuário."}, status=403)
+    return JsonResponse({"days": study_report(student, days)})
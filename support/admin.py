@@ -1,11 +1,18 @@
 from django.contrib import admin
+from core.admin import KeysetPaginationMixin
 from .models import SupportTicket
 
 @admin.register(SupportTicket)
-class SupportTicketAdmin(admin.ModelAdmin):
+class SupportTicketAdmin(KeysetPaginationMixin, admin.ModelAdmin):
     list_display = ('subject', 'user', 'status', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('subject', 'message', 'user__email')
+    # 'user' aceita nulo, então o select_related() automático do admin não o segue
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    # Contagem estimada e paginação por chave (ver core/admin.py)
+    keyset_ordering = ('-created_at', '-id')
+    query_budgets = {'changelist': 10, 'change': 10}
 
     # Campos que não devem ser editados após a criação
     readonly_fields = ('public_id', 'created_at', 'resolved_at')
\ No newline at end of file
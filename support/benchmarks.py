@@ -0,0 +1,8 @@
+# Cenários de benchmark do app support (ver core/benchmarks.py)
+
+from core.benchmarks import scenario
+
+
+@scenario("admin.supportticket_changelist")
+def supportticket_changelist(ctx):
+    ctx.get("/admin/support/supportticket/")
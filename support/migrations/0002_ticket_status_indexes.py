@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:36
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY não bloqueia as escritas, mas não roda em transação
+    atomic = False
+
+    dependencies = [
+        ('support', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='supportticket',
+            index=models.Index(fields=['status', '-created_at'], name='ticket_status_recent_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='supportticket',
+            index=models.Index(condition=models.Q(('status__in', ['novo', 'em_andamento'])), fields=['-created_at'], name='ticket_open_recent_idx'),
+        ),
+    ]
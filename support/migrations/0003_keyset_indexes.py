@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:43
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CONCURRENTLY não bloqueia as escritas, mas não roda em transação
+    atomic = False
+
+    dependencies = [
+        ('support', '0002_ticket_status_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='supportticket',
+            index=models.Index(fields=['-created_at', '-id'], name='ticket_recent_idx'),
+        ),
+    ]
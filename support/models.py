@@ -9,6 +9,10 @@ class TicketStatusChoices(models.TextChoices):
     RESOLVIDO = 'resolvido', 'Resolvido'
 
 
+# Status considerados "em aberto" (usados pelo índice parcial abaixo)
+OPEN_TICKET_STATUSES = [TicketStatusChoices.NOVO, TicketStatusChoices.EM_ANDAMENTO]
+
+
 # Modelo: Tickets de Suporte
 class SupportTicket(models.Model):
     id = models.BigAutoField(primary_key=True)
@@ -38,6 +42,18 @@ class SupportTicket(models.Model):
         verbose_name = 'Ticket de Suporte'
         verbose_name_plural = 'Tickets de Suporte'
         ordering = ['-created_at'] # Ordena pelos mais novos primeiro
+        indexes = [
+            # Fila do suporte filtrada por status, mais novos primeiro
+            models.Index(fields=['status', '-created_at'], name='ticket_status_recent_idx'),
+            # Índice parcial: só os tickets em aberto (a maioria está resolvida)
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status__in=OPEN_TICKET_STATUSES),
+                name='ticket_open_recent_idx',
+            ),
+            # Chave da paginação do admin (keyset_ordering em support/admin.py)
+            models.Index(fields=['-created_at', '-id'], name='ticket_recent_idx'),
+        ]
 
     def __str__(self):
         return f'Ticket #{self.id} - {self.subject}'
\ No newline at end of file